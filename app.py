@@ -3,7 +3,9 @@ Aplicación Flask principal para TLCL Workflows Hub.
 Proporciona endpoints para la gestión de workflows de transferencia de datos.
 """
 
-from flask import Flask, jsonify
+import time
+
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from routes.TLCL01_routes import tlcl01_bp
 from routes.TLCL02_routes import TLCL02_bp
@@ -11,7 +13,25 @@ from routes.TLCL03_routes import TLCL03_bp
 from routes.TLCL04_routes import tlcl04_bp
 from routes.SIR_routes import sir_bp
 from routes.COBCEN_routes import COBCEN_bp
+from routes.SP_routes import sp_bp
+from routes.jobs_routes import jobs_bp
+from routes.health_routes import health_bp
+from routes.traces_routes import traces_bp
+from routes.profiles_routes import profiles_bp
+from routes.sql_stats_routes import sql_stats_bp
 from utils.config import DB_CONFIG
+from utils.admin import admin_denied
+from utils.admission import limiters
+from utils.db_pool import db_pool
+from utils.health import health_monitor
+from utils.jobs import job_registry
+from utils.metrics import metrics
+from utils.profiling import MODES as PROFILE_MODES, ProfilerBusy, profiler
+from utils.sp_executor import sp_executor
+from utils.tracing import tracer
+
+# Blueprints sin traza: consultas de estado que llenarían el buffer de trazas
+UNTRACED_BLUEPRINTS = {None, "health", "jobs", "traces", "profiles", "sql_stats"}
 
 
 def create_app():
@@ -39,6 +59,128 @@ def create_app():
     app.register_blueprint(TLCL03_bp)
     app.register_blueprint(tlcl04_bp)
     app.register_blueprint(sir_bp)
+    app.register_blueprint(sp_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(traces_bp)
+    app.register_blueprint(profiles_bp)
+    app.register_blueprint(sql_stats_bp)
+
+    # Health prober en segundo plano (refresca los checks cacheados)
+    health_monitor.ensure_started()
+
+    # Volcado periódico de métricas para sumar los workers (solo con METRICS_DIR)
+    metrics.ensure_started()
+
+    # Latencia por blueprint y ruta (plantilla de la URL, sin ids) para /metrics
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+
+    # Span raíz de la traza del request (los jobs, pasos, queries y SQL cuelgan de él)
+    @app.before_request
+    def start_request_span():
+        if request.blueprint in UNTRACED_BLUEPRINTS:
+            return
+        route = request.url_rule.rule if request.url_rule else "sin_ruta"
+        g.request_span = tracer.start_span(
+            f"{request.method} {route}",
+            kind="server",
+            root=True,
+            blueprint=request.blueprint,
+            route=route,
+            method=request.method,
+        )
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop("request_start", None)
+        if start is not None:
+            metrics.observe(
+                "tlcl_http_request_duration_seconds",
+                time.perf_counter() - start,
+                blueprint=request.blueprint or "app",
+                route=request.url_rule.rule if request.url_rule else "sin_ruta",
+                method=request.method,
+                status=response.status_code,
+            )
+        return response
+
+    @app.after_request
+    def tag_request_span(response):
+        span = g.get("request_span")
+        if span is not None and span.trace_id:
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_error(f"HTTP {response.status_code}")
+            response.headers["X-Trace-Id"] = span.trace_id
+        return response
+
+    @app.teardown_request
+    def end_request_span(error):
+        span = g.pop("request_span", None)
+        if span is not None:
+            if error is not None:
+                span.set_error(error)
+            tracer.end_span(span)
+
+    # Id de job propuesto por el cliente: formato acotado y sin reutilizar uno registrado
+    @app.before_request
+    def validate_job_id():
+        job_id = request.headers.get("X-Job-Id")
+        if job_id is None or request.method != "POST":
+            return None
+        error = job_registry.client_id_error(job_id)
+        if error:
+            message, status_code = error
+            return jsonify({"success": False, "message": message, "data": {"job_id": job_id[:80]}}), status_code
+        return None
+
+    # Profiling bajo demanda: ?profile=cpu|alloc con el token de administración
+    @app.before_request
+    def start_request_profile():
+        mode = request.args.get("profile")
+        if not mode:
+            return None
+        denied = admin_denied()
+        if denied:
+            return denied
+        if mode not in PROFILE_MODES:
+            return jsonify(
+                {
+                    "success": False,
+                    "message": f"Modo de profiling inválido: {mode} (usar {' o '.join(PROFILE_MODES)})",
+                    "data": None,
+                }
+            ), 400
+        route = request.url_rule.rule if request.url_rule else request.path
+        try:
+            profiler.start(mode, f"{request.method} {route}")
+        except ProfilerBusy as e:
+            return jsonify({"success": False, "message": str(e), "data": None}), 409
+        return None
+
+    @app.after_request
+    def attach_request_profile(response):
+        # Sin sesión si no se pidió o si se cedió a un job en segundo plano (?async=true)
+        session = profiler.current_session()
+        if session is None:
+            return response
+        summary = session.stop()
+        if summary is None:
+            return response
+        response.headers["X-Profile-Id"] = summary["id"]
+        body = response.get_json(silent=True) if response.is_json else None
+        if isinstance(body, dict):
+            body["profile"] = summary
+            response.set_data(app.json.dumps(body))
+        return response
+
+    @app.teardown_request
+    def discard_request_profile(error):
+        session = profiler.current_session()
+        if session is not None:
+            session.discard()
 
 
     # Ruta raíz para información general de la API
@@ -153,6 +295,80 @@ def create_app():
                         }
                     },
                 },
+                "sp": {
+                    "batch": {
+                        "method": "POST",
+                        "url": "/api/sp/batch",
+                        "description": "Ejecuta SP_TLCL_01, SP_TLCL_SIR y SP_TLCL_COBCEN en lote (paralelo con depends_on)",
+                    },
+                },
+                "health": {
+                    "all": {
+                        "method": "GET",
+                        "url": "/health/all",
+                        "description": "Health checks de todos los workflows en paralelo con latencia por check",
+                    },
+                },
+                "metrics": {
+                    "prometheus": {
+                        "method": "GET",
+                        "url": "/metrics",
+                        "description": "Métricas en formato Prometheus: latencia por ruta, duración por paso, filas, lotes, SQL, SP y pool",
+                    },
+                },
+                "traces": {
+                    "list": {
+                        "method": "GET",
+                        "url": "/api/traces",
+                        "description": "Trazas recientes de este worker (?limit=, ?name=) con duración y estado",
+                    },
+                    "detail": {
+                        "method": "GET",
+                        "url": "/api/traces/<trace_id>",
+                        "description": "Spans de una traza: request → job → paso → queries → SQL (?format=otlp)",
+                    },
+                },
+                "profiles": {
+                    "profile": {
+                        "method": "POST",
+                        "url": "<endpoint>?profile=cpu|alloc",
+                        "description": "Perfila la ejecución (cProfile o tracemalloc); requiere X-Admin-Token",
+                    },
+                    "list": {
+                        "method": "GET",
+                        "url": "/api/profiles",
+                        "description": "Perfiles guardados con hotspots y artefactos pstats / collapsed",
+                    },
+                },
+                "sql": {
+                    "stats": {
+                        "method": "GET",
+                        "url": "/api/sql/stats",
+                        "description": "Conteo, total, p95 y máximo por fingerprint de sentencia SQL; requiere X-Admin-Token",
+                    },
+                    "slow": {
+                        "method": "GET",
+                        "url": "/api/sql/slow",
+                        "description": "Sentencias sobre SQL_SLOW_THRESHOLD_MS con binds y rowcount; requiere X-Admin-Token",
+                    },
+                },
+                "jobs": {
+                    "status": {
+                        "method": "GET",
+                        "url": "/api/jobs/<id>",
+                        "description": "Estado de una ejecución (usar ?async=true en los endpoints de ejecución)",
+                    },
+                    "events": {
+                        "method": "GET",
+                        "url": "/api/jobs/<id>/events",
+                        "description": "Progreso en vivo (Server-Sent Events): pasos, filas, throughput y ETA",
+                    },
+                    "cancel": {
+                        "method": "DELETE",
+                        "url": "/api/jobs/<id>",
+                        "description": "Cancela un job en ejecución (cancela la sentencia en curso en HANA)",
+                    },
+                },
                 "status": "running",
             }
         )
@@ -166,9 +382,18 @@ def create_app():
                 "status": "healthy",
                 "message": "TLCL Workflows Hub API is running",
                 "version": "1.0.0",
+                "admission": {name: limiter.snapshot() for name, limiter in limiters.items()},
+                "hana_pool": db_pool.snapshot(),
+                "stored_procedures": sp_executor.stats(),
             }
         )
 
+    # Métricas en formato de exposición de Prometheus
+    @app.route("/metrics")
+    def prometheus_metrics():
+        """Métricas de todos los workers (con METRICS_DIR) o del worker que responde."""
+        return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
     # Manejo de errores 404
     @app.errorhandler(404)
     def not_found(error):
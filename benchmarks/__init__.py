@@ -0,0 +1 @@
+"""Benchmarks de los componentes del hub (se ejecutan con `python -m benchmarks.<modulo>`)."""
@@ -0,0 +1,106 @@
+"""
+Verificación del escritor por lotes ante lock wait timeouts sobre el stand-in local de HANA.
+
+Escribe filas con `BulkWriter` (con `row_fallback`, como TLCL02/TLCL03) bajo cada política de
+commit con `STANDIN_LOCK_TIMEOUT_RATE` > 0: un lock wait timeout revierte toda la transacción
+abierta, no solo el lote que falló. Después de cada escritura compara `rows_written` con el
+`COUNT(*)` real de la tabla y termina con código 1 si algún conteo no coincide.
+
+Uso:
+    python -m benchmarks.bulk_writer_faults [--rows 100] [--batch 20] [--rate 0.1] [--seeds 20]
+                                            [--policies batch,rows:40,seconds:0.5,single,autocommit]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+TABLE = 'BULK_FAULT_CHECK'
+
+
+def _prepare(database):
+    db = sqlite3.connect(database)
+    try:
+        db.execute(f'DROP TABLE IF EXISTS {TABLE}')
+        db.execute(f'CREATE TABLE {TABLE} (ID INTEGER PRIMARY KEY, VAL NVARCHAR(32))')
+        db.commit()
+    finally:
+        db.close()
+
+
+def _count(database):
+    db = sqlite3.connect(database)
+    try:
+        return db.execute(f'SELECT COUNT(*) FROM {TABLE}').fetchone()[0]
+    finally:
+        db.close()
+
+
+def run_case(database, policy, rows, batch, seed):
+    """Escribe `rows` filas con la política indicada y devuelve el resultado verificado."""
+    from utils import hana_standin
+    from utils.bulk_writer import AdaptiveBatcher, BulkWriter
+    from utils.config import DB_CONFIG
+    from utils.db_connection import HanaConnection
+
+    _prepare(database)
+    hana_standin.network._random.seed(seed)
+    hana_standin.network.reset_stats()
+    hana_conn = HanaConnection()
+    if not hana_conn.connect(track_job=False):
+        raise RuntimeError('No se pudo conectar al stand-in')
+    query = f'UPSERT {DB_CONFIG["schema"]}.{TABLE} (ID, VAL) VALUES (?, ?) WITH PRIMARY KEY'
+    writer = BulkWriter(hana_conn, query, TABLE, row_fallback=True, commit=policy,
+                        batcher=AdaptiveBatcher(initial_size=batch, min_size=batch, max_size=batch))
+    data = [(i, f'fila {i}') for i in range(rows)]
+    error = None
+    try:
+        stats = writer.write(data)
+    except Exception as e:
+        stats, error = None, str(e)
+    finally:
+        hana_conn.close()
+
+    in_table = _count(database)
+    faults = hana_standin.network.stats()['faults']['lock_timeout']
+    if stats is None:
+        # Con `row_fallback` un lock wait timeout no debe abortar la escritura
+        return {'policy': policy, 'seed': seed, 'lock_timeouts': faults, 'error': error,
+                'rows_in_table': in_table, 'consistent': False}
+    consistent = (stats['rows_written'] == in_table and stats['rows_written'] + stats['rows_failed'] == rows)
+    return {'policy': policy, 'seed': seed, 'lock_timeouts': faults, 'rows_written': stats['rows_written'],
+            'rows_failed': stats['rows_failed'], 'rows_replayed': stats['rows_replayed'],
+            'rows_in_table': in_table, 'consistent': consistent}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--batch', type=int, default=20)
+    parser.add_argument('--rate', type=float, default=0.1, help='STANDIN_LOCK_TIMEOUT_RATE por escritura')
+    parser.add_argument('--seeds', type=int, default=20, help='Corridas por política (una semilla cada una)')
+    parser.add_argument('--policies', default='batch,rows:40,seconds:0.5,single,autocommit')
+    parser.add_argument('--database', default=None, help='Archivo SQLite (por defecto uno temporal)')
+    args = parser.parse_args()
+
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix='tlcl_bulk_faults_'), 'standin.db')
+    os.environ.update(DB_DRIVER='standin', STANDIN_DATABASE=database,
+                      STANDIN_LOCK_TIMEOUT_RATE=str(args.rate), STANDIN_NETWORK='local')
+
+    results = [run_case(database, policy, args.rows, args.batch, seed)
+               for policy in args.policies.split(',') for seed in range(args.seeds)]
+    failures = [result for result in results if not result['consistent']]
+    summary = {
+        'cases': len(results),
+        'with_lock_timeouts': sum(1 for result in results if result['lock_timeouts']),
+        'inconsistent': failures,
+    }
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
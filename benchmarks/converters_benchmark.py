@@ -0,0 +1,93 @@
+"""
+Benchmark de la conversión de filas del Table Consumer: conversión original (`str()` /
+`isoformat()` sobre cada valor) contra los conversores compilados de `utils.converters`.
+
+Uso:
+    python -m benchmarks.converters_benchmark [--rows 200000] [--repeat 3]
+"""
+
+import argparse
+import datetime
+import json
+import random
+import time
+from decimal import Decimal
+
+from utils.converters import compile_converters, convert_rows
+
+# Forma típica de TELCEL_EE_TEMPKPI -> TELCEL_EE_KPI: fecha como texto para el transform,
+# llaves de texto y contadores numéricos que el destino guarda como DECIMAL/INTEGER
+COLUMNS = ['FECHA', 'SITIO', 'REGION', 'PROVEEDOR'] + [f'KPI{i}' for i in range(12)]
+SOURCE_TYPES = dict({'FECHA': 'DATE', 'SITIO': 'NVARCHAR', 'REGION': 'NVARCHAR', 'PROVEEDOR': 'NVARCHAR'},
+                    **{f'KPI{i}': ('DECIMAL' if i % 2 else 'INTEGER') for i in range(12)})
+TARGET_TYPES = dict(SOURCE_TYPES)
+
+
+def legacy_convert(raw_data):
+    """Conversión original de los Table Consumers."""
+    data = []
+    for row in raw_data:
+        converted_row = []
+        for value in row:
+            if value is None:
+                converted_row.append(None)
+            elif hasattr(value, 'isoformat'):
+                converted_row.append(value.isoformat())
+            else:
+                converted_row.append(str(value) if value is not None else None)
+        data.append(converted_row)
+    return data
+
+
+def make_rows(count, seed=7):
+    """Filas sintéticas con los tipos nativos que devuelve hdbcli."""
+    rng = random.Random(seed)
+    base = datetime.date(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        row = [base + datetime.timedelta(days=i % 365), f'SITE{i % 5000:05d}', f'R{i % 9}', 'HUAWEI']
+        for k in range(12):
+            if rng.random() < 0.05:
+                row.append(None)
+            elif k % 2:
+                row.append(Decimal(rng.randint(0, 10 ** 6)) / 100)
+            else:
+                row.append(rng.randint(0, 10 ** 6))
+        rows.append(tuple(row))
+    return rows
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    converters = compile_converters(COLUMNS, SOURCE_TYPES, TARGET_TYPES, text_columns=('FECHA',))
+
+    legacy = best_of(lambda: legacy_convert(rows), args.repeat)
+    compiled = best_of(lambda: convert_rows(rows, converters), args.repeat)
+    print(json.dumps({
+        'rows': args.rows,
+        'columns': len(COLUMNS),
+        'converted_columns': sum(1 for c in converters if c is not None),
+        'legacy_seconds': round(legacy, 4),
+        'compiled_seconds': round(compiled, 4),
+        'legacy_rows_per_second': round(args.rows / legacy),
+        'compiled_rows_per_second': round(args.rows / compiled),
+        'speedup': round(legacy / compiled, 2)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,550 @@
+"""
+Prueba de carga HTTP con tráfico concurrente de endpoints contra la app corriendo en local.
+
+Reproduce una mezcla ponderada de los endpoints de `request.http` (los disparadores de
+workflows y el lote de SP) junto con lo que llega en paralelo en producción: health probes,
+consultas de status y polls de jobs. Las solicitudes se lanzan en lazo abierto a una tasa
+objetivo (`--rps`): cada una sale en su instante programado aunque las anteriores no hayan
+respondido, y su latencia se mide desde ese instante, así que la espera por falta de hilos
+del cliente o del servidor también cuenta.
+
+Reporta por ruta p50/p95/p99, tasa de error y códigos de estado (429/503 de control de
+admisión incluidos) y, muestreando `GET /health` cada `--sample-interval` segundos, la
+saturación del pool de conexiones HANA y las colas de admisión. Con varios workers de gunicorn
+cada muestra refleja al worker que la atendió.
+
+Uso:
+    python -m benchmarks.load_test [--base-url http://127.0.0.1:5000] [--rps 20] [--duration 60]
+                                   [--mix health/all=5,TLCL04/transfer=0] [--async]
+                                   [--serve [--workers 1 --threads 8 --rows 10k]]
+                                   [--output benchmarks/results/load.json] [--max-error-rate 1]
+
+Con `--serve` levanta la app sobre el stand-in local de HANA (`DB_DRIVER=standin`), con
+gunicorn si está instalado (gthread como en el Procfile) o con el servidor de Flask, carga
+datos sintéticos en las tablas de origen y registra también el pico de RSS del servidor.
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.regression import save_results
+from benchmarks.workflows_benchmark import _git_commit, parse_size
+
+DEFAULT_BASE_URL = 'http://127.0.0.1:5000'
+DEFAULT_HTTP_FILE = 'request.http'
+DEFAULT_RPS = 20.0
+DEFAULT_DURATION = 60.0
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_SEED = 7
+
+# Tráfico de lectura que acompaña a los disparadores de request.http ({job_id}: un job lanzado
+# por esta misma prueba)
+PROBES = [
+    {'method': 'GET', 'path': '/health', 'body': None},
+    {'method': 'GET', 'path': '/health/all?deep=false', 'body': None},
+    {'method': 'GET', 'path': '/health/all', 'body': None},
+    {'method': 'GET', 'path': '/api/TLCL01/status', 'body': None},
+    {'method': 'GET', 'path': '/api/TLCL04/status', 'body': None},
+    {'method': 'GET', 'path': '/api/jobs/{job_id}', 'body': None},
+]
+
+# Peso por defecto de cada ruta; las de request.http que no aparecen aquí pesan 1
+DEFAULT_WEIGHTS = {
+    'GET /health': 20,
+    'GET /health/all?deep=false': 20,
+    'GET /health/all': 5,
+    'GET /api/TLCL01/status': 10,
+    'GET /api/TLCL04/status': 10,
+    'GET /api/jobs/{job_id}': 20,
+}
+
+# Respuestas del control de admisión y del pool agotado
+_REJECTED_STATUS = (429, 503)
+
+_REQUEST_LINE = re.compile(r'^(GET|POST|PUT|PATCH|DELETE)\s+(\S+)', re.IGNORECASE)
+
+
+def parse_http_file(path):
+    """Lee las solicitudes de un archivo `.http` (formato REST Client, separadas por `###`).
+
+    El host de cada URL se descarta: las rutas se envían a `--base-url`.
+
+    Returns:
+        list: Diccionarios {method, path, body}; `body` es el JSON ya interpretado o None.
+    """
+    with open(path, 'r', encoding='utf-8') as handle:
+        blocks = re.split(r'^###.*$', handle.read(), flags=re.MULTILINE)
+
+    entries = []
+    for block in blocks:
+        lines = [line for line in block.splitlines() if not line.lstrip().startswith('#')]
+        for position, line in enumerate(lines):
+            match = _REQUEST_LINE.match(line.strip())
+            if not match:
+                continue
+            url = match.group(2)
+            path = re.sub(r'^https?://[^/]+', '', url) or '/'
+            # Encabezados hasta la primera línea vacía; el resto es el cuerpo
+            rest = lines[position + 1:]
+            blank = next((index for index, text in enumerate(rest) if not text.strip()), len(rest))
+            body_text = '\n'.join(rest[blank:]).strip()
+            entries.append({
+                'method': match.group(1).upper(),
+                'path': path,
+                'body': json.loads(body_text) if body_text else None
+            })
+            break
+    return entries
+
+
+def route_name(entry):
+    return f"{entry['method']} {entry['path']}"
+
+
+def build_mix(entries, overrides=None):
+    """Combina los disparadores y las rutas de lectura con sus pesos.
+
+    Args:
+        entries (list): Solicitudes de `parse_http_file`.
+        overrides (str, optional): 'patrón=peso,...'; el peso aplica a toda ruta cuyo nombre
+            contiene el patrón (sin distinguir mayúsculas). Peso 0 quita la ruta.
+
+    Returns:
+        list: Rutas {name, method, path, body, weight} con peso mayor a cero.
+    """
+    routes = []
+    for entry in entries + PROBES:
+        name = route_name(entry)
+        if any(route['name'] == name for route in routes):
+            continue
+        routes.append(dict(entry, name=name, weight=float(DEFAULT_WEIGHTS.get(name, 1))))
+
+    for item in filter(None, (overrides or '').split(',')):
+        pattern, _, weight = item.rpartition('=')
+        matched = [route for route in routes if pattern.strip().lower() in route['name'].lower()]
+        if not pattern.strip() or not matched:
+            raise ValueError(f"'{item}' no coincide con ninguna ruta de la mezcla")
+        for route in matched:
+            route['weight'] = float(weight)
+    return [route for route in routes if route['weight'] > 0]
+
+
+def percentile(sorted_values, pct):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not sorted_values:
+        return None
+    rank = max(int(-(-pct * len(sorted_values) // 100)), 1)
+    return sorted_values[rank - 1]
+
+
+class LoadRecorder:
+    """Acumula latencias y códigos de estado por ruta desde varios hilos."""
+
+    def __init__(self):
+        self.routes = {}
+        self.job_ids = []
+        self._lock = threading.Lock()
+
+    def record(self, name, latency, status, service_time):
+        with self._lock:
+            route = self.routes.setdefault(name, {'latencies': [], 'service': [], 'statuses': {}})
+            route['latencies'].append(latency)
+            route['service'].append(service_time)
+            route['statuses'][status] = route['statuses'].get(status, 0) + 1
+
+    def add_job(self, job_id):
+        with self._lock:
+            self.job_ids.append(job_id)
+
+    def pick_job(self, rng):
+        with self._lock:
+            return rng.choice(self.job_ids) if self.job_ids else None
+
+    def summary(self):
+        """Resumen por ruta y global: conteos, percentiles en ms y tasa de error."""
+        with self._lock:
+            routes = {name: self._summarize(data) for name, data in sorted(self.routes.items())}
+            merged = {'latencies': [], 'service': [], 'statuses': {}}
+            for data in self.routes.values():
+                merged['latencies'].extend(data['latencies'])
+                merged['service'].extend(data['service'])
+                for status, count in data['statuses'].items():
+                    merged['statuses'][status] = merged['statuses'].get(status, 0) + count
+        return routes, self._summarize(merged)
+
+    @staticmethod
+    def _summarize(data):
+        latencies = sorted(data['latencies'])
+        service = sorted(data['service'])
+        count = len(latencies)
+        errors = sum(n for status, n in data['statuses'].items() if not str(status).isdigit() or int(status) >= 400)
+        rejected = sum(n for status, n in data['statuses'].items() if status in _REJECTED_STATUS)
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            'requests': count,
+            'errors': errors,
+            'error_rate_pct': round(errors / count * 100, 2) if count else None,
+            'rejected': rejected,
+            'status_codes': {str(status): n for status, n in sorted(data['statuses'].items(), key=lambda item: str(item[0]))},
+            'p50_ms': ms(percentile(latencies, 50)),
+            'p95_ms': ms(percentile(latencies, 95)),
+            'p99_ms': ms(percentile(latencies, 99)),
+            'max_ms': ms(latencies[-1] if latencies else None),
+            'service_p95_ms': ms(percentile(service, 95))
+        }
+
+
+class PoolSampler(threading.Thread):
+    """Muestrea `GET /health` (pool HANA y admisión) y el RSS del servidor a intervalos."""
+
+    def __init__(self, base_url, interval, server_pid=None):
+        super().__init__(name='load-test-sampler', daemon=True)
+        self.base_url = base_url
+        self.interval = interval
+        self.server_pid = server_pid
+        self.samples = []
+        self.rss_samples = []
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.sample()
+
+    def sample(self):
+        if self.server_pid:
+            rss = _tree_rss_mb(self.server_pid)
+            if rss is not None:
+                self.rss_samples.append(rss)
+        try:
+            with urllib.request.urlopen(self.base_url + '/health', timeout=5) as response:
+                body = json.loads(response.read())
+        except (OSError, ValueError):
+            return
+        self.samples.append({'pool': body.get('hana_pool') or {}, 'admission': body.get('admission') or {}})
+
+    def summary(self):
+        """Uso del pool (conexiones en uso, muestras saturadas) y colas de admisión."""
+        pools = [sample['pool'] for sample in self.samples if sample['pool'].get('size')]
+        in_use = [pool.get('in_use', 0) for pool in pools]
+        saturated = sum(1 for pool in pools if pool.get('in_use', 0) >= pool['size'])
+        pool = {
+            'samples': len(pools),
+            'size': pools[-1]['size'] if pools else None,
+            'max_in_use': max(in_use) if in_use else None,
+            'mean_in_use': round(sum(in_use) / len(in_use), 2) if in_use else None,
+            'max_open': max((item.get('open', 0) for item in pools), default=None),
+            'saturated_pct': round(saturated / len(pools) * 100, 1) if pools else None
+        }
+
+        admission = {}
+        for sample in self.samples:
+            for name, limiter in sample['admission'].items():
+                current = admission.setdefault(name, {
+                    'concurrency': limiter.get('concurrency'), 'queue': limiter.get('queue'),
+                    'max_active': 0, 'max_waiting': 0, 'first_rejected': limiter.get('rejected', 0),
+                    'rejected': 0
+                })
+                current['max_active'] = max(current['max_active'], limiter.get('active', 0))
+                current['max_waiting'] = max(current['max_waiting'], limiter.get('waiting', 0))
+                current['rejected'] = limiter.get('rejected', 0) - current['first_rejected']
+        for current in admission.values():
+            del current['first_rejected']
+
+        return {
+            'hana_pool': pool,
+            'admission': admission,
+            'server_peak_rss_mb': max(self.rss_samples) if self.rss_samples else None
+        }
+
+
+def _tree_rss_mb(pid):
+    """RSS en MB de un proceso y sus hijos (workers de gunicorn), leído de /proc; None si no hay /proc."""
+    total = 0
+    pending = [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f'/proc/{current}/status', 'r', encoding='utf-8') as handle:
+                for line in handle:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children', 'r', encoding='utf-8') as handle:
+                    pending.extend(int(child) for child in handle.read().split())
+    except (OSError, ValueError):
+        return None if total == 0 else round(total / 1024, 1)
+    return round(total / 1024, 1)
+
+
+def _send(base_url, route, job_id, timeout):
+    """Envía una solicitud y devuelve (código de estado o nombre del error, job_id creado)."""
+    path = route['path']
+    headers = {'Content-Type': 'application/json'}
+    created = None
+    if '{job_id}' in path:
+        path = path.replace('{job_id}', job_id)
+    elif route['method'] == 'POST':
+        created = f'load-{uuid.uuid4().hex[:12]}'
+        headers['X-Job-Id'] = created
+
+    data = json.dumps(route['body'] if route['body'] is not None else {}).encode() if route['method'] == 'POST' else None
+    request = urllib.request.Request(base_url + path, data=data, headers=headers, method=route['method'])
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status, created
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code, created
+    except (OSError, socket.timeout) as e:
+        reason = getattr(e, 'reason', None)
+        return type(reason if isinstance(reason, BaseException) else e).__name__, None
+
+
+def run_load(base_url, routes, rps, duration, timeout=DEFAULT_TIMEOUT, concurrency=64, seed=DEFAULT_SEED,
+             async_triggers=False, sampler=None):
+    """Lanza la mezcla de rutas a `rps` solicitudes por segundo durante `duration` segundos.
+
+    Args:
+        base_url (str): URL base de la app.
+        routes (list): Rutas de `build_mix`.
+        rps (float): Solicitudes por segundo objetivo.
+        duration (float): Segundos de carga.
+        timeout (float): Espera máxima por respuesta.
+        concurrency (int): Hilos del cliente (solicitudes en vuelo como máximo).
+        seed (int): Semilla de la selección de rutas.
+        async_triggers (bool): Lanzar los disparadores con `?async=true` (202 + job en segundo plano).
+        sampler (PoolSampler, optional): Muestreador a iniciar y detener con la carga.
+
+    Returns:
+        dict: Resumen por ruta, global y tasa lograda (solicitudes enviadas por segundo de carga).
+    """
+    rng = random.Random(seed)
+    cumulative = []
+    total = 0.0
+    for route in routes:
+        total += route['weight']
+        cumulative.append(total)
+    if async_triggers:
+        routes = [dict(route, path=route['path'] + ('&' if '?' in route['path'] else '?') + 'async=true')
+                  if route['method'] == 'POST' else route for route in routes]
+    job_routes = [route for route in routes if '{job_id}' not in route['path']]
+
+    recorder = LoadRecorder()
+
+    def issue(route, job_id, scheduled):
+        started = time.perf_counter()
+        status, created = _send(base_url, route, job_id, timeout)
+        finished = time.perf_counter()
+        if created and status in (200, 202, 500):
+            recorder.add_job(created)
+        recorder.record(route['name'], finished - scheduled, status, finished - started)
+
+    if sampler:
+        sampler.start()
+    start = time.perf_counter()
+    sent = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='load-test') as executor:
+        while True:
+            scheduled = start + sent / rps
+            if scheduled - start >= duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            route = routes[bisect.bisect_left(cumulative, rng.random() * total)]
+            job_id = None
+            if '{job_id}' in route['path']:
+                job_id = recorder.pick_job(rng)
+                if job_id is None:
+                    # Aún no hay jobs que consultar: otra ruta de la mezcla
+                    route = rng.choice(job_routes)
+            executor.submit(issue, route, job_id, scheduled)
+            sent += 1
+        sending = time.perf_counter() - start
+    # Incluye la espera por las respuestas que seguían en vuelo
+    elapsed = time.perf_counter() - start
+    if sampler:
+        sampler.stop()
+
+    per_route, overall = recorder.summary()
+    return {
+        'requests': sent,
+        'elapsed_seconds': round(elapsed, 2),
+        'achieved_rps': round(sent / sending, 2) if sending else None,
+        'overall': overall,
+        'routes': per_route,
+        'jobs_started': len(recorder.job_ids)
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args):
+    """Carga datos sintéticos y levanta la app sobre el stand-in en un puerto libre.
+
+    Returns:
+        tuple: (subprocess.Popen, base_url)
+    """
+    env = dict(os.environ, DB_DRIVER='standin', STANDIN_DATABASE=args.database)
+    os.environ.update(env)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(args.database + suffix):
+            os.remove(args.database + suffix)
+
+    # La configuración del stand-in se lee al importar: después de fijar el entorno
+    from benchmarks.synthetic_data import SOURCE_TABLES, load_standin
+    rows = parse_size(args.rows)
+    if rows:
+        for tables in SOURCE_TABLES.values():
+            load_standin(tables, -(-rows // len(tables)), args.database, args.seed)
+
+    port = _free_port()
+    try:
+        import gunicorn  # noqa: F401
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers),
+                   '--worker-class', 'gthread', '--threads', str(args.threads), 'app:app']
+    except ImportError:
+        command = [sys.executable, '-c',
+                   f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'El servidor terminó con código {server.returncode} al arrancar')
+        try:
+            with urllib.request.urlopen(base_url + '/health', timeout=2):
+                return server, base_url
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('El servidor no respondió /health en 60s')
+
+
+def format_report(report):
+    """Tabla legible: una línea por ruta más el total, el pool y la admisión."""
+    config = report['config']
+    lines = [f"{report['requests']} solicitudes en {report['elapsed_seconds']}s "
+             f"({report['achieved_rps']} rps de {config['rps']} objetivo) contra {config['base_url']}",
+             '',
+             f"{'ruta':<40} {'n':>6} {'err%':>6} {'p50':>9} {'p95':>9} {'p99':>9}  códigos"]
+    rows = list(report['routes'].items()) + [('TOTAL', report['overall'])]
+    for name, stats in rows:
+        codes = ' '.join(f'{code}:{count}' for code, count in stats['status_codes'].items())
+        lines.append(f"{name:<40} {stats['requests']:>6} {stats['error_rate_pct'] or 0:>6} "
+                     f"{stats['p50_ms']:>7}ms {stats['p95_ms']:>7}ms {stats['p99_ms']:>7}ms  {codes}")
+
+    pool = report['saturation']['hana_pool']
+    lines.append('')
+    lines.append(f"Pool HANA: tamaño {pool['size']}, en uso máx {pool['max_in_use']} / prom {pool['mean_in_use']}, "
+                 f"saturado en {pool['saturated_pct']}% de {pool['samples']} muestras")
+    for name, limiter in report['saturation']['admission'].items():
+        lines.append(f"Admisión {name}: activos máx {limiter['max_active']}/{limiter['concurrency']}, "
+                     f"en cola máx {limiter['max_waiting']}/{limiter['queue']}, rechazados {limiter['rejected']}")
+    if report['saturation']['server_peak_rss_mb'] is not None:
+        lines.append(f"Pico de RSS del servidor: {report['saturation']['server_peak_rss_mb']} MB")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='App a probar (ignorado con --serve)')
+    parser.add_argument('--http-file', default=DEFAULT_HTTP_FILE, help='Archivo .http con los disparadores')
+    parser.add_argument('--rps', type=float, default=DEFAULT_RPS, help='Solicitudes por segundo objetivo')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='Segundos de carga')
+    parser.add_argument('--mix', help="Pesos 'patrón=peso,...' sobre los nombres de ruta (0 la quita)")
+    parser.add_argument('--async', dest='async_triggers', action='store_true',
+                        help='Lanzar los disparadores en segundo plano (?async=true)')
+    parser.add_argument('--concurrency', type=int, default=64, help='Solicitudes en vuelo como máximo del cliente')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Espera máxima por respuesta')
+    parser.add_argument('--sample-interval', type=float, default=1.0, help='Segundos entre muestras del pool')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--serve', action='store_true', help='Levantar la app sobre el stand-in local')
+    parser.add_argument('--workers', type=int, default=1, help='Workers de gunicorn (con --serve)')
+    parser.add_argument('--threads', type=int, default=8, help='Hilos por worker de gunicorn (con --serve)')
+    parser.add_argument('--rows', default='10k', help='Filas sintéticas por workflow (con --serve)')
+    parser.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'tlcl_load_test.db'),
+                        help='Base SQLite del stand-in (con --serve)')
+    parser.add_argument('--output', help='Archivo de resultados (por defecto benchmarks/results/load_<commit>.json)')
+    parser.add_argument('--max-error-rate', type=float,
+                        help='Terminar con código 1 si la tasa de error global supera este porcentaje')
+    args = parser.parse_args()
+
+    try:
+        routes = build_mix(parse_http_file(args.http_file), args.mix)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not routes:
+        parser.error('La mezcla no tiene rutas con peso mayor a cero')
+
+    server, base_url = (None, args.base_url.rstrip('/'))
+    if args.serve:
+        server, base_url = start_server(args)
+    try:
+        sampler = PoolSampler(base_url, args.sample_interval, server.pid if server else None)
+        result = run_load(base_url, routes, args.rps, args.duration, args.timeout, args.concurrency,
+                          args.seed, args.async_triggers, sampler)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    commit, dirty = _git_commit()
+    report = {
+        'benchmark': 'load',
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'config': {
+            'base_url': base_url, 'rps': args.rps, 'duration': args.duration, 'concurrency': args.concurrency,
+            'async_triggers': args.async_triggers, 'served': args.serve,
+            'workers': args.workers if args.serve else None, 'threads': args.threads if args.serve else None,
+            'rows': parse_size(args.rows) if args.serve else None,
+            'mix': {route['name']: route['weight'] for route in routes}
+        },
+        **result,
+        'saturation': sampler.summary()
+    }
+
+    output = args.output or os.path.join('benchmarks', 'results', f"load_{commit or 'local'}.json")
+    save_results(report, output)
+    print(format_report(report))
+    print(f"Resultados en {output}", file=sys.stderr)
+
+    if args.max_error_rate is not None and (report['overall']['error_rate_pct'] or 0) > args.max_error_rate:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Comparación de resultados del benchmark de workflows contra una línea base guardada.
+
+Una corrida es una regresión si sus filas/s bajaron (o su tiempo total subió, en los workflows
+sin filas de origen como COBCEN y SIR) o si su pico de RSS creció más que el porcentaje
+permitido, o si falló. Las duraciones por paso se comparan solo como diagnóstico.
+"""
+
+import json
+import os
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baselines', 'workflows.json')
+DEFAULT_MAX_THROUGHPUT_DROP = 10.0
+DEFAULT_MAX_MEMORY_GROWTH = 10.0
+
+# Datos del entorno que deben coincidir para que la comparación tenga sentido
+_CONTEXT_KEYS = ('network', 'data', 'seed', 'python')
+
+
+def load_results(path):
+    """Carga un archivo de resultados de `benchmarks.workflows_benchmark`."""
+    with open(path, 'r', encoding='utf-8') as handle:
+        results = json.load(handle)
+    if results.get('benchmark') != 'workflows':
+        raise ValueError(f"{path} no es un archivo de resultados del benchmark de workflows")
+    return results
+
+
+def save_results(results, path):
+    """Guarda resultados (p. ej. como nueva línea base)."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2, default=str)
+
+
+def _change(baseline, current):
+    """Cambio porcentual de `baseline` a `current` (None si no hay base)."""
+    if not baseline or current is None:
+        return None
+    return round((current - baseline) / baseline * 100, 1)
+
+
+def _throughput(result):
+    """(métrica, valor) donde más es mejor: filas/s o, sin filas, ejecuciones/s."""
+    if result.get('rows_per_second'):
+        return 'rows_per_second', result['rows_per_second']
+    if result.get('wall_seconds'):
+        return 'runs_per_second', 1 / result['wall_seconds']
+    return 'rows_per_second', None
+
+
+def _step_totals(result):
+    """Segundos por nombre de paso (sumando los pasos repetidos), en orden de aparición."""
+    totals = {}
+    for step in result.get('steps') or []:
+        totals[step['name']] = totals.get(step['name'], 0.0) + step['seconds']
+    return totals
+
+
+def _step_diff(baseline, current):
+    base_steps = _step_totals(baseline)
+    current_steps = _step_totals(current)
+    names = list(current_steps) + [name for name in base_steps if name not in current_steps]
+    return [{
+        'name': name,
+        'baseline_seconds': base_steps.get(name),
+        'current_seconds': current_steps.get(name),
+        'delta_seconds': (round(current_steps[name] - base_steps[name], 4)
+                          if name in base_steps and name in current_steps else None),
+        'change_pct': _change(base_steps.get(name), current_steps.get(name))
+    } for name in names]
+
+
+def compare_results(baseline, current, max_throughput_drop=DEFAULT_MAX_THROUGHPUT_DROP,
+                    max_memory_growth=DEFAULT_MAX_MEMORY_GROWTH):
+    """Compara cada corrida (workflow, filas) de `current` con la misma corrida de `baseline`.
+
+    Args:
+        baseline (dict): Resultados de la línea base.
+        current (dict): Resultados a evaluar.
+        max_throughput_drop (float): Caída máxima permitida de filas/s, en porcentaje.
+        max_memory_growth (float): Crecimiento máximo permitido del pico de RSS, en porcentaje.
+
+    Returns:
+        dict: {
+            'regressions': número de corridas con regresión,
+            'workflows': comparación por corrida (con `reasons` y `steps`),
+            'missing': corridas de la línea base sin resultado actual,
+            'warnings': diferencias de entorno entre ambos archivos
+        }
+    """
+    base_runs = {(run['workflow'], run['rows']): run for run in baseline.get('results', [])}
+    compared = []
+    for run in current.get('results', []):
+        key = (run['workflow'], run['rows'])
+        base = base_runs.get(key)
+        if base is None:
+            continue
+
+        metric, base_throughput = _throughput(base)
+        _, current_throughput = _throughput(run)
+        throughput_change = _change(base_throughput, current_throughput)
+        memory_change = _change(base.get('peak_rss_mb'), run.get('peak_rss_mb'))
+
+        reasons = []
+        if not run.get('success'):
+            reasons.append(f"falló: {run.get('message')}")
+        if throughput_change is not None and -throughput_change > max_throughput_drop:
+            reasons.append(f"{metric} bajó {-throughput_change}% (máximo {max_throughput_drop}%)")
+        if memory_change is not None and memory_change > max_memory_growth:
+            reasons.append(f"pico de RSS creció {memory_change}% (máximo {max_memory_growth}%)")
+
+        compared.append({
+            'workflow': run['workflow'],
+            'rows': run['rows'],
+            'metric': metric,
+            'baseline_throughput': base_throughput,
+            'current_throughput': current_throughput,
+            'throughput_change_pct': throughput_change,
+            'baseline_peak_rss_mb': base.get('peak_rss_mb'),
+            'current_peak_rss_mb': run.get('peak_rss_mb'),
+            'memory_change_pct': memory_change,
+            'round_trips': (base.get('round_trips'), run.get('round_trips')),
+            'regression': bool(reasons),
+            'reasons': reasons,
+            'steps': _step_diff(base, run)
+        })
+
+    current_keys = {(run['workflow'], run['rows']) for run in current.get('results', [])}
+    warnings = [f"{key} distinto: línea base {baseline.get(key)!r}, actual {current.get(key)!r}"
+                for key in _CONTEXT_KEYS if baseline.get(key) != current.get(key)]
+    return {
+        'regressions': sum(1 for item in compared if item['regression']),
+        'workflows': compared,
+        'missing': [f'{workflow}/{rows}' for workflow, rows in base_runs if (workflow, rows) not in current_keys],
+        'warnings': warnings
+    }
+
+
+def _number(value, digits=1):
+    return '-' if value is None else f'{value:,.{digits}f}'
+
+
+def _pct(value):
+    return '' if value is None else f' ({value:+.1f}%)'
+
+
+def format_report(report, baseline, current):
+    """Reporte legible de `compare_results`: una línea por corrida y el diff de sus pasos."""
+    lines = [f"Línea base {baseline.get('commit')} ({baseline.get('created_at')}) contra "
+             f"{current.get('commit')}{' con cambios' if current.get('dirty') else ''} ({current.get('created_at')})"]
+    lines.extend(f'AVISO: {warning}' for warning in report['warnings'])
+    for item in report['workflows']:
+        status = 'REGRESIÓN' if item['regression'] else 'ok'
+        unit = 'filas/s' if item['metric'] == 'rows_per_second' else 'ejec/s'
+        lines.append('')
+        lines.append(
+            f"{item['workflow']:<7} {item['rows']:>9} filas  "
+            f"{_number(item['baseline_throughput'])} -> {_number(item['current_throughput'])} {unit}{_pct(item['throughput_change_pct'])}  "
+            f"RSS {_number(item['baseline_peak_rss_mb'])} -> {_number(item['current_peak_rss_mb'])} MB{_pct(item['memory_change_pct'])}  "
+            f"round trips {item['round_trips'][0]} -> {item['round_trips'][1]}  {status}"
+        )
+        lines.extend(f'    - {reason}' for reason in item['reasons'])
+        for step in item['steps']:
+            delta = '' if step['delta_seconds'] is None else f"{step['delta_seconds']:+.4f}s"
+            lines.append(f"    {_number(step['baseline_seconds'], 4):>10} -> {_number(step['current_seconds'], 4):>10}s "
+                         f"{delta:>11}{_pct(step['change_pct'])}  {step['name']}")
+    if report['missing']:
+        lines.append('')
+        lines.append(f"Sin resultado actual: {', '.join(report['missing'])}")
+    lines.append('')
+    lines.append(f"{report['regressions']} regresiones en {len(report['workflows'])} corridas comparadas")
+    return '\n'.join(lines)
@@ -0,0 +1,360 @@
+"""
+Generador de datos sintéticos para las tablas temporales de origen de los workflows, con las
+columnas de `utils/hana_standin_schema.sql` (las que leen los módulos de queries). Escribe
+directo en el stand-in local de HANA (`DB_DRIVER=standin`) o en archivos CSV.
+
+Distribuciones:
+- Series horarias: 24 horas por FECHA para cada BTS (`--sites` nombres como `MEX001`, con
+  IDBTSNAME `MEX001_L18A`); las llaves no se repiten dentro de una tabla y las tablas de un mismo
+  workflow comparten llaves, así que los MERGE de TLCL03 actualizan en lugar de solo insertar.
+- TLCL02: FECHA `MM/DD/YYYY` y HORA `HH:00:00` por propiedad de KPI.
+- TLCL03: TIME `YYYY-MM-DD HH:MM` y contadores de Huawei mayormente NULL o `NIL` (`--null-rate`).
+- TLCL04: TIME `MON DD YYYY` de Ericsson, HOUR 0–23 y valores como texto con espacios o `NULL`;
+  los nodos `..._NR` (5G) quedan fuera de las tablas BB, como filtra TLCL04_initial.sql.
+- `--malformed-rate`: fracción de FECHA/TIME inválidas en TLCL02 y TLCL03, cuyos transforms las
+  toleran (en TLCL04 la fecha se convierte con TO_DATE en SQL y abortaría el script, como en HANA).
+
+Las filas se generan en streaming (nunca se materializa la tabla completa) y dependen solo de la
+semilla, la tabla y los parámetros.
+
+Uso:
+    python -m benchmarks.synthetic_data --workflows TLCL02,TLCL03 --rows 1M [--csv DIR]
+                                        [--database PATH] [--seed 7] [--sites 2000]
+                                        [--malformed-rate 0.01] [--null-rate 0.6]
+"""
+
+import argparse
+import csv
+import datetime
+import functools
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+# Tablas de origen que lee cada workflow
+SOURCE_TABLES = {
+    'TLCL01': ['TELCEL_EE_TEMPELECTRICFACT'],
+    'TLCL02': ['TELCEL_EE_TEMPKPI'],
+    'TLCL03': [
+        'TELCEL_EE_TEMPWCDMAHUAWEICOUNTERS',
+        'TELCEL_EE_TEMPLTEDFEEHUAWEICOUNTERS',
+        'TELCEL_EE_TEMPLTENODEHUAWEICOUNTERS',
+        'TELCEL_EE_TEMP5GHUAWEICOUNTERS',
+    ],
+    'TLCL04': [
+        'TELCEL_EE_TEMPENERGYMETERERICSSON5G',
+        'TELCEL_EE_TEMPENERGYCONSUMEDERICSSON5G',
+        'TELCEL_EE_TEMPBBCONSUMEDENERGYMEASUREMENTERICSSON',
+        'TELCEL_EE_TEMPBBENERGYMETERERICSSON',
+        'TELCEL_EE_TEMPDUCONSUMEDENERGYMEASUREMENTERICSSON',
+        'TELCEL_EE_TEMPDUENERGYMETERERICSSON',
+        'TELCEL_EE_TEMPEUTRANERICSSON',
+    ],
+}
+
+# Valores por defecto de las distribuciones
+SITES = 2000
+NULL_RATE = 0.6
+MALFORMED_RATE = 0.0
+START_DATE = datetime.date(2024, 1, 1)
+
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_REGIONS = ('MEX', 'GDL', 'MTY', 'PUE', 'TIJ', 'CUN', 'MER', 'QRO', 'LEO', 'CHI', 'HMO', 'VER', 'OAX', 'SLP', 'AGS')
+_SECTORS = ('L07A', 'L18A', 'L18B', 'L26A', 'U19A', 'NR')
+_KPI_PROPERTIES = tuple(f'KPI_ENERGIA_{n:02d}' for n in range(40))
+_KPI_UNITS = ('kWh', 'W', '%', 'V')
+_TARIFAS = ('GDMTH', 'GDMTO', 'PDBT', 'DIST')
+_MALFORMED_MDY = ('13/45/2024', '2024-01-15', 'N/A', '02/3O/2024', '00/00/0000')
+_MALFORMED_YMD = ('2024-13-01 10:00', 'NIL', '01/15/2024 10:00', '2024-00-10 08:00', '20240115 1000')
+
+_HORAS = tuple(f'{hour:02d}:00:00' for hour in range(24))
+
+# Entradas de cada pool de valores (índices de 12 bits)
+_POOL_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=None)
+def table_columns(table):
+    """Columnas de una tabla en el orden del esquema del stand-in (sin abrir la base de datos)."""
+    from utils.hana_standin import SCHEMA_FILE
+
+    db = sqlite3.connect(':memory:')
+    try:
+        with open(SCHEMA_FILE, 'r', encoding='utf-8') as schema_file:
+            db.executescript(schema_file.read())
+        columns = [column[1] for column in db.execute(f'PRAGMA table_info("{table}")')]
+    finally:
+        db.close()
+    if not columns:
+        raise ValueError(f"Tabla desconocida en el esquema del stand-in: {table}")
+    return tuple(columns)
+
+
+def site_names(sites):
+    """Nombres de BTS (6 caracteres, región + número) e IDBTSNAME de cada sitio."""
+    names = []
+    for site in range(sites):
+        bts = f'{_REGIONS[site % len(_REGIONS)]}{site // len(_REGIONS) % 1000:03d}'
+        names.append((bts, f'{bts}_{_SECTORS[site % len(_SECTORS)]}'))
+    return names
+
+
+def _amounts(rng):
+    """(KWH, IMPORTE) de un recibo, con el importe a la tarifa media."""
+    kwh = round(rng.uniform(100, 50000), 2)
+    return kwh, round(kwh * 2.87, 2)
+
+
+class _TableGenerator:
+    """Genera las filas de una tabla recorriendo (día, hora, sitio).
+
+    Los valores aleatorios se eligen por índice de pools ya formateados (`_POOL_SIZE` entradas,
+    con la proporción de NULL pedida) en lugar de sortear y formatear cada celda.
+    """
+
+    def __init__(self, table, seed, sites, null_rate, malformed_rate):
+        self.table = table
+        self.columns = table_columns(table)
+        self.rng = random.Random(f'{seed}:{table}')
+        self.sites = site_names(sites)
+        self.null_rate = null_rate
+        self.malformed_rate = malformed_rate
+
+    def _pool(self, make, missing=()):
+        """Pool de valores en orden aleatorio.
+
+        Args:
+            make (callable): Recibe el generador aleatorio y devuelve un valor.
+            missing (tuple): Pares (valor faltante, fracción del pool), p. ej. ((None, 0.6),).
+        """
+        rng = self.rng
+        pool = []
+        for value, rate in missing:
+            pool.extend([value] * round(_POOL_SIZE * rate))
+        pool.extend(make(rng) for _ in range(_POOL_SIZE - len(pool)))
+        rng.shuffle(pool)
+        return pool
+
+    def _dates(self, text, pool):
+        """Texto de la fecha de la fila: el válido o, con `malformed_rate`, uno inválido de `pool`."""
+        if self.malformed_rate and self.rng.random() < self.malformed_rate:
+            return self.rng.choice(pool)
+        return text
+
+    def _hours(self, count, keys):
+        """(llave, hora, fecha) de las primeras `count` posiciones de una serie horaria."""
+        per_day = keys * 24
+        for day in range(-(-count // per_day)):
+            fecha = START_DATE + datetime.timedelta(days=day)
+            for hour in range(24):
+                base = day * per_day + hour * keys
+                if base >= count:
+                    return
+                for key in range(min(keys, count - base)):
+                    yield key, hour, fecha
+
+    def electricfact(self, count):
+        amount_pool = self._pool(_amounts)
+        getrandbits = self.rng.getrandbits
+        # La fecha de facturación cambia cada 1000 cuentas
+        for block in range(-(-count // 1000)):
+            fecha = START_DATE + datetime.timedelta(days=block % 730)
+            inicio, fin = fecha.isoformat(), (fecha + datetime.timedelta(days=30)).isoformat()
+            for index in range(block * 1000, min(count, block * 1000 + 1000)):
+                yield (f'{index:012d}', f'CTA{index % 99991:06d}', _TARIFAS[index % len(_TARIFAS)],
+                       fecha.month, fecha.year, inicio, fin, *amount_pool[getrandbits(12)])
+
+    def kpi(self, count):
+        valor_pool = self._pool(lambda rng: round(rng.uniform(0, 1000), 4))
+        getrandbits = self.rng.getrandbits
+        dates = self._dates if self.malformed_rate else None
+        day_text = None
+        for prop, hour, fecha in self._hours(count, len(_KPI_PROPERTIES)):
+            if prop == 0:
+                day_text = f'{fecha.month}/{fecha.day}/{fecha.year}'
+            yield (dates(day_text, _MALFORMED_MDY) if dates else day_text, _HORAS[hour], _KPI_PROPERTIES[prop],
+                   valor_pool[getrandbits(12)], _KPI_UNITS[prop % len(_KPI_UNITS)])
+
+    def huawei(self, count):
+        # LTENODE reporta 'NIL' en lugar de NULL (el script de MERGE lo reemplaza por '0')
+        missing = 'NIL' if 'LTENODE' in self.table else None
+        pool = self._pool(lambda rng: f'{rng.uniform(0, 3600):.3f}', ((missing, self.null_rate),))
+        getrandbits = self.rng.getrandbits
+        values = range(len(self.columns) - 3)
+        dates = self._dates if self.malformed_rate else None
+        time_text = None
+        for site, hour, fecha in self._hours(count, len(self.sites)):
+            if site == 0:
+                time_text = f'{fecha.isoformat()} {_HORAS[hour][:5]}'
+            yield (dates(time_text, _MALFORMED_YMD) if dates else time_text, self.sites[site][1],
+                   *[pool[getrandbits(12)] for _ in values], None)
+
+    def ericsson(self, count):
+        # Valores como texto con espacios, 'NULL' o NULL, como los entrega el Table Consumer de Ericsson
+        pool = self._pool(lambda rng: f' {rng.uniform(0, 500):.3f} ', ((None, 0.02), ('NULL', 0.05)))
+        voltage_pool = self._pool(lambda rng: f'{rng.uniform(47, 54):.1f}')
+        getrandbits = self.rng.getrandbits
+        values = range(len(self.columns) - 6)
+        time_text = None
+        for site, hour, fecha in self._hours(count, len(self.sites)):
+            if site == 0 and hour == 0:
+                time_text = f'{_MONTHS[fecha.month - 1]} {fecha.day:02d} {fecha.year}'
+            node = self.sites[site][1]
+            yield (time_text, node, hour, *[pool[getrandbits(12)] for _ in values], voltage_pool[getrandbits(12)],
+                   'Ericsson', '5G' if node.endswith('NR') else '4G')
+
+    def rows(self, count):
+        if self.table.endswith('ELECTRICFACT'):
+            return self.electricfact(count)
+        if self.table.endswith('KPI'):
+            return self.kpi(count)
+        return self.huawei(count) if 'HUAWEI' in self.table else self.ericsson(count)
+
+
+def generate_rows(table, count, seed=7, sites=SITES, null_rate=NULL_RATE, malformed_rate=MALFORMED_RATE):
+    """Genera las filas de una tabla de origen.
+
+    Args:
+        table (str): Tabla de `SOURCE_TABLES`.
+        count (int): Número de filas.
+        seed (int): Semilla de los valores aleatorios.
+        sites (int): BTS distintas por hora.
+        null_rate (float): Fracción de contadores de Huawei NULL (o `NIL`).
+        malformed_rate (float): Fracción de FECHA/TIME inválidas (TLCL02 y TLCL03).
+
+    Returns:
+        iterator: Tuplas con un valor por columna de `table_columns(table)`.
+    """
+    return _TableGenerator(table, seed, sites, null_rate, malformed_rate).rows(count)
+
+
+def load_standin(tables, rows, database=None, seed=7, **options):
+    """Reemplaza el contenido de tablas de origen del stand-in con filas sintéticas.
+
+    Args:
+        tables (list): Tablas de `SOURCE_TABLES`.
+        rows (int): Filas por tabla.
+        database (str, optional): Archivo SQLite; por defecto `STANDIN_DATABASE`.
+        seed (int): Semilla de los valores aleatorios.
+        **options: `sites`, `null_rate` y `malformed_rate` de `generate_rows`.
+
+    Returns:
+        dict: Filas cargadas por tabla.
+    """
+    from utils.config import STANDIN_CONFIG
+    from utils.hana_standin import ensure_schema
+
+    database = database or STANDIN_CONFIG['database']
+    ensure_schema(database)
+    db = sqlite3.connect(database, timeout=STANDIN_CONFIG['busy_timeout'])
+    try:
+        # La carga es regenerable: no hace falta esperar a disco en cada commit
+        db.execute('PRAGMA synchronous=OFF')
+        loaded = {}
+        for table in tables:
+            columns = table_columns(table)
+            insert = (f'INSERT INTO "{table}" ({", ".join(f"[{column}]" for column in columns)}) '
+                      f'VALUES ({", ".join("?" * len(columns))})')
+            db.execute(f'DELETE FROM "{table}"')
+            # executemany consume el generador fila por fila
+            db.executemany(insert, generate_rows(table, rows, seed, **options))
+            db.commit()
+            loaded[table] = rows
+        return loaded
+    finally:
+        db.close()
+
+
+def write_csv(tables, rows, directory, seed=7, **options):
+    """Escribe un CSV por tabla (`<directorio>/<TABLA>.csv`, con encabezado y NULL como vacío).
+
+    Returns:
+        dict: Ruta del archivo por tabla.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for table in tables:
+        path = os.path.join(directory, f'{table}.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(table_columns(table))
+            writer.writerows(generate_rows(table, rows, seed, **options))
+        paths[table] = path
+    return paths
+
+
+def clear_tables(tables, database=None):
+    """Vacía tablas del stand-in (destinos de una corrida anterior)."""
+    from utils.config import STANDIN_CONFIG
+    from utils.hana_standin import ensure_schema
+
+    database = database or STANDIN_CONFIG['database']
+    ensure_schema(database)
+    db = sqlite3.connect(database, timeout=STANDIN_CONFIG['busy_timeout'])
+    try:
+        for table in tables:
+            db.execute(f'DELETE FROM "{table}"')
+        db.commit()
+    finally:
+        db.close()
+
+
+def count_rows(tables, database=None):
+    """Filas actuales de cada tabla del stand-in."""
+    from utils.config import STANDIN_CONFIG
+
+    database = database or STANDIN_CONFIG['database']
+    db = sqlite3.connect(database, timeout=STANDIN_CONFIG['busy_timeout'])
+    try:
+        return {table: db.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+    finally:
+        db.close()
+
+
+def main():
+    from benchmarks.workflows_benchmark import parse_size
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workflows', default=','.join(SOURCE_TABLES), help='Workflows cuyas tablas de origen se generan')
+    parser.add_argument('--rows', default='100k', help='Filas por tabla (p. ej. 100k, 1M)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--sites', type=int, default=SITES, help='BTS distintas por hora')
+    parser.add_argument('--null-rate', type=float, default=NULL_RATE, help='Fracción de contadores de Huawei NULL/NIL')
+    parser.add_argument('--malformed-rate', type=float, default=MALFORMED_RATE, help='Fracción de fechas inválidas (TLCL02/TLCL03)')
+    parser.add_argument('--database', help='Archivo SQLite del stand-in (por defecto STANDIN_DATABASE)')
+    parser.add_argument('--csv', metavar='DIR', help='Escribir CSV en DIR en lugar de cargar el stand-in')
+    args = parser.parse_args()
+
+    workflows = [workflow.strip().upper() for workflow in args.workflows.split(',')]
+    unknown = [workflow for workflow in workflows if workflow not in SOURCE_TABLES]
+    if unknown:
+        parser.error(f"Workflows sin tablas de origen: {', '.join(unknown)}")
+
+    # El stand-in no necesita las variables HANA_*
+    os.environ.setdefault('DB_DRIVER', 'standin')
+    if args.database:
+        os.environ['STANDIN_DATABASE'] = args.database
+
+    rows = parse_size(args.rows)
+    options = {'sites': args.sites, 'null_rate': args.null_rate, 'malformed_rate': args.malformed_rate}
+    summary = {}
+    for workflow in workflows:
+        for table in SOURCE_TABLES[workflow]:
+            start = time.perf_counter()
+            if args.csv:
+                target = write_csv([table], rows, args.csv, args.seed, **options)[table]
+            else:
+                load_standin([table], rows, args.database, args.seed, **options)
+                target = args.database or os.environ.get('STANDIN_DATABASE') or 'STANDIN_DATABASE'
+            seconds = time.perf_counter() - start
+            summary[table] = {'rows': rows, 'seconds': round(seconds, 3),
+                              'rows_per_second': round(rows / seconds) if seconds > 0 else None, 'target': target}
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
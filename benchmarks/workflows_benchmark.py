@@ -0,0 +1,309 @@
+"""
+Benchmark de punta a punta de los endpoints de los workflows sobre el stand-in local de HANA.
+
+Para cada tamaño carga datos sintéticos en las tablas de origen (`benchmarks.synthetic_data`) y
+ejecuta TLCL01–04, COBCEN y SIR con el test client de Flask, cada uno en un proceso propio para
+que el pico de memoria sea el del workflow. Registra filas/s, tiempo total, duración de cada
+paso, pico de RSS y round trips a la base de datos en un archivo JSON comparable entre commits.
+
+Uso:
+    python -m benchmarks.workflows_benchmark [--sizes 1k,100k,1M] [--workflows TLCL02,TLCL04]
+                                             [--output benchmarks/results/workflows.json]
+                                             [--repeat 3] [--save-baseline [ARCHIVO]]
+                                             [--compare [ARCHIVO]] [--results ARCHIVO]
+                                             [--max-throughput-drop 10] [--max-memory-growth 10]
+
+Con `--compare` los resultados se comparan contra la línea base (`benchmarks.regression`) y el
+proceso termina con código 1 si algún workflow perdió filas/s o creció en memoria más de lo
+permitido; `--results` compara un archivo ya generado sin volver a ejecutar.
+
+La red simulada del stand-in se configura con `STANDIN_NETWORK` (ver README).
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+# Endpoint de cada workflow y tablas que escribe (se vacían antes de cada corrida)
+WORKFLOWS = {
+    'TLCL01': {
+        'path': '/api/TLCL01/transfer', 'json': {},
+        'targets': ['TELCEL_EE_ELECTRICFACT'],
+    },
+    'TLCL02': {
+        'path': '/api/TLCL02/transfer', 'json': None,
+        'targets': ['TELCEL_EE_KPI'],
+    },
+    'TLCL03': {
+        'path': '/api/TLCL03/merge', 'json': None,
+        'targets': ['TELCEL_EE_TEMPHUAWEICOUNTERS', 'TELCEL_EE_HUAWEICOUNTERS'],
+    },
+    'TLCL04': {
+        'path': '/api/TLCL04/transfer', 'json': None,
+        'targets': [
+            'TELCEL_EE_TEMPERICSSONCOUNTERS', 'TELCEL_EE_ERICSSONCOUNTERS',
+            'TELCEL_EE_ENERGYMETERERICSSON5G', 'TELCEL_EE_ENERGYCONSUMEDERICSSON5G',
+            'TELCEL_EE_BBCONSUMEDENERGYMEASUREMENTERICSSON', 'TELCEL_EE_BBENERGYMETERERICSSON',
+            'TELCEL_EE_DUCONSUMEDENERGYMEASUREMENTERICSSON', 'TELCEL_EE_DUENERGYMETERERICSSON',
+            'TELCEL_EE_EUTRANERICSSON',
+        ],
+    },
+    'COBCEN': {'path': '/api/COBCEN/execute', 'json': {}, 'targets': []},
+    'SIR': {'path': '/api/SIR/execute', 'json': {}, 'targets': []},
+}
+
+DEFAULT_SIZES = '1k,100k,1M'
+DEFAULT_SEED = 7
+
+_SUFFIXES = {'k': 1000, 'm': 1000000}
+
+
+def parse_size(text):
+    """Convierte '1k', '100k' o '1M' en número de filas."""
+    text = text.strip().lower()
+    if text[-1:] in _SUFFIXES:
+        return int(float(text[:-1]) * _SUFFIXES[text[-1]])
+    return int(text)
+
+
+def step_name(message):
+    """Nombre estable de un paso: sin los conteos que cambian con el tamaño de los datos."""
+    return re.sub(r'\d+', 'N', message)
+
+
+def _peak_rss_mb():
+    """Pico de RSS del proceso en MB (ru_maxrss está en KB en Linux y en bytes en macOS)."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _step_durations(job):
+    """Duración de cada paso publicado por el job, hasta el siguiente paso o el fin."""
+    marks = [event for event in job.events if event['event'] in ('step', 'end')]
+    steps = []
+    for current, following in zip(marks, marks[1:]):
+        if current['event'] == 'step':
+            steps.append({
+                'name': step_name(current['data']['message']),
+                'seconds': round(following['data']['elapsed_seconds'] - current['data']['elapsed_seconds'], 4)
+            })
+    return steps
+
+
+def run_workflow(workflow, rows):
+    """Ejecuta un workflow en este proceso con el test client (modo hijo).
+
+    Returns:
+        dict: Métricas de la corrida.
+    """
+    from app import create_app
+    from utils import hana_standin
+    from utils.jobs import job_registry
+
+    spec = WORKFLOWS[workflow]
+    client = create_app().test_client()
+    startup_rss = _peak_rss_mb()
+    hana_standin.network.reset_stats()
+
+    job_id = uuid.uuid4().hex
+    kwargs = {'headers': {'X-Job-Id': job_id}}
+    if spec['json'] is not None:
+        kwargs['json'] = spec['json']
+    start = time.perf_counter()
+    response = client.post(spec['path'], **kwargs)
+    wall = time.perf_counter() - start
+
+    body = response.get_json(silent=True) or {}
+    job = job_registry.get(job_id)
+    network = hana_standin.network.stats()
+    return {
+        'workflow': workflow,
+        'rows': rows,
+        'status_code': response.status_code,
+        'success': bool(body.get('success') or body.get('status') == 'success'),
+        'message': body.get('message'),
+        'wall_seconds': round(wall, 4),
+        'rows_per_second': round(rows / wall, 1) if rows and wall > 0 else None,
+        'startup_rss_mb': startup_rss,
+        'peak_rss_mb': _peak_rss_mb(),
+        'round_trips': network['round_trips'],
+        'network': network,
+        'steps': _step_durations(job) if job else []
+    }
+
+
+def _child(workflow, rows, env):
+    """Corre `run_workflow` en un proceso nuevo y devuelve sus métricas."""
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as result_file:
+        result_path = result_file.name
+    try:
+        command = [sys.executable, '-m', 'benchmarks.workflows_benchmark',
+                   '--child', workflow, '--rows', str(rows), '--result-file', result_path]
+        # Los workflows imprimen su progreso; el resultado viaja por archivo
+        completed = subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if completed.returncode != 0:
+            return {'workflow': workflow, 'rows': rows, 'success': False,
+                    'message': f'El proceso terminó con código {completed.returncode}: {completed.stderr[-2000:]}'}
+        with open(result_path, 'r', encoding='utf-8') as handle:
+            return json.load(handle)
+    finally:
+        os.remove(result_path)
+
+
+def _git_commit():
+    """Commit actual (y si hay cambios sin confirmar), o None fuera de un repositorio."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def _benchmark_env(database):
+    """Variables de entorno de los procesos del benchmark: stand-in, sin prober ni presupuestos."""
+    env = dict(os.environ, DB_DRIVER='standin', STANDIN_DATABASE=database, HEALTH_PROBE_INTERVAL='0',
+               TIME_BUDGET_SYNC='0', TIME_BUDGET_DEFAULT='0')
+    for workflow in WORKFLOWS:
+        env[f'TIME_BUDGET_{workflow}'] = '0'
+    return env
+
+
+def _run_rank(result):
+    """Orden de preferencia entre corridas repetidas: cualquier exitosa antes que una fallida, luego la más rápida."""
+    return (not result.get('success'), result.get('wall_seconds', float('inf')))
+
+
+def run_benchmark(args, sizes, workflows):
+    """Carga los datos y ejecuta cada workflow en cada tamaño.
+
+    Con `--repeat` se conserva, por workflow y tamaño, la corrida exitosa de menor tiempo total
+    (una fallida solo si ninguna tuvo éxito).
+
+    Returns:
+        dict: Resultados con el contexto de la corrida (commit, red simulada, datos).
+    """
+    env = _benchmark_env(args.database)
+    os.environ.update(env)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(args.database + suffix):
+            os.remove(args.database + suffix)
+
+    # La configuración del stand-in se lee al importar: después de fijar el entorno
+    from benchmarks.synthetic_data import MALFORMED_RATE, SITES, SOURCE_TABLES, clear_tables, count_rows, load_standin
+    from utils.config import STANDIN_CONFIG
+
+    data = {'sites': args.sites or SITES,
+            'malformed_rate': MALFORMED_RATE if args.malformed_rate is None else args.malformed_rate}
+
+    commit, dirty = _git_commit()
+    results = []
+    for size in sizes:
+        for workflow in workflows:
+            spec = WORKFLOWS[workflow]
+            sources = SOURCE_TABLES.get(workflow, [])
+            best = None
+            for _ in range(max(args.repeat, 1)):
+                clear_tables(spec['targets'], args.database)
+                start = time.perf_counter()
+                if sources:
+                    load_standin(sources, -(-size // len(sources)), args.database, args.seed, **data)
+                seed_seconds = time.perf_counter() - start
+
+                result = _child(workflow, size if sources else 0, env)
+                result['seed_seconds'] = round(seed_seconds, 3)
+                result['rows_written'] = count_rows(spec['targets'], args.database)
+                if best is None or _run_rank(result) < _run_rank(best):
+                    best = result
+            results.append(best)
+            print(f"{workflow:<7} {size:>9} filas  {best.get('wall_seconds', '-'):>9}s  "
+                  f"{best.get('rows_per_second') or '-':>10} filas/s  RSS {best.get('peak_rss_mb', '-')} MB  "
+                  f"round trips {best.get('round_trips', '-')}  {'ok' if best.get('success') else 'ERROR'}",
+                  file=sys.stderr)
+
+    return {
+        'benchmark': 'workflows',
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'repeat': max(args.repeat, 1),
+        'data': data,
+        'network': {key: STANDIN_CONFIG[key] for key in
+                    ('network', 'connect_ms', 'latency_ms', 'jitter_ms', 'row_cost_us', 'fetch_size')},
+        'results': results
+    }
+
+
+def main():
+    from benchmarks import regression
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Filas de origen por workflow (p. ej. 1k,100k,1M)')
+    parser.add_argument('--workflows', default=','.join(WORKFLOWS), help='Workflows a medir')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--sites', type=int, help='BTS distintas por hora en los datos sintéticos')
+    parser.add_argument('--malformed-rate', type=float, help='Fracción de fechas inválidas (TLCL02/TLCL03)')
+    parser.add_argument('--repeat', type=int, default=1, help='Corridas por workflow y tamaño (se conserva la más rápida de las exitosas)')
+    parser.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'tlcl_benchmark.db'),
+                        help='Archivo SQLite del stand-in (se recrea)')
+    parser.add_argument('--output', help='Archivo de resultados (por defecto benchmarks/results/workflows_<commit>.json)')
+    parser.add_argument('--results', help='Usar un archivo de resultados existente en lugar de ejecutar el benchmark')
+    parser.add_argument('--compare', nargs='?', const=regression.DEFAULT_BASELINE, metavar='BASELINE',
+                        help=f'Comparar contra una línea base (por defecto {regression.DEFAULT_BASELINE})')
+    parser.add_argument('--save-baseline', nargs='?', const=regression.DEFAULT_BASELINE, metavar='BASELINE',
+                        help='Guardar los resultados como línea base')
+    parser.add_argument('--max-throughput-drop', type=float, default=regression.DEFAULT_MAX_THROUGHPUT_DROP,
+                        help='Caída máxima de filas/s permitida, en %%')
+    parser.add_argument('--max-memory-growth', type=float, default=regression.DEFAULT_MAX_MEMORY_GROWTH,
+                        help='Crecimiento máximo del pico de RSS permitido, en %%')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--rows', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.result_file, 'w', encoding='utf-8') as handle:
+            json.dump(run_workflow(args.child, args.rows), handle, default=str)
+        return 0
+
+    if args.results:
+        current = regression.load_results(args.results)
+    else:
+        sizes = [parse_size(size) for size in args.sizes.split(',')]
+        workflows = [workflow.strip().upper() for workflow in args.workflows.split(',')]
+        unknown = [workflow for workflow in workflows if workflow not in WORKFLOWS]
+        if unknown:
+            parser.error(f"Workflows desconocidos: {', '.join(unknown)}")
+        current = run_benchmark(args, sizes, workflows)
+        output = args.output or os.path.join('benchmarks', 'results', f"workflows_{current['commit'] or 'local'}.json")
+        regression.save_results(current, output)
+        print(f"Resultados en {output}", file=sys.stderr)
+
+    exit_code = 0 if all(result.get('success') for result in current['results']) else 1
+    if args.compare:
+        baseline = regression.load_results(args.compare)
+        report = regression.compare_results(baseline, current, args.max_throughput_drop, args.max_memory_growth)
+        print(regression.format_report(report, baseline, current))
+        if report['regressions']:
+            exit_code = 1
+    if args.save_baseline:
+        regression.save_results(current, args.save_baseline)
+        print(f"Línea base guardada en {args.save_baseline}", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
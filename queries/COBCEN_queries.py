@@ -4,8 +4,10 @@ Incluye utilidades para ejecutar el stored procedure SP_TLCL_COBCEN.
 """
 
 import logging
-from utils.config import DB_CONFIG
+from utils.sp_executor import sp_executor, sp_response
+from utils.tracing import trace_methods
 
+@trace_methods
 class COBCENQueries:
     """Clase para gestionar las consultas específicas del proceso COBCEN."""
     
@@ -29,51 +31,17 @@ class COBCENQueries:
             dict: Resultado de la ejecución del stored procedure con flag y mensaje.
         """
         try:
-            schema = DB_CONFIG['schema']
-            cursor = self.connection.cursor
+            # Una sola llamada armada con la firma cacheada del SP (IN/OUT)
+            execution = sp_executor.execute(self.connection, 'SP_TLCL_COBCEN', (param1, param2))
+            # Conserva el contrato previo: `data.response`, mensaje del SP si falla y fallo si no devuelve fila
+            result = sp_response(execution, 'Procedimiento COBCEN ejecutado correctamente',
+                                 require_flag=True, response_key='response', error_from_sp=True)
             
-            # Ejecutar el stored procedure
-            cursor.execute(f"CALL {schema}.SP_TLCL_COBCEN(?, ?)", (param1, param2))
-            
-            try:
-                # Intentar obtener el resultado
-                result = cursor.fetchone()
-                if result:
-                    flag = result[0] if len(result) > 0 else 0
-                    mensaje_error = result[1] if len(result) > 1 else "Sin mensaje"
-                    
-                    self.logger.info(f"SP_TLCL_COBCEN ejecutado - Flag: {flag}, Mensaje: {mensaje_error}")
-                    
-                    # Determinar éxito basado en el flag
-                    success = flag == 1
-                    
-                    return {
-                        'success': success,
-                        'message': mensaje_error if not success else "Procedimiento COBCEN ejecutado correctamente",
-                        'data': {
-                            'flag': flag,
-                            'mensaje_error': mensaje_error,
-                            'response': result
-                        }
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'message': 'No se obtuvo respuesta del stored procedure',
-                        'data': None
-                    }
-            except Exception as no_result_error:
-                # Si no hay result set, consideramos que se ejecutó correctamente
-                self.logger.info(f"SP_TLCL_COBCEN ejecutado sin result set: {str(no_result_error)}")
-                return {
-                    'success': True,
-                    'message': 'Procedimiento COBCEN ejecutado correctamente',
-                    'data': {
-                        'flag': 1,
-                        'mensaje_error': 'Procedimiento ejecutado correctamente',
-                        'response': None
-                    }
-                }
+            if result['data'] is None:
+                self.logger.warning(f"SP_TLCL_COBCEN ejecutado sin respuesta: {result['message']}")
+            else:
+                self.logger.info(f"SP_TLCL_COBCEN ejecutado - Flag: {result['data']['flag']}, Mensaje: {result['data']['mensaje_error']}")
+            return result
                 
         except Exception as e:
             self.logger.error(f"Error ejecutando SP_TLCL_COBCEN: {str(e)}")
@@ -82,6 +50,3 @@ class COBCENQueries:
                 'message': f'Error al ejecutar stored procedure COBCEN: {str(e)}',
                 'data': None
             }
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
\ No newline at end of file
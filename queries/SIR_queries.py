@@ -4,8 +4,10 @@ Incluye utilidades para ejecutar stored procedures relacionados con SIR.
 """
 
 import logging
-from utils.config import DB_CONFIG
+from utils.sp_executor import sp_executor, sp_response
+from utils.tracing import trace_methods
 
+@trace_methods
 class SIRQueries:
     """Clase para gestionar las consultas del proceso SIR."""
     
@@ -27,62 +29,12 @@ class SIRQueries:
         try:
             self.logger.info("Ejecutando stored procedure SP_TLCL_SIR")
             
-            cursor = self.connection.cursor
-            
-            # Usar el esquema desde la configuración
-            schema = DB_CONFIG['schema']
-            
-            # Llamada directa igual que en DBeaver
-            cursor.execute(f"CALL {schema}.SP_TLCL_SIR(?, ?)", (param1, param2))
-            
+            # Una sola llamada armada con la firma cacheada del SP (IN/OUT)
+            execution = sp_executor.execute(self.connection, 'SP_TLCL_SIR', (param1, param2))
+            result = sp_response(execution)
             
-            # Intentar obtener resultado si el SP devuelve algo
-            try:
-                result = cursor.fetchone()
-                if result:
-                    # El SP devuelve un flag y un mensaje
-                    flag = result[0] if len(result) > 0 else None
-                    mensaje_error = result[1] if len(result) > 1 else None
-                    
-                    self.logger.info(f"Respuesta del SP - Flag: {flag}, Mensaje: {mensaje_error}")
-                    
-                    # Determinar si fue exitoso basado en el flag
-                    success = flag == 1 if flag is not None else True
-                    
-                    return {
-                        'success': success,
-                        'message': 'Stored procedure ejecutado exitosamente' if success else 'Error en stored procedure',
-                        'data': {
-                            'flag': flag,
-                            'mensaje_error': mensaje_error,
-                            'respuesta_completa': result
-                        }
-                    }
-                else:
-                    # No hay resultado
-                    self.logger.info("SP ejecutado sin resultado")
-                    return {
-                        'success': True,
-                        'message': 'Stored procedure ejecutado correctamente',
-                        'data': {
-                            'flag': None,
-                            'mensaje_error': 'Sin respuesta del SP'
-                        }
-                    }
-            except Exception as e:
-                # Si el SP no devuelve result set, es normal
-                if "No result set" in str(e):
-                    self.logger.info("SP ejecutado correctamente (sin result set)")
-                    return {
-                        'success': True,
-                        'message': 'Stored procedure ejecutado correctamente',
-                        'data': {
-                            'flag': None,
-                            'mensaje_error': 'SP ejecutado sin devolver datos'
-                        }
-                    }
-                else:
-                    raise e
+            self.logger.info(f"Respuesta del SP - Flag: {result['data']['flag']}, Mensaje: {result['data']['mensaje_error']}")
+            return result
             
         except Exception as e:
             self.logger.error(f"Error al ejecutar stored procedure: {str(e)}")
@@ -123,7 +75,8 @@ class SIRQueries:
                     'name': result[0],
                     'schema': result[1],
                     'type': result[2],
-                    'create_time': result[3].isoformat() if result[3] else None
+                    'create_time': result[3].isoformat() if result[3] else None,
+                    'parameters': sp_executor.get_signature(self.connection, 'SP_TLCL_SIR', result[1])
                 }
                 
                 return {
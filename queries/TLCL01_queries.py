@@ -1,11 +1,15 @@
 from sqlite3 import Cursor
-from utils.config import DB_CONFIG
-try:
-    # Importar hdbcli si está disponible para soportar OUT parameters vía callproc
-    from hdbcli import dbapi as hana_dbapi
-except Exception:
-    hana_dbapi = None
-
+from utils.config import BULK_CONFIG, DB_CONFIG
+from utils.bulk_writer import BulkWriter
+from utils.columnar import ColumnarBatch
+from utils.converters import compile_table_converters
+from utils.date_fields import date_memo, memo_summary, new_run_stats
+from utils.metrics import metrics
+from utils.record_counts import record_counts
+from utils.sp_executor import sp_executor, sp_response
+from utils.tracing import trace_methods
+
+@trace_methods
 class TLCL01Queries:
     """
     Clase para gestionar las consultas del proceso TLCL01 - Electric Fact.
@@ -15,6 +19,10 @@ class TLCL01Queries:
 
     def __init__(self, connection):
         self.connection = connection
+        # Estadísticas del último Table Producer (lotes elegidos, throughput)
+        self.last_write_stats = None
+        # Aciertos del memo de derivaciones de fecha en el último Data Transform
+        self.last_memo_stats = None
 
     def get_table_columns(self, table_name):
         """Obtiene las columnas de una tabla específica."""
@@ -38,6 +46,9 @@ class TLCL01Queries:
         """
         Obtiene datos de la tabla temporal TELCEL_EE_TEMPELECTRICFACT.
         Equivalente al Table Consumer (tableconsumer1) del graph SAP DI.
+
+        Returns:
+            ColumnarBatch: Datos por columna, o None si ocurre un error.
         """
         try:
             cursor = self.connection.cursor
@@ -48,63 +59,50 @@ class TLCL01Queries:
             query = f'SELECT * FROM "{DB_CONFIG["schema"]}"."TELCEL_EE_TEMPELECTRICFACT"'
             cursor.execute(query)
             raw_data = cursor.fetchall()
+            metrics.inc('tlcl_table_rows_total', len(raw_data), table='TELCEL_EE_TEMPELECTRICFACT', operation='read')
 
-            data = []
-            for row in raw_data:
-                # Convertir cada valor a tipo básico de Python
-                converted_row = []
-                for value in row:
-                    if value is None:
-                        converted_row.append(None)
-                    elif hasattr(value, 'isoformat'):  # datetime objects
-                        converted_row.append(value.isoformat())
-                    else:
-                        converted_row.append(str(value) if value is not None else None)
-                data.append(converted_row)
-
-            return columns, data
+            # Conversores por columna compilados de SYS.TABLE_COLUMNS (cacheados por tabla):
+            # solo se convierte a texto donde el destino es texto
+            converters = compile_table_converters(self.connection, columns, 'TELCEL_EE_TEMPELECTRICFACT', 'TELCEL_EE_ELECTRICFACT')
+            return ColumnarBatch.from_rows(columns, raw_data, converters)
         except Exception as e:
             print(f"Error al obtener datos de TELCEL_EE_TEMPELECTRICFACT: {e}")
             return None
 
-    def transform_data_with_mesanio(self, columns, data):
+    def transform_data_with_mesanio(self, batch):
         """
         Aplica la transformación de datos agregando el campo MESANIO.
         Equivalente al Data Transform (datatransform1) del graph SAP DI.
         
         MESANIO se calcula como: MESFACENC (2 dígitos) + "." + ANIOFACENC
         Ejemplo: Si MESFACENC=3 y ANIOFACENC=2024, entonces MESANIO="03.2024"
+
+        Args:
+            batch (ColumnarBatch): Datos de la tabla temporal.
+
+        Returns:
+            ColumnarBatch: El mismo lote con la columna MESANIO agregada, o None si ocurre un error.
         """
         try:
-            # Encontrar índices de las columnas necesarias
-            mesfacenc_idx = columns.index('MESFACENC') if 'MESFACENC' in columns else None
-            aniofacenc_idx = columns.index('ANIOFACENC') if 'ANIOFACENC' in columns else None
-            
-            if mesfacenc_idx is None or aniofacenc_idx is None:
+            if 'MESFACENC' not in batch or 'ANIOFACENC' not in batch:
                 print("Error: No se encontraron las columnas MESFACENC o ANIOFACENC")
                 return None
 
-            # Agregar MESANIO a las columnas
-            transformed_columns = columns + ['MESANIO']
-            transformed_data = []
-
-            for row in data:
-                # Crear MESANIO: formato MM.YYYY
-                mesfacenc = row[mesfacenc_idx]
-                aniofacenc = row[aniofacenc_idx]
-                
-                if mesfacenc is not None and aniofacenc is not None:
-                    # Asegurar que el mes tenga 2 dígitos
-                    mes_formatted = str(mesfacenc).zfill(2)
-                    mesanio = f"{mes_formatted}.{aniofacenc}"
-                else:
-                    mesanio = None
-
-                # Agregar MESANIO al final de la fila
-                transformed_row = list(row) + [mesanio]
-                transformed_data.append(transformed_row)
-
-            return transformed_columns, transformed_data
+            # MESANIO se calcula una vez por par (MESFACENC, ANIOFACENC) distinto, con el memo
+            # compartido de derivaciones de fecha: formato MM.YYYY. La llave es el texto de cada
+            # valor (Decimal('3') y Decimal('3.0') son iguales pero no se formatean igual)
+            pairs = [
+                (str(mesfacenc), str(aniofacenc)) if mesfacenc is not None and aniofacenc is not None else None
+                for mesfacenc, aniofacenc in zip(batch.column('MESFACENC'), batch.column('ANIOFACENC'))
+            ]
+            stats = new_run_stats()
+            mesanio_by_pair = date_memo.resolve('MESANIO', pairs, lambda missing: {
+                pair: f"{pair[0].zfill(2)}.{pair[1]}" if pair is not None else None
+                for pair in missing
+            }, stats)
+            batch.add_column('MESANIO', [mesanio_by_pair[pair] for pair in pairs])
+            self.last_memo_stats = memo_summary(stats)
+            return batch
         except Exception as e:
             print(f"Error en la transformación de datos: {e}")
             return None
@@ -113,30 +111,25 @@ class TLCL01Queries:
         """Obtiene las columnas de la tabla destino TELCEL_EE_ELECTRICFACT."""
         return self.get_table_columns('TELCEL_EE_ELECTRICFACT')
 
-    def upsert_electric_fact_data(self, columns, data):
+    def upsert_electric_fact_data(self, batch):
         """
         Realiza INSERT en la tabla TELCEL_EE_ELECTRICFACT.
         Equivalente al Table Producer (tableproducer1) del graph SAP DI.
         
         NOTA: Cambiado de UPSERT a INSERT para permitir múltiples registros
         con el mismo MESANIO pero diferentes CLRPU.
+
+        Args:
+            batch (ColumnarBatch): Datos transformados.
         """
         try:
-            cursor = self.connection.cursor
-            
             # Obtener columnas de la tabla destino
             target_columns = self.get_electric_fact_table_columns()
             if not target_columns:
                 return False
 
             # Filtrar solo las columnas que existen en la tabla destino
-            valid_columns = []
-            valid_indices = []
-            
-            for i, col in enumerate(columns):
-                if col in target_columns:
-                    valid_columns.append(col)
-                    valid_indices.append(i)
+            valid_columns = [col for col in batch.columns if col in target_columns]
 
             if not valid_columns:
                 print("Error: No hay columnas válidas para insertar")
@@ -157,25 +150,16 @@ class TLCL01Queries:
             VALUES ({placeholders})
             """
 
-            # Preparar los datos para inserción
-            insert_data = []
-            for row in data:
-                filtered_row = [row[i] for i in valid_indices]
-                insert_data.append(filtered_row)
+            # Las filas se arman solo aquí, con las columnas válidas
+            insert_data = batch.rows(valid_columns)
 
-            # Ejecutar UPSERT por lotes
-            batch_size = 1000
-            total_processed = 0
-            
-            for i in range(0, len(insert_data), batch_size):
-                batch = insert_data[i:i + batch_size]
-                cursor.executemany(insert_query, batch)
-                total_processed += len(batch)
-                
-                # Commit cada lote
-                self.connection.connection.commit()
-
-            print(f"INSERT completado: {total_processed} registros procesados")
+            # Ejecutar INSERT por lotes de tamaño adaptativo (por defecto commit cada lote)
+            writer = BulkWriter(self.connection, insert_query, 'TELCEL_EE_ELECTRICFACT',
+                                commit=BULK_CONFIG['commit_policies']['TLCL01'])
+            self.last_write_stats = writer.write(insert_data)
+
+            record_counts.invalidate(['TELCEL_EE_ELECTRICFACT'])
+            print(f"INSERT completado: {self.last_write_stats['rows_written']} registros procesados")
             return True
 
         except Exception as e:
@@ -193,6 +177,7 @@ class TLCL01Queries:
             truncate_query = f'TRUNCATE TABLE "{DB_CONFIG["schema"]}"."TELCEL_EE_TEMPELECTRICFACT"'
             cursor.execute(truncate_query)
             self.connection.connection.commit()
+            record_counts.invalidate(['TELCEL_EE_TEMPELECTRICFACT'])
             print("Tabla temporal TELCEL_EE_TEMPELECTRICFACT truncada exitosamente")
             return True
         except Exception as e:
@@ -200,30 +185,45 @@ class TLCL01Queries:
             self.connection.connection.rollback()
             return False
 
-    def get_electric_fact_count(self):
-        """Obtiene el conteo de registros en la tabla TELCEL_EE_ELECTRICFACT."""
+    def get_electric_fact_count(self, exact=False):
+        """Obtiene el conteo de registros en la tabla TELCEL_EE_ELECTRICFACT.
+
+        Args:
+            exact (bool): True para COUNT(*); por defecto usa RECORD_COUNT de M_TABLES.
+        """
         try:
-            cursor = self.connection.cursor
-            query = f'SELECT COUNT(*) FROM "{DB_CONFIG["schema"]}"."TELCEL_EE_ELECTRICFACT"'
-            cursor.execute(query)
-            count = cursor.fetchone()[0]
-            return count
+            return record_counts.get_counts(self.connection, ['TELCEL_EE_ELECTRICFACT'], exact)['TELCEL_EE_ELECTRICFACT']
         except Exception as e:
             print(f"Error al obtener conteo de TELCEL_EE_ELECTRICFACT: {e}")
             return None
 
-    def get_temp_electric_fact_count(self):
-        """Obtiene el conteo de registros en la tabla temporal."""
+    def get_temp_electric_fact_count(self, exact=False):
+        """Obtiene el conteo de registros en la tabla temporal.
+
+        Args:
+            exact (bool): True para COUNT(*); por defecto usa RECORD_COUNT de M_TABLES.
+        """
         try:
-            cursor = self.connection.cursor
-            query = f'SELECT COUNT(*) FROM "{DB_CONFIG["schema"]}"."TELCEL_EE_TEMPELECTRICFACT"'
-            cursor.execute(query)
-            count = cursor.fetchone()[0]
-            return count
+            return record_counts.get_counts(self.connection, ['TELCEL_EE_TEMPELECTRICFACT'], exact)['TELCEL_EE_TEMPELECTRICFACT']
         except Exception as e:
             print(f"Error al obtener conteo de TELCEL_EE_TEMPELECTRICFACT: {e}")
             return None
 
+    def get_record_counts(self, exact=False):
+        """Obtiene en una sola consulta los conteos de las tablas temporal y destino.
+
+        Args:
+            exact (bool): True para COUNT(*); por defecto usa RECORD_COUNT de M_TABLES.
+
+        Returns:
+            dict: {tabla: conteo} o None si ocurre un error.
+        """
+        try:
+            return record_counts.get_counts(self.connection, ['TELCEL_EE_TEMPELECTRICFACT', 'TELCEL_EE_ELECTRICFACT'], exact)
+        except Exception as e:
+            print(f"Error al obtener conteos de TLCL01: {e}")
+            return None
+
     def execute_SP_TLCL_01_sp(self,  param1=0, param2=''):
         """
         Ejecuta el stored procedure SP_TLCL_01 que encapsula todo el proceso TLCL01.
@@ -232,80 +232,10 @@ class TLCL01Queries:
             dict: Resultado de la ejecución del stored procedure.
         """
         try:
-            cursor = self.connection.cursor
-            schema = DB_CONFIG['schema']
-
-            # 1) Intento 1: llamada directa tipo CALL con parámetros de entrada
-            cursor.execute(f"CALL {schema}.SP_TLCL_01(?, ?)", (param1, param2))
-
-            # Intentar obtener resultado si el SP devuelve algo
-            try:
-                result = cursor.fetchone()
-                if result:
-                    flag = result[0] if len(result) > 0 else None
-                    mensaje_error = result[1] if len(result) > 1 else None
-
-                    success = flag == 1 if flag is not None else True
-
-                    return {
-                        'success': success,
-                        'message': 'Stored procedure ejecutado exitosamente' if success else 'Error en stored procedure',
-                        'data': {
-                            'flag': flag,
-                            'mensaje_error': mensaje_error,
-                            'respuesta_completa': result
-                        }
-                    }
-                else:
-                    # Sin result set: intentamos capturar OUT params (SUCCESS_FLAG, MESSAGE)
-                    raise Exception('No result set')
-            except Exception as e:
-                # Caso común: el SP no devuelve result set, intentar OUT params con callproc
-                if hana_dbapi is not None:
-                    try:
-                        # 2) Intento 2: usar callproc con IN params + OUT params
-                        # En hdbcli, los OUT params se pasan como None y el driver los rellena
-                        proc_params = [param1, param2, None, None]
-                        proc_result = cursor.callproc(f"{schema}.SP_TLCL_01", proc_params)
-
-                        # Algunas implementaciones devuelven None y actualizan proc_params
-                        if proc_result is None:
-                            proc_result = proc_params
-
-                        # Los dos últimos elementos deberían ser los OUT params
-                        flag = proc_result[-2] if len(proc_result) >= 2 else None
-                        mensaje_error = proc_result[-1] if len(proc_result) >= 2 else None
-
-                        success = flag == 1 if flag is not None else True
-
-                        return {
-                            'success': success,
-                            'message': 'Stored procedure ejecutado correctamente',
-                            'data': {
-                                'flag': flag,
-                                'mensaje_error': mensaje_error
-                            }
-                        }
-                    except Exception as ce:
-                        # No se pudieron capturar OUT params
-                        return {
-                            'success': True,
-                            'message': 'Stored procedure ejecutado correctamente (sin datos del SP)',
-                            'data': {
-                                'flag': None,
-                                'mensaje_error': str(ce)
-                            }
-                        }
-                else:
-                    # Cliente HANA no disponible; no se puede capturar OUT params
-                    return {
-                        'success': True,
-                        'message': 'Stored procedure ejecutado correctamente',
-                        'data': {
-                            'flag': None,
-                            'mensaje_error': 'SP ejecutado sin devolver datos (instalar hdbcli para OUT params)'
-                        }
-                    }
+            # Una sola llamada armada con la firma cacheada del SP: los OUT (flag, mensaje)
+            # se piden con callproc solo si SYS.PROCEDURE_PARAMETERS los declara
+            execution = sp_executor.execute(self.connection, 'SP_TLCL_01', (param1, param2))
+            return sp_response(execution)
 
         except Exception as e:
             return {
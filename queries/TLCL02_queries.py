@@ -1,10 +1,21 @@
 from sqlite3 import Cursor
-from utils.config import DB_CONFIG
-
+from utils.config import BULK_CONFIG, DB_CONFIG
+from utils.bulk_writer import BulkWriter
+from utils.columnar import ColumnarBatch
+from utils.converters import compile_table_converters
+from utils.date_fields import LAYOUT_MDY, derive_date_fields, summarize
+from utils.metrics import metrics
+from utils.tracing import trace_methods
+
+@trace_methods
 class TLCL02Queries:
 
     def __init__(self, connection):
         self.connection = connection
+        # Estadísticas del último Table Producer (lotes elegidos, throughput)
+        self.last_write_stats = None
+        # Resumen de la última derivación de campos de fecha (válidas, errores, fechas distintas)
+        self.last_date_stats = None
 
     def get_table_columns(self, table_name):
         try:
@@ -33,21 +44,13 @@ class TLCL02Queries:
             query = f"SELECT * FROM \"{DB_CONFIG['schema']}\".\"TELCEL_EE_TEMPKPI\""
             cursor.execute(query)
             raw_data = cursor.fetchall()
+            metrics.inc('tlcl_table_rows_total', len(raw_data), table='TELCEL_EE_TEMPKPI', operation='read')
 
-            data = []
-            for row in raw_data:
-                # Convertir cada valor a tipo básico de Python
-                converted_row = []
-                for value in row:
-                    if value is None:
-                        converted_row.append(None)
-                    elif hasattr(value, 'isoformat'):  # datetime objects
-                        converted_row.append(value.isoformat())
-                    else:
-                        converted_row.append(str(value) if value is not None else None)
-                data.append(converted_row)
-
-            return columns, data
+            # Conversores por columna compilados de SYS.TABLE_COLUMNS (cacheados por tabla):
+            # solo se convierte a texto donde el destino es texto o donde el transform
+            # de fechas lee FECHA como cadena
+            converters = compile_table_converters(self.connection, columns, 'TELCEL_EE_TEMPKPI', 'TELCEL_EE_KPI', text_columns=('FECHA',))
+            return ColumnarBatch.from_rows(columns, raw_data, converters)
         except Exception as e:
             print(f"Error al obtener datos de KPI temporal")
             return None
@@ -104,79 +107,33 @@ class TLCL02Queries:
             'has_calculated_fields': has_calculated_fields,
             'columns_match': columns_match
         }
-    
-    def calculate_date_fields(self, fecha):
-        """Extrae los campos ANIO, MES, DIA y MESANIO basado en el campo FECHA.
-        
+
+    def add_date_fields(self, batch):
+        """Agrega ANIO, MES, DIA y MESANIO al lote a partir de la columna FECHA.
+
+        Los campos se derivan en bloque (`utils.date_fields`): una vez por fecha distinta y sin
+        un print por fila inválida. En las filas con FECHA vacía o inválida quedan en NULL; el
+        resumen (filas válidas, errores, fechas distintas) queda en `last_date_stats`.
+
         Args:
-            fecha: Valor de fecha en formato MM/DD/YYYY (ejemplo: 07/04/2025).
-            
+            batch (ColumnarBatch): Datos de la tabla temporal.
+
         Returns:
-            dict: Diccionario con los campos extraídos:
-                - ANIO: Año (YYYY)
-                - MES: Mes (MM)
-                - DIA: Día (DD)
-                - MESANIO: Mes y año en formato MM.YYYY
-            None si hay error en el procesamiento.
+            ColumnarBatch: El mismo lote con las columnas calculadas.
         """
-        try:
-            # Validar que la fecha no esté vacía
-            if not fecha or fecha.strip() == '':
-                print("Error: Campo FECHA está vacío")
-                return None
-            
-            # Dividir la fecha por el separador '/'
-            fecha_parts = str(fecha).strip().split('/')
-            
-            # Validar que tenga exactamente 3 partes
-            if len(fecha_parts) != 3:
-                print(f"Error: Formato de fecha inválido. Esperado MM/DD/YYYY, recibido: {fecha}")
-                return None
-            
-            # Extraer mes, día y año
-            mes_str, dia_str, anio_str = fecha_parts
-            
-            # Convertir a enteros para validación
-            mes = int(mes_str)
-            dia = int(dia_str)
-            anio = int(anio_str)
-            
-            # Validar rangos
-            if not (1 <= mes <= 12):
-                print(f"Error: Mes inválido ({mes}). Debe estar entre 1 y 12")
-                return None
-            
-            if not (1 <= dia <= 31):
-                print(f"Error: Día inválido ({dia}). Debe estar entre 1 y 31")
-                return None
-            
-            if anio < 1900 or anio > 2100:
-                print(f"Error: Año inválido ({anio}). Debe estar entre 1900 y 2100")
-                return None
-            
-            # Formatear los campos
-            mes_formatted = f"{mes:02d}"
-            dia_formatted = f"{dia:02d}"
-            anio_formatted = str(anio)
-            mesanio = f"{mes:02d}.{anio}"
-            
-            return {
-                'ANIO': anio_formatted,
-                'MES': mes_formatted,
-                'DIA': dia_formatted,
-                'MESANIO': mesanio
-            }
-            
-        except (ValueError, TypeError, IndexError) as e:
-            print(f"Error al procesar fecha '{fecha}': {e}")
-            return None
-
-    def insert_kpi_data(self, temp_data, temp_columns, target_columns):
+        derived = derive_date_fields(batch.column('FECHA'), LAYOUT_MDY)
+        # ANIO, MES y DIA van después de HORA y MESANIO al final, como en el graph original
+        for position, field in enumerate(['ANIO', 'MES', 'DIA'], start=2):
+            batch.add_column(field, derived['columns'][field], position)
+        batch.add_column('MESANIO', derived['columns']['MESANIO'])
+        self.last_date_stats = summarize(derived)
+        return batch
+
+    def insert_kpi_data(self, batch, target_columns):
         """Realiza un upsert (insert o update) de los datos de la tabla temporal en la tabla final.
         
         Args:
-            temp_data (list): Datos de la tabla temporal.
-            temp_columns (list): Columnas de la tabla temporal.
+            batch (ColumnarBatch): Datos de la tabla temporal con los campos de fecha calculados.
             target_columns (list): Columnas de la tabla destino.
             
         Returns:
@@ -184,10 +141,9 @@ class TLCL02Queries:
         """
         try:
             # print('Hola desde el insert')
-            cursor = self.connection.cursor
-            
+
             # Obtener columnas comunes (excluyendo campos calculados que se agregan después)
-            common_columns = [col for col in temp_columns if col in target_columns and col not in ['MESANIO', 'ANIO', 'MES', 'DIA']]
+            common_columns = [col for col in batch.columns if col in target_columns and col not in ['MESANIO', 'ANIO', 'MES', 'DIA']]
 
             # Agregar campos calculados solo si están en target_columns (sin duplicar)
             calculated_fields = ['ANIO', 'MES', 'DIA', 'MESANIO']
@@ -245,56 +201,19 @@ class TLCL02Queries:
 
             # print(f"Consulta UPSERT: {upsert_query}")
 
-            # Procesar cada fila de datos
-            records_processed = 0
-            records_failed = 0
-            
-            for row in temp_data:
-                try:
-                    # Preparar los valores para la inserción según ordered_columns
-                    # Los datos ya vienen formateados desde formatted_data, no necesitamos recalcular
-                    values_to_insert = []
-                    
-                    for col in ordered_columns:
-                        if col in temp_columns:
-                            # Usar valor directamente de la fila (ya viene con campos calculados)
-                            col_index = temp_columns.index(col)
-                            values_to_insert.append(row[col_index])
-                        else:
-                            # Valor por defecto si no se encuentra
-                            values_to_insert.append(None)
-                    
-                    # Ejecutar UPSERT con parámetros dobles
-                    # Para UPSERT necesitamos los datos dos veces: una para VALUES y otra para WHERE
-                    upsert_params = list(values_to_insert)  # Para VALUES
-                    where_params = [values_to_insert[ordered_columns.index(col)] for col in existing_key_columns if col in ordered_columns]  # Para WHERE
-                    all_params = upsert_params + where_params
-                    
-                    # DEBUG: Mostrar información detallada del primer registro
-                    # if records_processed == 0:
-                    #     print(f"=== DEBUG PRIMER REGISTRO ===")
-                    #     print(f"ordered_columns: {ordered_columns}")
-                    #     print(f"values_to_insert: {values_to_insert}")
-                    #     print(f"existing_key_columns: {existing_key_columns}")
-                    #     print(f"upsert_params: {upsert_params}")
-                    #     print(f"where_params: {where_params}")
-                    #     print(f"all_params: {all_params}")
-                    #     print(f"Query: {upsert_query}")
-                    #     print("=" * 50)
-                    
-                    cursor.execute(upsert_query, all_params)
-                    records_processed += 1
-                    
-                    if records_processed % 100 == 0:
-                        print(f"Procesados {records_processed} registros...")
-                        
-                except Exception as row_error:
-                    print(f"Error al procesar fila {records_processed + records_failed + 1}: {row_error}")
-                    records_failed += 1
-                    continue
-            
-            # Confirmar transacción
-            self.connection.connection.commit()
+            # Armar las filas desde las columnas del lote según ordered_columns.
+            # Para UPSERT necesitamos las llaves dos veces: una para VALUES y otra para WHERE
+            key_positions = [ordered_columns.index(col) for col in existing_key_columns if col in ordered_columns]
+            upsert_rows = batch.rows(ordered_columns + [ordered_columns[i] for i in key_positions])
+
+            # Ejecutar UPSERT por lotes adaptativos; si un lote falla se reintenta fila por fila.
+            # Por defecto una sola transacción confirmada al final, sin duplicados por llave primaria
+            writer = BulkWriter(self.connection, upsert_query, 'TELCEL_EE_KPI', row_fallback=True,
+                                commit=BULK_CONFIG['commit_policies']['TLCL02'],
+                                key_positions=key_positions, dedupe=BULK_CONFIG['dedupe']['TLCL02'])
+            self.last_write_stats = writer.write(upsert_rows)
+            records_processed = self.last_write_stats['rows_written']
+            records_failed = self.last_write_stats['rows_failed']
             
             print(f"Inserción completada: {records_processed} registros procesados, {records_failed} fallidos")
             return True
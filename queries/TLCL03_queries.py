@@ -5,8 +5,15 @@ Incluye utilidades para ejecutar el script SQL de merges definido en TLCL03_merg
 
 import os
 from utils.sql_runner import SqlRunner
-from utils.config import DB_CONFIG
-
+from utils.config import BULK_CONFIG, DB_CONFIG
+from utils.bulk_writer import BulkWriter
+from utils.columnar import ColumnarBatch
+from utils.converters import compile_table_converters
+from utils.date_fields import LAYOUT_YMD, derive_date_fields, summarize
+from utils.metrics import metrics
+from utils.tracing import trace_methods
+
+@trace_methods
 class TLCL03Queries:
     """Clase para gestionar las consultas específicas del proceso TLCL03_Counters."""
     
@@ -17,6 +24,10 @@ class TLCL03Queries:
             connection: Objeto de conexión a la base de datos.
         """
         self.connection = connection
+        # Estadísticas del último Table Producer (lotes elegidos, throughput)
+        self.last_write_stats = None
+        # Resumen de la última derivación de campos de fecha (válidas, errores, fechas distintas)
+        self.last_date_stats = None
     
     def run_tlcl03_sql_script(self):
         """Ejecuta el script SQL de TLCL03_Counters ubicado en queries/TLCL03_merge.sql.
@@ -79,23 +90,15 @@ class TLCL03Queries:
             query = f"SELECT * FROM \"{DB_CONFIG['schema']}\".\"TELCEL_EE_TEMPHUAWEICOUNTERS\""
             cursor.execute(query)
             raw_data = cursor.fetchall()
+            metrics.inc('tlcl_table_rows_total', len(raw_data), table='TELCEL_EE_TEMPHUAWEICOUNTERS', operation='read')
 
             # print('raw_data', raw_data)
 
-            data = []
-            for row in raw_data:
-                # Convertir cada valor a tipo básico de Python
-                converted_row = []
-                for value in row:
-                    if value is None:
-                        converted_row.append(None)
-                    elif hasattr(value, 'isoformat'):  # datetime objects
-                        converted_row.append(value.isoformat())
-                    else:
-                        converted_row.append(str(value) if value is not None else None)
-                data.append(converted_row)
-
-            return columns, data
+            # Conversores por columna compilados de SYS.TABLE_COLUMNS (cacheados por tabla):
+            # solo se convierte a texto donde el destino es texto o donde el transform
+            # de fechas lee FECHA como cadena
+            converters = compile_table_converters(self.connection, columns, 'TELCEL_EE_TEMPHUAWEICOUNTERS', 'TELCEL_EE_HUAWEICOUNTERS', text_columns=('FECHA',))
+            return ColumnarBatch.from_rows(columns, raw_data, converters)
         except Exception as e:
             print(f"Error al obtener datos de KPI temporal")
             return None
@@ -154,103 +157,37 @@ class TLCL03Queries:
             'columns_match': columns_match
         }
 
-    def calculate_date_fields(self, fecha):
-        """Extrae los campos FECHA, HORA, ANIO, MES, DIA y MESANIO basado en el campo FECHA original.
-        
+    def add_date_fields(self, batch):
+        """Normaliza FECHA y agrega HORA, ANIO, MES, DIA y MESANIO al lote.
+
+        Los campos se derivan en bloque (`utils.date_fields`): una vez por fecha distinta y sin
+        un print por fila inválida. En las filas con FECHA vacía o inválida FECHA conserva su
+        valor y el resto queda en NULL; el resumen queda en `last_date_stats`.
+
         Args:
-            fecha: Valor de fecha en formato YYYY-MM-DD HH:MM:SS o YYYY-MM-DD.
-            
+            batch (ColumnarBatch): Datos de la tabla temporal.
+
         Returns:
-            dict: Diccionario con los campos extraídos:
-                - FECHA: Fecha en formato YYYY-MM-DD (sin hora)
-                - HORA: Hora en formato HH:MM:00 (extraída de FECHA o 00:00:00 por defecto)
-                - ANIO: Año (YYYY)
-                - MES: Mes (MM)
-                - DIA: Día (DD)
-                - MESANIO: Mes y año en formato MM.YYYY
-            None si hay error en el procesamiento.
+            ColumnarBatch: El mismo lote con las columnas calculadas.
         """
-        try:
-            # Validar que la fecha no esté vacía
-            if not fecha or str(fecha).strip() == '':
-                print("Error: Campo FECHA está vacío")
-                return None
-            
-            fecha_str = str(fecha).strip()
-            
-            # Extraer fecha y hora
-            fecha_parte = fecha_str
-            hora_parte = "00:00:00"  # Valor por defecto
-            
-            # Manejar formato YYYY-MM-DD HH:MM:SS
-            if ' ' in fecha_str:
-                partes = fecha_str.split(' ')
-                fecha_parte = partes[0]
-                if len(partes) > 1:
-                    hora_completa = partes[1]
-                    # Extraer HH:MM y agregar :00 para los segundos
-                    if ':' in hora_completa:
-                        hora_partes = hora_completa.split(':')
-                        if len(hora_partes) >= 2:
-                            hora_parte = f"{hora_partes[0]:0>2}:{hora_partes[1]:0>2}:00"
-                        else:
-                            hora_parte = f"{hora_partes[0]:0>2}:00:00"
-            
-            # Dividir la fecha por el separador '-'
-            fecha_parts = fecha_parte.split('-')
-            
-            # Validar que tenga exactamente 3 partes
-            if len(fecha_parts) != 3:
-                print(f"Error: Formato de fecha inválido. Esperado YYYY-MM-DD, recibido: {fecha}")
-                return None
-            
-            # Extraer año, mes y día
-            anio_str, mes_str, dia_str = fecha_parts
-            
-            # Convertir a enteros para validación
-            anio = int(anio_str)
-            mes = int(mes_str)
-            dia = int(dia_str)
-            
-            # Validar rangos
-            if not (1 <= mes <= 12):
-                print(f"Error: Mes inválido ({mes}). Debe estar entre 1 y 12")
-                return None
-            
-            if not (1 <= dia <= 31):
-                print(f"Error: Día inválido ({dia}). Debe estar entre 1 y 31")
-                return None
-            
-            if anio < 1900 or anio > 2100:
-                print(f"Error: Año inválido ({anio}). Debe estar entre 1900 y 2100")
-                return None
-            
-            # Formatear los campos
-            mes_formatted = f"{mes:02d}"
-            dia_formatted = f"{dia:02d}"
-            anio_formatted = str(anio)
-            mesanio = f"{mes:02d}.{anio}"
-            fecha_formatted = f"{anio}-{mes_formatted}-{dia_formatted}"
-            
-            return {
-                'FECHA': fecha_formatted,
-                'HORA': hora_parte,
-                'ANIO': anio_formatted,
-                'MES': mes_formatted,
-                'DIA': dia_formatted,
-                'MESANIO': mesanio
-            }
-            
-        except (ValueError, TypeError, IndexError) as e:
-            print(f"Error al procesar fecha '{fecha}': {e}")
-            return None
-
-    def insert_huawei_counters_data(self, temp_data, temp_columns, target_columns):
+        fechas = batch.column('FECHA')
+        derived = derive_date_fields(fechas, LAYOUT_YMD)
+        columns = derived['columns']
+        # FECHA sin hora; HORA, ANIO, MES y DIA inmediatamente después y MESANIO al final
+        batch.set_column('FECHA', [fecha if valid else original
+                                   for fecha, original, valid in zip(columns['FECHA'], fechas, derived['valid'])])
+        fecha_index = batch.index('FECHA')
+        for offset, field in enumerate(['HORA', 'ANIO', 'MES', 'DIA'], start=1):
+            batch.add_column(field, columns[field], fecha_index + offset)
+        batch.add_column('MESANIO', columns['MESANIO'])
+        self.last_date_stats = summarize(derived)
+        return batch
+
+    def insert_huawei_counters_data(self, batch, target_columns):
         """Realiza un upsert (insert o update) de los datos de la tabla temporal en la tabla final.
         
         Args:
-            temp_data (list): Datos de la tabla temporal.
-            temp_columns (list): Columnas de la tabla temporal.
+            batch (ColumnarBatch): Datos de la tabla temporal con los campos de fecha calculados.
             target_columns (list): Columnas de la tabla destino.
             
         Returns:
@@ -258,10 +195,9 @@ class TLCL03Queries:
         """
         try:
             # print('Hola desde el insert')
-            cursor = self.connection.cursor
-            
+
             # Obtener columnas comunes (excluyendo campos calculados que se agregan después)
-            common_columns = [col for col in temp_columns if col in target_columns and col not in ['FECHA', 'MESANIO', 'ANIO', 'MES', 'DIA', 'HORA']]
+            common_columns = [col for col in batch.columns if col in target_columns and col not in ['FECHA', 'MESANIO', 'ANIO', 'MES', 'DIA', 'HORA']]
 
             # Agregar campos calculados solo si están en target_columns (sin duplicar)
             calculated_fields = ['FECHA', 'HORA', 'ANIO', 'MES', 'DIA', 'MESANIO']
@@ -319,58 +255,19 @@ class TLCL03Queries:
 
             print(f"Consulta UPSERT: {upsert_query}")
 
-            # Procesar cada fila de datos
-            records_processed = 0
-            records_failed = 0
-
-            print(f"Filas a procesar: {len(temp_data)}")
-            
-            for row in temp_data:
-                try:
-                    # Preparar los valores para la inserción según ordered_columns
-                    # Los datos ya vienen formateados desde formatted_data, no necesitamos recalcular
-                    values_to_insert = []
-                    
-                    for col in ordered_columns:
-                        if col in temp_columns:
-                            # Usar valor directamente de la fila (ya viene con campos calculados)
-                            col_index = temp_columns.index(col)
-                            values_to_insert.append(row[col_index])
-                        else:
-                            # Valor por defecto si no se encuentra
-                            values_to_insert.append(None)
-                    
-                    # Ejecutar UPSERT con parámetros dobles
-                    # Para UPSERT necesitamos los datos dos veces: una para VALUES y otra para WHERE
-                    upsert_params = list(values_to_insert)  # Para VALUES
-                    where_params = [values_to_insert[ordered_columns.index(col)] for col in existing_key_columns if col in ordered_columns]  # Para WHERE
-                    all_params = upsert_params + where_params
-                    
-                    # DEBUG: Mostrar información detallada del primer registro
-                    # if records_processed == 0:
-                    #     print(f"=== DEBUG PRIMER REGISTRO ===")
-                    #     print(f"ordered_columns: {ordered_columns}")
-                    #     print(f"values_to_insert: {values_to_insert}")
-                    #     print(f"existing_key_columns: {existing_key_columns}")
-                    #     print(f"upsert_params: {upsert_params}")
-                    #     print(f"where_params: {where_params}")
-                    #     print(f"all_params: {all_params}")
-                    #     print(f"Query: {upsert_query}")
-                    #     print("=" * 50)
-                    
-                    cursor.execute(upsert_query, all_params)
-                    records_processed += 1
-                    
-                    if records_processed % 100 == 0:
-                        print(f"Procesados {records_processed} registros...")
-                        
-                except Exception as row_error:
-                    print(f"Error al procesar fila {records_processed + records_failed + 1}: {row_error}")
-                    records_failed += 1
-                    continue
-            
-            # Confirmar transacción
-            self.connection.connection.commit()
+            # Armar las filas desde las columnas del lote según ordered_columns.
+            # Para UPSERT necesitamos las llaves dos veces: una para VALUES y otra para WHERE
+            key_positions = [ordered_columns.index(col) for col in existing_key_columns if col in ordered_columns]
+            upsert_rows = batch.rows(ordered_columns + [ordered_columns[i] for i in key_positions])
+
+            # Ejecutar UPSERT por lotes adaptativos; si un lote falla se reintenta fila por fila.
+            # Por defecto una sola transacción confirmada al final, sin duplicados por llave primaria
+            writer = BulkWriter(self.connection, upsert_query, 'TELCEL_EE_HUAWEICOUNTERS', row_fallback=True,
+                                commit=BULK_CONFIG['commit_policies']['TLCL03'],
+                                key_positions=key_positions, dedupe=BULK_CONFIG['dedupe']['TLCL03'])
+            self.last_write_stats = writer.write(upsert_rows)
+            records_processed = self.last_write_stats['rows_written']
+            records_failed = self.last_write_stats['rows_failed']
             
             print(f"Inserción completada: {records_processed} registros procesados, {records_failed} fallidos")
             return True
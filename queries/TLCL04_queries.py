@@ -5,8 +5,15 @@ Incluye utilidades para ejecutar el script SQL inicial y gestionar el Table Cons
 
 import os
 from utils.sql_runner import SqlRunner
-from utils.config import DB_CONFIG
+from utils.config import BULK_CONFIG, DB_CONFIG
+from utils.bulk_writer import BulkWriter
+from utils.columnar import ColumnarBatch
+from utils.date_fields import LAYOUT_YMD, derive_date_fields, summarize
+from utils.metrics import metrics
+from utils.record_counts import record_counts
+from utils.tracing import trace_methods
 
+@trace_methods
 class TLCL04Queries:
     """Clase para gestionar las consultas específicas del proceso TLCL04."""
     
@@ -17,6 +24,8 @@ class TLCL04Queries:
             connection: Objeto de conexión a la base de datos.
         """
         self.connection = connection
+        # Resumen de los campos de fecha del último Data Transform
+        self.last_date_stats = None
 
     def run_tlcl04_initial_sql(self):
         """Ejecuta el script SQL inicial de TLCL04 ubicado en queries/TLCL04_initial.sql.
@@ -65,10 +74,9 @@ class TLCL04Queries:
             AND TABLE_NAME = '{table_name}'
             ORDER BY POSITION
             """
-            cursor = self.connection.cursor()
+            cursor = self.connection.cursor
             cursor.execute(query)
             columns = [row[0] for row in cursor.fetchall()]
-            cursor.close()
             return columns
         except Exception as e:
             print(f"Error al obtener columnas de {table_name}: {str(e)}")
@@ -81,7 +89,7 @@ class TLCL04Queries:
             limit (int, optional): Límite de registros a obtener.
             
         Returns:
-            list: Lista de registros.
+            ColumnarBatch: Registros por columna (vacío si ocurre un error).
         """
         try:
             query = f"""
@@ -90,61 +98,52 @@ class TLCL04Queries:
             if limit:
                 query += f" LIMIT {limit}"
                 
-            cursor = self.connection.cursor()
+            cursor = self.connection.cursor
             cursor.execute(query)
             results = cursor.fetchall()
-            cursor.close()
-            return results
+            metrics.inc('tlcl_table_rows_total', len(results), table='TELCEL_EE_TEMPERICSSONCOUNTERS', operation='read')
+            columns = [description[0] for description in cursor.description]
+            return ColumnarBatch.from_rows(columns, results)
         except Exception as e:
             print(f"Error al obtener datos de TEMPERICSSONCOUNTERS: {str(e)}")
-            return []
+            return ColumnarBatch([], [])
 
-    def transform_and_add_date_fields(self, data):
+    def transform_and_add_date_fields(self, batch):
         """Transforma los datos agregando campos de fecha calculados.
-        
+
+        Los campos se derivan en bloque con `utils.date_fields` (formato YYYY-MM-DD, el mismo
+        parser y memo que TLCL03); el resumen (filas válidas, errores, fechas distintas) queda
+        en `last_date_stats`.
+
         Args:
-            data (list): Lista de registros de la tabla temporal.
+            batch (ColumnarBatch): Registros de la tabla temporal.
             
         Returns:
-            list: Lista de registros transformados con campos adicionales.
+            ColumnarBatch: El mismo lote con ANIO, MES, DIA, Fecha_Txt y ANIOMES agregados
+            (NULL en las filas cuya FECHA está vacía o no es una fecha YYYY-MM-DD válida).
         """
-        try:
-            transformed_data = []
-            for row in data:
-                # Crear una copia del registro como lista para poder modificarlo
-                new_row = list(row)
-                
-                # Extraer fecha del campo FECHA (asumiendo formato YYYY-MM-DD)
-                if len(new_row) > 0 and new_row[0]:  # FECHA está en la primera posición
-                    fecha_str = str(new_row[0])
-                    if '-' in fecha_str:
-                        parts = fecha_str.split('-')
-                        if len(parts) == 3:
-                            anio = int(parts[0])
-                            mes = int(parts[1])
-                            dia = int(parts[2])
-                            
-                            # Agregar campos calculados
-                            new_row.extend([anio, mes, dia, fecha_str, f"{mes:02d}.{anio}"])
-                
-                transformed_data.append(new_row)
-            
-            return transformed_data
-        except Exception as e:
-            print(f"Error en transformación de datos: {str(e)}")
-            return data
+        # FECHA está en la primera columna
+        fechas = batch.column(batch.columns[0])
+        derived = derive_date_fields(fechas, LAYOUT_YMD)
+        columns = derived['columns']
+        for name in ('ANIO', 'MES', 'DIA'):
+            batch.add_column(name, [int(value) if value is not None else None for value in columns[name]])
+        batch.add_column('Fecha_Txt', [str(fecha) if valid else None for fecha, valid in zip(fechas, derived['valid'])])
+        batch.add_column('ANIOMES', columns['MESANIO'])
+        self.last_date_stats = summarize(derived)
+        return batch
 
-    def upsert_ericsson_counters(self, data):
+    def upsert_ericsson_counters(self, batch):
         """Realiza UPSERT en la tabla TELCEL_EE_ERICSSONCOUNTERS.
         
         Args:
-            data (list): Lista de registros transformados.
+            batch (ColumnarBatch): Registros transformados.
             
         Returns:
             dict: Resultado de la operación.
         """
         try:
-            if not data:
+            if not batch:
                 return {
                     'success': True,
                     'message': 'No hay datos para procesar',
@@ -161,15 +160,22 @@ class TLCL04Queries:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
             
-            cursor = self.connection.cursor()
-            cursor.executemany(upsert_query, data)
-            affected_rows = cursor.rowcount
-            cursor.close()
+            # UPSERT por lotes de tamaño adaptativo en lugar de un único executemany
+            # (por defecto sin commits explícitos, como antes) y sin duplicados por
+            # llave primaria (FECHA, HORA, BTSNAME, IDBTSNAME)
+            writer = BulkWriter(self.connection, upsert_query, 'TELCEL_EE_ERICSSONCOUNTERS',
+                                commit=BULK_CONFIG['commit_policies']['TLCL04'],
+                                key_positions=[0, 1, 2, 3], dedupe=BULK_CONFIG['dedupe']['TLCL04'])
+            # Las filas (columnas temporales + calculadas, en orden) se arman solo aquí
+            stats = writer.write(batch.rows())
+            affected_rows = stats['affected_rows']
+            record_counts.invalidate(['TELCEL_EE_ERICSSONCOUNTERS'])
             
             return {
                 'success': True,
                 'message': f'UPSERT completado exitosamente. Filas afectadas: {affected_rows}',
-                'affected_rows': affected_rows
+                'affected_rows': affected_rows,
+                'bulk_write': stats
             }
         except Exception as e:
             return {
@@ -186,9 +192,9 @@ class TLCL04Queries:
         """
         try:
             query = f"TRUNCATE TABLE {DB_CONFIG['schema']}.TELCEL_EE_TEMPERICSSONCOUNTERS"
-            cursor = self.connection.cursor()
+            cursor = self.connection.cursor
             cursor.execute(query)
-            cursor.close()
+            record_counts.invalidate(['TELCEL_EE_TEMPERICSSONCOUNTERS'])
             
             return {
                 'success': True,
@@ -200,34 +206,31 @@ class TLCL04Queries:
                 'message': f'Error al truncar tabla temporal: {str(e)}'
             }
 
-    def get_record_counts(self):
+    def get_record_counts(self, exact=False):
         """Obtiene el conteo de registros de las tablas principales.
         
+        Por defecto lee RECORD_COUNT de M_TABLES en una sola consulta (con caché breve).
+        
+        Args:
+            exact (bool): True para ejecutar COUNT(*) por tabla.
+            
         Returns:
             dict: Conteos de registros.
         """
         try:
-            counts = {}
             tables = [
                 'TELCEL_EE_TEMPERICSSONCOUNTERS',
                 'TELCEL_EE_ERICSSONCOUNTERS'
             ]
-            
-            cursor = self.connection.cursor()
-            for table in tables:
-                query = f"SELECT COUNT(*) FROM {DB_CONFIG['schema']}.{table}"
-                cursor.execute(query)
-                count = cursor.fetchone()[0]
-                counts[table] = count
-            
-            cursor.close()
+            counts = record_counts.get_counts(self.connection, tables, exact)
             return {
                 'success': True,
-                'counts': counts
+                'counts': counts,
+                'count_source': 'COUNT(*)' if exact else 'M_TABLES'
             }
         except Exception as e:
             return {
                 'success': False,
                 'message': f'Error al obtener conteos: {str(e)}',
                 'counts': {}
-            }
\ No newline at end of file
+            }
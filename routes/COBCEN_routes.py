@@ -5,6 +5,8 @@ Contiene los endpoints para ejecutar el stored procedure SP_TLCL_COBCEN y health
 
 from flask import Blueprint, jsonify, request
 from services.COBCEN_service import COBCENService
+from utils.admission import admission_control
+from utils.jobs import dispatch_job
 
 import logging
 
@@ -16,6 +18,7 @@ logger = logging.getLogger(__name__)
 COBCEN_bp = Blueprint('COBCEN', __name__, url_prefix='/api/COBCEN')
 
 @COBCEN_bp.route('/execute', methods=['GET'])
+@admission_control('light')
 def execute_cobcen_info():
     """Endpoint informativo para el stored procedure COBCEN."""
     return jsonify({
@@ -55,6 +58,7 @@ def execute_cobcen_info():
     })
 
 @COBCEN_bp.route('/execute', methods=['POST'])
+@admission_control('heavy')
 def execute_cobcen_sp():
     """Endpoint para ejecutar el stored procedure SP_TLCL_COBCEN."""
     try:
@@ -70,8 +74,9 @@ def execute_cobcen_sp():
         # Crear instancia del servicio
         service = COBCENService()
         
-        # Ejecutar stored procedure
-        result = service.execute_SP_TLCL_COBCEN_sp(param1, param2)
+        accepted, result = dispatch_job('COBCEN', lambda: service.execute_SP_TLCL_COBCEN_sp(param1, param2))
+        if accepted:
+            return accepted
         
         # Determinar código de respuesta HTTP
         status_code = 200 if result['success'] else 500
@@ -89,6 +94,7 @@ def execute_cobcen_sp():
         }), 500
 
 @COBCEN_bp.route('/merge', methods=['POST'])
+@admission_control('heavy')
 def run_cobcen_merge():
     """Endpoint legacy para ejecutar el proceso COBCEN (ahora usa stored procedure).
     Mantenido para compatibilidad hacia atrás."""
@@ -99,8 +105,9 @@ def run_cobcen_merge():
         # Crear instancia del servicio
         service = COBCENService()
         
-        # Ejecutar método legacy que internamente usa el stored procedure
-        result = service.run_cobcen_merge()
+        accepted, result = dispatch_job('COBCEN', service.run_cobcen_merge)
+        if accepted:
+            return accepted
         
         # Determinar código de respuesta HTTP
         status_code = 200 if result['success'] else 500
@@ -118,6 +125,7 @@ def run_cobcen_merge():
         }), 500
 
 @COBCEN_bp.route('/health', methods=['GET'])
+@admission_control('light')
 def health_check():
     """Endpoint para verificar el estado de salud del servicio COBCEN.
     
@@ -130,8 +138,8 @@ def health_check():
         # Crear instancia del servicio
         service = COBCENService()
         
-        # Ejecutar health check
-        result = service.health_check()
+        # Ejecutar health check (?deep=true fuerza una verificación fresca)
+        result = service.health_check(deep=request.args.get('deep', '').lower() == 'true')
         
         status_code = 200 if result['success'] else 503
         
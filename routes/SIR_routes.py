@@ -3,8 +3,10 @@ Rutas para el proceso SIR.
 Contiene los endpoints para ejecutar stored procedures y health check.
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from services.SIR_service import SIRService
+from utils.admission import admission_control
+from utils.jobs import dispatch_job
 
 import logging
 
@@ -16,6 +18,7 @@ logger = logging.getLogger(__name__)
 sir_bp = Blueprint('SIR', __name__, url_prefix='/api/SIR')
 
 @sir_bp.route('/execute', methods=['POST'])
+@admission_control('heavy')
 def execute_sp():
     """Endpoint para ejecutar el stored procedure SP_TLCL_SIR."""
     try:
@@ -24,8 +27,9 @@ def execute_sp():
         # Crear instancia del servicio
         service = SIRService()
         
-        # Ejecutar stored procedure
-        result = service.execute_SP_TLCL_SIR_sp()
+        accepted, result = dispatch_job('SIR', service.execute_SP_TLCL_SIR_sp)
+        if accepted:
+            return accepted
         
         # Determinar código de respuesta HTTP
         status_code = 200 if result['success'] else 500
@@ -43,6 +47,7 @@ def execute_sp():
         }), 500
 
 @sir_bp.route('/health', methods=['GET'])
+@admission_control('light')
 def health_check():
     """Endpoint para verificar el estado de salud del servicio SIR.
     
@@ -55,8 +60,8 @@ def health_check():
         # Crear instancia del servicio
         service = SIRService()
         
-        # Ejecutar health check
-        result = service.health_check()
+        # Ejecutar health check (?deep=true fuerza una verificación fresca)
+        result = service.health_check(deep=request.args.get('deep', '').lower() == 'true')
         
         status_code = 200 if result['success'] else 503
         
@@ -74,6 +79,7 @@ def health_check():
         }), 503
 
 @sir_bp.route('/info', methods=['GET'])
+@admission_control('light')
 def get_sp_info():
     """Endpoint para obtener información del stored procedure.
     
@@ -0,0 +1,63 @@
+"""
+Rutas para la ejecución de stored procedures en lote.
+Contiene el endpoint que ejecuta varios SP en paralelo respetando dependencias.
+"""
+
+from flask import Blueprint, jsonify, request
+from services.SP_batch_service import SPBatchService
+from utils.admission import admission_control
+from utils.jobs import dispatch_job
+
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Crear blueprint para stored procedures
+sp_bp = Blueprint('SP', __name__, url_prefix='/api/sp')
+
+@sp_bp.route('/batch', methods=['POST'])
+@admission_control('heavy')
+def execute_batch():
+    """Endpoint para ejecutar varios stored procedures en un solo request.
+
+    Body: lista (o {"calls": [...]}) de {procedure, params, depends_on, id}.
+    Las llamadas independientes corren en paralelo sobre conexiones del pool.
+
+    Returns:
+        JSON: Flag, mensaje y duración de cada SP.
+    """
+    try:
+        data = request.get_json(silent=True)
+        calls = data.get('calls') if isinstance(data, dict) else data
+
+        service = SPBatchService()
+        try:
+            calls = service.validate_calls(calls)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }), 400
+
+        logger.info(f"Iniciando lote de stored procedures: {', '.join(call['id'] for call in calls)}")
+
+        accepted, result = dispatch_job('SP_BATCH', lambda: service.run_batch(calls))
+        if accepted:
+            return accepted
+
+        status_code = 200 if result['success'] else 500
+
+        logger.info(f"Lote de stored procedures completado. Success: {result['success']}")
+
+        return jsonify(result), status_code
+
+    except Exception as e:
+        logger.error(f"Error en endpoint /batch (SP): {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'Error interno del servidor: {str(e)}',
+            'data': None
+        }), 500
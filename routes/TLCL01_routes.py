@@ -1,10 +1,13 @@
 from flask import Blueprint, jsonify, request
 from services.TLCL01_service import TLCL01Service
+from utils.admission import admission_control
+from utils.jobs import dispatch_job
 
 # Crear el blueprint para TLCL01
 tlcl01_bp = Blueprint('tlcl01', __name__, url_prefix='/api/TLCL01')
 
 @tlcl01_bp.route('/transfer', methods=['POST'])
+@admission_control('heavy')
 def transfer_electric_fact():
     """
     Endpoint LEGADO: Ahora se redirige a ejecutar el SP TLCL_01.
@@ -17,7 +20,10 @@ def transfer_electric_fact():
         body = request.get_json() or {}
         param1 = body.get('param1', 0)
         param2 = body.get('param2', '')
-        result = service.execute_SP_TLCL_01_sp(param1, param2)
+        
+        accepted, result = dispatch_job('TLCL01', lambda: service.execute_SP_TLCL_01_sp(param1, param2))
+        if accepted:
+            return accepted
 
         status_code = 200 if result.get('success') else 500
         # Advertencia de uso legado
@@ -32,6 +38,7 @@ def transfer_electric_fact():
         }), 500
 
 @tlcl01_bp.route('/health', methods=['GET'])
+@admission_control('light')
 def health_check():
     """
     Endpoint para verificar el estado de salud del servicio TLCL01.
@@ -46,7 +53,11 @@ def health_check():
     """
     try:
         service = TLCL01Service()
-        health_result = service.get_health_status()
+        # ?deep=true fuerza una verificación fresca; ?exact=true usa COUNT(*) en lugar de M_TABLES
+        health_result = service.get_health_status(
+            deep=request.args.get('deep', '').lower() == 'true',
+            exact=request.args.get('exact', '').lower() == 'true'
+        )
         
         # Determinar código de respuesta HTTP basado en el status
         if health_result['status'] == 'healthy':
@@ -73,6 +84,7 @@ def health_check():
         return jsonify(error_result), 503
 
 @tlcl01_bp.route('/status', methods=['GET'])
+@admission_control('light')
 def get_status():
     """
     Endpoint para obtener información general del proceso TLCL01.
@@ -102,8 +114,11 @@ def get_status():
             ]
         }
         
-        # Agregar información de salud básica
-        health_result = service.get_health_status()
+        # Agregar información de salud básica (cacheada por el health prober; ?exact=true para COUNT(*))
+        health_result = service.get_health_status(
+            deep=request.args.get('deep', '').lower() == 'true',
+            exact=request.args.get('exact', '').lower() == 'true'
+        )
         status_info['health_status'] = health_result['status']
         status_info['database_accessible'] = health_result['details']['database_connection']
         
@@ -113,6 +128,8 @@ def get_status():
         if health_result['details']['target_table_accessible']:
             status_info['target_records_count'] = health_result['details']['target_records_count']
         
+        status_info['count_source'] = health_result['details'].get('count_source')
+        
         return jsonify({
             'status': 'success',
             'message': 'Información del proceso TLCL01 obtenida exitosamente',
@@ -129,6 +146,7 @@ def get_status():
 
 
 @tlcl01_bp.route('/execute', methods=['GET'])
+@admission_control('light')
 def execute_info():
     """Página informativa del endpoint de ejecución del SP TLCL_01."""
     return jsonify({
@@ -165,6 +183,7 @@ def execute_info():
 
 
 @tlcl01_bp.route('/execute', methods=['POST'])
+@admission_control('heavy')
 def execute_sp():
     """Ejecuta el stored procedure SP_TLCL_01, con parámetros opcionales."""
     try:
@@ -172,7 +191,10 @@ def execute_sp():
         body = request.get_json() or {}
         param1 = body.get('param1', 0)
         param2 = body.get('param2', '')
-        result = service.execute_SP_TLCL_01_sp(param1, param2)
+        
+        accepted, result = dispatch_job('TLCL01', lambda: service.execute_SP_TLCL_01_sp(param1, param2))
+        if accepted:
+            return accepted
 
         status_code = 200 if result.get('success') else 500
         return jsonify(result), status_code
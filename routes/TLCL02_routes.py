@@ -1,9 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from services.TLCL02_service import TLCL02Service
+from utils.admission import admission_control
+from utils.jobs import dispatch_job
 
 TLCL02_bp = Blueprint('TLCL02', __name__, url_prefix='/api/TLCL02')
 
 @TLCL02_bp.route('/transfer', methods=['POST'])
+@admission_control('heavy')
 def transfer_kpi_data():
     """
     Endpoint para ejecutar la transferencia de datos de KPI.
@@ -13,7 +16,10 @@ def transfer_kpi_data():
     """
     try:
         service = TLCL02Service()
-        result = service.transfer_kpi_data()
+        
+        accepted, result = dispatch_job('TLCL02', service.transfer_kpi_data)
+        if accepted:
+            return accepted
         
         # Determinar el código de estado HTTP basado en el resultado
         if result['status'] == 'success':
@@ -37,6 +43,7 @@ def transfer_kpi_data():
         }
 
 @TLCL02_bp.route('/health', methods=['GET'])
+@admission_control('light')
 def health_check():
     """
     Endpoint de health check para verificar que el servicio está funcionando.
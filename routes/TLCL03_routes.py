@@ -3,8 +3,10 @@ Rutas para el proceso COUNTERS.
 Contiene los endpoints para ejecutar el script COUNTERS (MERGE) y health.
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from services.TLCL03_service import TLCL03Service
+from utils.admission import admission_control
+from utils.jobs import dispatch_job, publish_step
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -13,7 +15,60 @@ logger = logging.getLogger(__name__)
 # Crear blueprint para COUNTERS
 TLCL03_bp = Blueprint('TLCL03', __name__, url_prefix='/api/TLCL03')
 
+def _merge_and_transfer(service):
+    """Ejecuta el script COUNTERS (MERGE) y, si fue exitoso, la transferencia de Huawei Counters.
+
+    Args:
+        service (TLCL03Service): Instancia del servicio.
+
+    Returns:
+        dict: Resultado combinado de ambos procesos.
+    """
+    # Ejecutar script de merges (proceso principal)
+    publish_step("Ejecutando script COUNTERS (MERGE)")
+    merge_result = service.run_counters_merge()
+    
+    # Inicializar respuesta combinada
+    combined_result = {
+        'success': merge_result['success'],
+        'merge_process': merge_result,
+        'transfer_process': None
+    }
+    
+    # Si el merge fue exitoso, ejecutar la transferencia de datos
+    if merge_result['success']:
+        logger.info("Merge exitoso, iniciando transferencia de datos Huawei Counters")
+        
+        try:
+            transfer_result = service.transfer_huawei_counters_data()
+            combined_result['transfer_process'] = transfer_result
+            
+            # El éxito general depende de ambos procesos
+            combined_result['success'] = merge_result['success'] and (transfer_result.get('status') == 'success')
+            
+            if transfer_result.get('status') == 'success':
+                logger.info("Transferencia de datos completada exitosamente")
+                combined_result['message'] = "Ambos procesos completados exitosamente: MERGE y transferencia de datos"
+            else:
+                logger.warning(f"Transferencia falló: {transfer_result.get('message', 'Error desconocido')}")
+                combined_result['message'] = f"MERGE exitoso, pero transferencia falló: {transfer_result.get('message', 'Error desconocido')}"
+                
+        except Exception as transfer_error:
+            logger.error(f"Error durante la transferencia: {str(transfer_error)}")
+            combined_result['transfer_process'] = {
+                'status': 'error',
+                'message': f'Error durante la transferencia: {str(transfer_error)}'
+            }
+            combined_result['success'] = False
+            combined_result['message'] = f"MERGE exitoso, pero error en transferencia: {str(transfer_error)}"
+    else:
+        logger.warning("Merge falló, omitiendo transferencia de datos")
+        combined_result['message'] = f"Proceso MERGE falló: {merge_result.get('message', 'Error desconocido')}"
+
+    return combined_result
+
 @TLCL03_bp.route('/merge', methods=['POST'])
+@admission_control('heavy')
 def run_counters_merge():
     """Endpoint para ejecutar el script COUNTERS (MERGE en múltiples tablas) y transferir datos."""
     try:
@@ -22,45 +77,9 @@ def run_counters_merge():
         # Crear instancia del servicio
         service = TLCL03Service()
         
-        # Ejecutar script de merges (proceso principal)
-        merge_result = service.run_counters_merge()
-        
-        # Inicializar respuesta combinada
-        combined_result = {
-            'success': merge_result['success'],
-            'merge_process': merge_result,
-            'transfer_process': None
-        }
-        
-        # Si el merge fue exitoso, ejecutar la transferencia de datos
-        if merge_result['success']:
-            logger.info("Merge exitoso, iniciando transferencia de datos Huawei Counters")
-            
-            try:
-                transfer_result = service.transfer_huawei_counters_data()
-                combined_result['transfer_process'] = transfer_result
-                
-                # El éxito general depende de ambos procesos
-                combined_result['success'] = merge_result['success'] and (transfer_result.get('status') == 'success')
-                
-                if transfer_result.get('status') == 'success':
-                    logger.info("Transferencia de datos completada exitosamente")
-                    combined_result['message'] = "Ambos procesos completados exitosamente: MERGE y transferencia de datos"
-                else:
-                    logger.warning(f"Transferencia falló: {transfer_result.get('message', 'Error desconocido')}")
-                    combined_result['message'] = f"MERGE exitoso, pero transferencia falló: {transfer_result.get('message', 'Error desconocido')}"
-                    
-            except Exception as transfer_error:
-                logger.error(f"Error durante la transferencia: {str(transfer_error)}")
-                combined_result['transfer_process'] = {
-                    'status': 'error',
-                    'message': f'Error durante la transferencia: {str(transfer_error)}'
-                }
-                combined_result['success'] = False
-                combined_result['message'] = f"MERGE exitoso, pero error en transferencia: {str(transfer_error)}"
-        else:
-            logger.warning("Merge falló, omitiendo transferencia de datos")
-            combined_result['message'] = f"Proceso MERGE falló: {merge_result.get('message', 'Error desconocido')}"
+        accepted, combined_result = dispatch_job('TLCL03', lambda: _merge_and_transfer(service))
+        if accepted:
+            return accepted
         
         # Determinar código de respuesta HTTP
         status_code = 200 if combined_result['success'] else 500
@@ -79,6 +98,7 @@ def run_counters_merge():
         }), 500
 
 @TLCL03_bp.route('/health', methods=['GET'])
+@admission_control('light')
 def health_check():
     """Endpoint para verificar el estado de salud del servicio COUNTERS.
     
@@ -91,8 +111,8 @@ def health_check():
         # Crear instancia del servicio
         service = TLCL03Service()
         
-        # Ejecutar health check
-        result = service.health_check()
+        # Ejecutar health check (?deep=true fuerza una verificación fresca)
+        result = service.health_check(deep=request.args.get('deep', '').lower() == 'true')
         
         # Determinar código de respuesta HTTP
         status_code = 200 if result['success'] else 500
@@ -3,8 +3,10 @@ Rutas para el proceso TLCL04.
 Contiene los endpoints para ejecutar el proceso de Ericsson Counters y health check.
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from services.TLCL04_service import TLCL04Service
+from utils.admission import admission_control
+from utils.jobs import dispatch_job
 
 import logging
 
@@ -16,6 +18,7 @@ logger = logging.getLogger(__name__)
 tlcl04_bp = Blueprint('TLCL04', __name__, url_prefix='/api/TLCL04')
 
 @tlcl04_bp.route('/transfer', methods=['POST'])
+@admission_control('heavy')
 def transfer_ericsson_counters():
     """Endpoint para ejecutar el proceso completo de transferencia de Ericsson Counters."""
     try:
@@ -24,8 +27,9 @@ def transfer_ericsson_counters():
         # Crear instancia del servicio
         service = TLCL04Service()
         
-        # Ejecutar proceso de transferencia
-        result = service.transfer_ericsson_counters_data()
+        accepted, result = dispatch_job('TLCL04', service.transfer_ericsson_counters_data)
+        if accepted:
+            return accepted
         
         # Determinar código de respuesta HTTP
         status_code = 200 if result['success'] else 500
@@ -43,6 +47,7 @@ def transfer_ericsson_counters():
         }), 500
 
 @tlcl04_bp.route('/health', methods=['GET'])
+@admission_control('light')
 def health_check():
     """Endpoint para verificar el estado de salud del servicio TLCL04.
     
@@ -55,8 +60,8 @@ def health_check():
         # Crear instancia del servicio
         service = TLCL04Service()
         
-        # Ejecutar health check
-        result = service.health_check()
+        # Ejecutar health check (?deep=true fuerza una verificación fresca)
+        result = service.health_check(deep=request.args.get('deep', '').lower() == 'true')
         
         status_code = 200 if result['success'] else 503
         
@@ -74,6 +79,7 @@ def health_check():
         }), 503
 
 @tlcl04_bp.route('/status', methods=['GET'])
+@admission_control('light')
 def get_process_status():
     """Endpoint para obtener información general del proceso TLCL04.
     
@@ -86,8 +92,8 @@ def get_process_status():
         # Crear instancia del servicio
         service = TLCL04Service()
         
-        # Obtener estado del proceso
-        result = service.get_process_status()
+        # Obtener estado del proceso (?exact=true usa COUNT(*) en lugar de M_TABLES)
+        result = service.get_process_status(exact=request.args.get('exact', '').lower() == 'true')
         
         status_code = 200 if result['success'] else 500
         
@@ -0,0 +1,90 @@
+"""
+Rutas de health check agregado.
+Contiene el endpoint que verifica en paralelo todos los workflows y la conexión HANA.
+"""
+
+import math
+import time
+import logging
+
+from flask import Blueprint, jsonify, request
+from utils.admission import admission_control
+from utils.config import POOL_CONFIG
+from utils.db_pool import db_pool
+from utils.health import health_monitor
+
+logger = logging.getLogger(__name__)
+
+# Crear blueprint para health checks agregados
+health_bp = Blueprint('health', __name__, url_prefix='/health')
+
+
+def _timeout_arg():
+    """Lee `?timeout=` acotado a (0, HEALTH_CHECK_MAX_TIMEOUT]; None si no es un número positivo."""
+    value = request.args.get('timeout')
+    if value is None:
+        return POOL_CONFIG['health_check_timeout']
+    try:
+        timeout = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(timeout) or timeout <= 0:
+        return None
+    return min(timeout, POOL_CONFIG['health_check_max_timeout'])
+
+
+@health_bp.route('/all', methods=['GET'])
+@admission_control('light')
+def health_all():
+    """Endpoint que ejecuta en paralelo los health checks de todos los workflows.
+
+    Cada check corre sobre una conexión del pool, con a lo sumo `HEALTH_CHECK_CONCURRENCY`
+    a la vez y timeout (`HEALTH_CHECK_TIMEOUT` o `?timeout=`, hasta `HEALTH_CHECK_MAX_TIMEOUT`).
+    Con `?deep=false` devuelve los resultados cacheados.
+
+    Returns:
+        JSON: Documento combinado con estado y latencia por check; 200 si HANA responde
+        (`status` healthy o degraded), 503 si no, 400 si `timeout` no es válido.
+    """
+    try:
+        deep = request.args.get('deep', 'true').lower() != 'false'
+        timeout = _timeout_arg()
+        if timeout is None:
+            return jsonify({
+                'status': 'error',
+                'message': f"Parámetro timeout inválido: {request.args.get('timeout')!r} (segundos > 0)",
+                'checks': None
+            }), 400
+
+        start = time.perf_counter()
+        checks = health_monitor.check_all(timeout, deep=deep)
+        total_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        failed = [name for name, check in checks.items() if check['status'] != 'ok']
+        if not failed:
+            status, status_code = 'healthy', 200
+        elif checks.get('hana', {}).get('status') != 'ok':
+            status, status_code = 'unhealthy', 503
+        else:
+            # HANA responde pero falla algún workflow: el servicio sigue atendiendo
+            status, status_code = 'degraded', 200
+
+        logger.info(f"Health check agregado completado en {total_ms} ms. Status: {status}")
+
+        return jsonify({
+            'status': status,
+            'message': 'Todos los checks operativos' if not failed else f"Checks con falla: {', '.join(failed)}",
+            'deep': deep,
+            'total_latency_ms': total_ms,
+            'timeout_seconds': timeout,
+            'hana_pool': db_pool.snapshot(),
+            'checks': checks
+        }), status_code
+
+    except Exception as e:
+        logger.error(f"Error en endpoint /health/all: {str(e)}")
+        return jsonify({
+            'status': 'unhealthy',
+            'message': f'Error en health check: {str(e)}',
+            'checks': None
+        }), 503
@@ -0,0 +1,121 @@
+"""
+Rutas para el seguimiento de jobs de workflows.
+Expone el estado de cada ejecución, su progreso en vivo como Server-Sent Events y su cancelación.
+"""
+
+import json
+import logging
+
+from flask import Blueprint, Response, jsonify, request
+from utils.jobs import job_registry
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre comentarios keep-alive del stream SSE
+SSE_KEEPALIVE_SECONDS = 15
+
+# Crear blueprint para jobs
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+
+def _format_sse(event):
+    """Serializa un evento con el formato de Server-Sent Events."""
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Endpoint para obtener el estado actual de un job.
+
+    Returns:
+        JSON: Resumen del job (paso actual, filas, throughput y resultado si terminó).
+    """
+    job = job_registry.get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'message': f'Job {job_id} no encontrado',
+            'data': None
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'message': 'Estado del job obtenido',
+        'data': job.to_dict()
+    }), 200
+
+
+@jobs_bp.route('/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Endpoint para cancelar un job en ejecución.
+
+    Cancela la sentencia en curso en HANA y detiene el workflow en su siguiente punto
+    de cancelación; la respuesta indica el paso y la sentencia en que se cortó.
+
+    Returns:
+        JSON: Datos de la cancelación (202), 404 si no existe o 409 si ya terminó.
+    """
+    job = job_registry.get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'message': f'Job {job_id} no encontrado',
+            'data': None
+        }), 404
+
+    if not job.cancel('cancelled'):
+        return jsonify({
+            'success': False,
+            'message': f'Job {job_id} ya terminó con estado {job.status}',
+            'data': job.to_dict()
+        }), 409
+
+    logger.info(f"Cancelación solicitada para el job {job_id}")
+    return jsonify({
+        'success': True,
+        'message': 'Cancelación solicitada',
+        'data': job.cancellation
+    }), 202
+
+
+@jobs_bp.route('/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Endpoint SSE con el progreso en vivo de un job.
+
+    Emite eventos `step`, `progress` (filas, filas/s y ETA), `cancel` y `end`. Soporta
+    reanudación con el header `Last-Event-ID`.
+    """
+    job = job_registry.get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'message': f'Job {job_id} no encontrado',
+            'data': None
+        }), 404
+
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_event_id = 0
+
+    def generate():
+        delivered = last_event_id
+        yield 'retry: 3000\n\n'
+        while True:
+            events = job.wait_events(delivered, SSE_KEEPALIVE_SECONDS)
+            if not events:
+                if job.finished:
+                    return
+                yield ': keep-alive\n\n'
+                continue
+            for event in events:
+                yield _format_sse(event)
+            delivered = events[-1]['id']
+            if events[-1]['event'] == 'end':
+                return
+
+    logger.info(f"Cliente suscrito a eventos del job {job_id}")
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
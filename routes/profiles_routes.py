@@ -0,0 +1,80 @@
+"""
+Rutas para consultar los perfiles de ejecución (`?profile=cpu|alloc`).
+Requieren el token de administración (header `X-Admin-Token`).
+"""
+
+import logging
+
+from flask import Blueprint, jsonify, send_file
+from utils.admin import admin_required
+from utils.profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+# Crear blueprint para perfiles
+profiles_bp = Blueprint('profiles', __name__, url_prefix='/api/profiles')
+
+# Tipo de contenido de cada artefacto descargable
+ARTIFACT_MIMETYPES = {
+    'pstats': 'application/octet-stream',
+    'collapsed': 'text/plain',
+}
+
+
+@profiles_bp.route('', methods=['GET'])
+@admin_required
+def list_profiles():
+    """Endpoint con los perfiles guardados por este worker, del más reciente al más antiguo.
+
+    Returns:
+        JSON: Perfiles con modo, duración y URLs de sus artefactos.
+    """
+    profiles = profiler.profiles()
+    return jsonify({
+        'success': True,
+        'message': f'{len(profiles)} perfiles',
+        'data': profiles
+    }), 200
+
+
+@profiles_bp.route('/<profile_id>', methods=['GET'])
+@admin_required
+def get_profile(profile_id):
+    """Endpoint con el resumen de un perfil (hotspots y artefactos).
+
+    Returns:
+        JSON: Resumen del perfil, o 404.
+    """
+    summary = profiler.get(profile_id)
+    if summary is None:
+        return jsonify({
+            'success': False,
+            'message': f'Perfil {profile_id} no encontrado',
+            'data': None
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'message': 'Perfil obtenido',
+        'data': summary
+    }), 200
+
+
+@profiles_bp.route('/<profile_id>/<kind>', methods=['GET'])
+@admin_required
+def download_artifact(profile_id, kind):
+    """Endpoint para descargar un artefacto: `pstats` (cProfile) o `collapsed` (flamegraphs).
+
+    Returns:
+        Archivo del artefacto, o 404.
+    """
+    path = profiler.artifact_path(profile_id, kind) if kind in ARTIFACT_MIMETYPES else None
+    if path is None:
+        return jsonify({
+            'success': False,
+            'message': f'Artefacto {kind} del perfil {profile_id} no encontrado',
+            'data': None
+        }), 404
+
+    return send_file(path, mimetype=ARTIFACT_MIMETYPES[kind], as_attachment=True,
+                     download_name=f'profile_{profile_id}.{kind}')
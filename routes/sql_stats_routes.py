@@ -0,0 +1,77 @@
+"""
+Rutas para consultar las estadísticas de sentencias SQL por fingerprint.
+Requieren el token de administración (header `X-Admin-Token`).
+"""
+
+import logging
+import os
+
+from flask import Blueprint, jsonify, request
+from utils.admin import admin_required
+from utils.sql_stats import sql_stats
+
+logger = logging.getLogger(__name__)
+
+# Crear blueprint para estadísticas SQL
+sql_stats_bp = Blueprint('sql_stats', __name__, url_prefix='/api/sql')
+
+
+def _limit(default):
+    try:
+        return int(request.args.get('limit', default))
+    except ValueError:
+        return default
+
+
+@sql_stats_bp.route('/stats', methods=['GET'])
+@admin_required
+def get_sql_stats():
+    """Endpoint con conteo, tiempo total, promedio, p95 y máximo por fingerprint de este worker.
+
+    Query params: `sort` (total, p95, max, avg, count o errors; default total) y `limit` (default 50).
+
+    Returns:
+        JSON: Estadísticas por fingerprint, ordenadas de mayor a menor.
+    """
+    statements = sql_stats.stats(sort=request.args.get('sort', 'total'), limit=_limit(50))
+    return jsonify({
+        'success': True,
+        'message': f'{len(statements)} fingerprints',
+        'data': {
+            'pid': os.getpid(),
+            'since': sql_stats.since,
+            'slow_threshold_ms': sql_stats.slow_threshold_ms,
+            'statements': statements
+        }
+    }), 200
+
+
+@sql_stats_bp.route('/stats', methods=['DELETE'])
+@admin_required
+def reset_sql_stats():
+    """Endpoint para reiniciar las estadísticas y el log de sentencias lentas de este worker."""
+    sql_stats.reset()
+    logger.info("Estadísticas de sentencias SQL reiniciadas")
+    return jsonify({
+        'success': True,
+        'message': 'Estadísticas de sentencias SQL reiniciadas',
+        'data': None
+    }), 200
+
+
+@sql_stats_bp.route('/slow', methods=['GET'])
+@admin_required
+def get_slow_statements():
+    """Endpoint con las sentencias lentas recientes (binds, filas, rowcount, workflow y job).
+
+    Query params: `limit` (default 50).
+
+    Returns:
+        JSON: Sentencias lentas, de la más reciente a la más antigua.
+    """
+    entries = sql_stats.slow_statements(limit=_limit(50))
+    return jsonify({
+        'success': True,
+        'message': f'{len(entries)} sentencias lentas (umbral {sql_stats.slow_threshold_ms} ms)',
+        'data': entries
+    }), 200
@@ -0,0 +1,68 @@
+"""
+Rutas para consultar las trazas de ejecución.
+Expone las trazas completas del buffer en memoria del worker (request → job → paso → queries → SQL).
+Requieren el token de administración (header `X-Admin-Token`): los spans SQL llevan la sentencia
+completa en `db.statement`.
+"""
+
+import logging
+
+from flask import Blueprint, jsonify, request
+from utils.admin import admin_required
+from utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Crear blueprint para trazas
+traces_bp = Blueprint('traces', __name__, url_prefix='/api/traces')
+
+
+@traces_bp.route('', methods=['GET'])
+@admin_required
+def list_traces():
+    """Endpoint con el resumen de las trazas completas más recientes de este worker.
+
+    Query params: `limit` (default 20) y `name` (filtra por el nombre del span raíz, p. ej. TLCL03).
+
+    Returns:
+        JSON: Trazas con nombre, duración, estado y número de spans.
+    """
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        limit = 20
+
+    traces = tracer.traces(limit=limit, name=request.args.get('name'))
+    return jsonify({
+        'success': True,
+        'message': f'{len(traces)} trazas',
+        'data': traces
+    }), 200
+
+
+@traces_bp.route('/<trace_id>', methods=['GET'])
+@admin_required
+def get_trace(trace_id):
+    """Endpoint con una traza completa y sus spans ordenados por inicio.
+
+    Con `?format=otlp` devuelve el documento OTLP/JSON (`resourceSpans`) de la traza.
+
+    Returns:
+        JSON: Traza con sus spans (padre, duración, estado y atributos), o 404.
+    """
+    trace = tracer.get(trace_id)
+    if not trace:
+        return jsonify({
+            'success': False,
+            'message': f'Traza {trace_id} no encontrada en este worker',
+            'data': None
+        }), 404
+
+    if request.args.get('format', '').lower() == 'otlp':
+        return jsonify(tracer.to_otlp(trace_id)), 200
+
+    return jsonify({
+        'success': True,
+        'message': 'Traza obtenida',
+        'data': trace
+    }), 200
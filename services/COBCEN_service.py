@@ -5,6 +5,7 @@ Contiene la lógica de negocio para ejecutar el stored procedure SP_TLCL_COBCEN.
 
 import logging
 from utils.db_connection import HanaConnection
+from utils.health import check_objects, health_monitor
 from queries.COBCEN_queries import COBCENQueries
 
 class COBCENService:
@@ -14,28 +15,33 @@ class COBCENService:
         """Inicializa el servicio COBCEN."""
         self.logger = logging.getLogger(__name__)
     
-    def health_check(self):
+    def health_check(self, deep=False):
         """Verifica el estado de salud del servicio COBCEN.
         
+        Args:
+            deep (bool): True para forzar una verificación fresca; por defecto
+                se sirve el último resultado del health prober.
+            
         Returns:
             dict: Estado del servicio.
         """
         try:
-            connection = HanaConnection()
-            if connection.connect():
-                connection.close()
+            status = health_monitor.get('hana', deep=deep)
+            if status['success']:
                 return {
                     'success': True,
                     'message': 'Servicio COBCEN funcionando correctamente',
                     'service': 'COBCEN',
-                    'database_connection': 'OK'
+                    'database_connection': 'OK',
+                    'health_cache': status['health_cache']
                 }
             else:
                 return {
                     'success': False,
-                    'message': 'Error de conexión a la base de datos',
+                    'message': status['message'],
                     'service': 'COBCEN',
-                    'database_connection': 'ERROR'
+                    'database_connection': 'ERROR',
+                    'health_cache': status['health_cache']
                 }
         except Exception as e:
             return {
@@ -88,4 +94,8 @@ class COBCENService:
             dict: Resultado de la ejecución del stored procedure.
         """
         self.logger.warning("Método run_cobcen_merge es legacy. Use execute_SP_TLCL_COBCEN_sp en su lugar.")
-        return self.execute_SP_TLCL_COBCEN_sp()
\ No newline at end of file
+        return self.execute_SP_TLCL_COBCEN_sp()
+
+
+# Check de salud de COBCEN (objetos del workflow) usado por /health/all
+health_monitor.register('COBCEN', lambda: check_objects(procedures=('SP_TLCL_COBCEN',)))
@@ -5,6 +5,7 @@ Contiene la lógica de negocio para ejecutar stored procedures.
 
 import logging
 from utils.db_connection import HanaConnection
+from utils.health import check_objects, health_monitor
 from queries.SIR_queries import SIRQueries
 
 class SIRService:
@@ -14,28 +15,33 @@ class SIRService:
         """Inicializa el servicio SIR."""
         self.logger = logging.getLogger(__name__)
     
-    def health_check(self):
+    def health_check(self, deep=False):
         """Verifica el estado de salud del servicio SIR.
         
+        Args:
+            deep (bool): True para forzar una verificación fresca; por defecto
+                se sirve el último resultado del health prober.
+            
         Returns:
             dict: Estado del servicio.
         """
         try:
-            connection = HanaConnection()
-            if connection.connect():
-                connection.close()
+            status = health_monitor.get('hana', deep=deep)
+            if status['success']:
                 return {
                     'success': True,
                     'message': 'Servicio SIR funcionando correctamente',
                     'service': 'SIR',
-                    'database_connection': 'OK'
+                    'database_connection': 'OK',
+                    'health_cache': status['health_cache']
                 }
             else:
                 return {
                     'success': False,
-                    'message': 'Error de conexión a la base de datos',
+                    'message': status['message'],
                     'service': 'SIR',
-                    'database_connection': 'ERROR'
+                    'database_connection': 'ERROR',
+                    'health_cache': status['health_cache']
                 }
         except Exception as e:
             return {
@@ -119,4 +125,8 @@ class SIRService:
             }
         finally:
             if connection:
-                connection.close()
\ No newline at end of file
+                connection.close()
+
+
+# Check de salud de SIR (objetos del workflow) usado por /health/all
+health_monitor.register('SIR', lambda: check_objects(procedures=('SP_TLCL_SIR',)))
@@ -0,0 +1,189 @@
+"""
+Servicio para ejecutar varios stored procedures en un solo request.
+Las llamadas sin dependencias pendientes corren en paralelo, cada una sobre una conexión
+del pool; las que declaran `depends_on` esperan a que sus dependencias terminen con éxito.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.db_pool import db_pool
+from utils.jobs import bind_job, current_job, publish_step
+from utils.sp_executor import sp_executor, sp_response
+
+# Procedimientos que se pueden invocar desde /api/sp/batch
+ALLOWED_PROCEDURES = ('SP_TLCL_01', 'SP_TLCL_SIR', 'SP_TLCL_COBCEN')
+
+# Opciones de `sp_response` por procedimiento, iguales a las de su endpoint /execute
+RESPONSE_OPTIONS = {
+    'SP_TLCL_COBCEN': {'success_message': 'Procedimiento COBCEN ejecutado correctamente', 'require_flag': True,
+                       'response_key': 'response', 'error_from_sp': True},
+}
+
+# Parámetros por defecto, iguales a los de los endpoints /execute de cada workflow
+DEFAULT_PARAMS = [0, '']
+
+
+class SPBatchService:
+    """Servicio para ejecutar lotes de stored procedures con dependencias."""
+
+    def __init__(self):
+        """Inicializa el servicio."""
+        self.logger = logging.getLogger(__name__)
+
+    def validate_calls(self, calls):
+        """Valida y normaliza las llamadas del lote.
+
+        Args:
+            calls (list): Elementos {procedure, params, depends_on, id}. `id` es opcional
+                y por defecto es el nombre del procedimiento; `depends_on` acepta un id o una lista.
+
+        Returns:
+            list: Llamadas normalizadas {id, procedure, params, depends_on}.
+
+        Raises:
+            ValueError: Si el lote es inválido (procedimiento no permitido, ids repetidos,
+                dependencias desconocidas o cíclicas).
+        """
+        if not isinstance(calls, list) or not calls:
+            raise ValueError('Se requiere una lista no vacía de llamadas')
+
+        normalized = []
+        for index, call in enumerate(calls):
+            if not isinstance(call, dict):
+                raise ValueError(f'La llamada {index} debe ser un objeto')
+            procedure = str(call.get('procedure', '')).upper()
+            if procedure not in ALLOWED_PROCEDURES:
+                raise ValueError(f"Procedimiento no permitido en la llamada {index}: {call.get('procedure')}. "
+                                 f"Permitidos: {', '.join(ALLOWED_PROCEDURES)}")
+            params = call.get('params', DEFAULT_PARAMS)
+            if not isinstance(params, (list, dict)):
+                raise ValueError(f'params de la llamada {index} debe ser una lista o un objeto')
+            depends_on = call.get('depends_on') or []
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            normalized.append({
+                'id': str(call.get('id') or procedure),
+                'procedure': procedure,
+                'params': params,
+                'depends_on': [str(dep) for dep in depends_on]
+            })
+
+        ids = [call['id'] for call in normalized]
+        duplicated = sorted({call_id for call_id in ids if ids.count(call_id) > 1})
+        if duplicated:
+            raise ValueError(f"Ids repetidos en el lote (usar 'id' para distinguirlos): {', '.join(duplicated)}")
+        for call in normalized:
+            unknown = [dep for dep in call['depends_on'] if dep not in ids]
+            if unknown:
+                raise ValueError(f"{call['id']} depende de llamadas inexistentes: {', '.join(unknown)}")
+
+        # Detectar ciclos resolviendo el orden topológico
+        resolved = set()
+        pending = list(normalized)
+        while pending:
+            ready = [call for call in pending if set(call['depends_on']) <= resolved]
+            if not ready:
+                raise ValueError(f"Dependencias cíclicas entre: {', '.join(call['id'] for call in pending)}")
+            resolved.update(call['id'] for call in ready)
+            pending = [call for call in pending if call['id'] not in resolved]
+
+        return normalized
+
+    def _execute_call(self, call, job):
+        """Ejecuta una llamada sobre una conexión del pool (ligada al job del lote para poder cancelarla)."""
+        start = time.perf_counter()
+        try:
+            with bind_job(job), db_pool.connection() as hana_conn:
+                execution = sp_executor.execute(hana_conn, call['procedure'], call['params'])
+            result = sp_response(execution, **RESPONSE_OPTIONS.get(call['procedure'], {}))
+            # Con `require_flag` un SP sin respuesta no trae `data`
+            data = result['data'] or {}
+            return {
+                'id': call['id'],
+                'procedure': call['procedure'],
+                'status': 'success' if result['success'] else 'error',
+                'flag': data.get('flag'),
+                'message': result['message'] if result['success'] else data.get('mensaje_error') or result['message'],
+                'duration_ms': execution['duration_ms']
+            }
+        except Exception as e:
+            return {
+                'id': call['id'],
+                'procedure': call['procedure'],
+                'status': 'error',
+                'flag': None,
+                'message': f'Error al ejecutar stored procedure: {str(e)}',
+                'duration_ms': round((time.perf_counter() - start) * 1000, 2)
+            }
+
+    def run_batch(self, calls):
+        """Ejecuta el lote respetando dependencias.
+
+        Una llamada se omite (`skipped`) si alguna de sus dependencias falló o si el job
+        del lote fue cancelado antes de lanzarla.
+
+        Args:
+            calls (list): Llamadas ya validadas con `validate_calls`.
+
+        Returns:
+            dict: Resultado por llamada (flag, mensaje, duración) y tiempo total.
+        """
+        start = time.perf_counter()
+        results = {}
+        pending = list(calls)
+        running = {}
+        job = current_job()
+
+        self.logger.info(f"=== Iniciando lote de {len(calls)} stored procedures ===")
+        executor = ThreadPoolExecutor(max_workers=min(len(calls), db_pool.size), thread_name_prefix='sp-batch')
+        try:
+            while pending or running:
+                for call in list(pending):
+                    dep_status = [results[dep]['status'] for dep in call['depends_on'] if dep in results]
+                    cancelled = job is not None and job.cancel_requested
+                    if cancelled or any(status != 'success' for status in dep_status):
+                        pending.remove(call)
+                        results[call['id']] = {
+                            'id': call['id'],
+                            'procedure': call['procedure'],
+                            'status': 'skipped',
+                            'flag': None,
+                            'message': 'Omitido: lote cancelado' if cancelled else
+                                       f"Omitido: falló una dependencia ({', '.join(call['depends_on'])})",
+                            'duration_ms': 0.0
+                        }
+                        publish_step(f"{call['id']} omitido")
+                    elif len(dep_status) == len(call['depends_on']):
+                        pending.remove(call)
+                        running[executor.submit(self._execute_call, call, job)] = call
+                        publish_step(f"Ejecutando {call['procedure']} ({call['id']})")
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    result = future.result()
+                    results[result['id']] = result
+                    self.logger.info(f"{result['id']} terminado: {result['status']} en {result['duration_ms']} ms")
+                    publish_step(f"{result['id']} terminado: {result['status']} ({result['duration_ms']} ms)")
+        finally:
+            executor.shutdown(wait=True)
+
+        ordered = [results[call['id']] for call in calls]
+        failed = [result['id'] for result in ordered if result['status'] != 'success']
+        wall_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.logger.info(f"=== Lote de stored procedures completado en {wall_ms} ms ===")
+
+        return {
+            'success': not failed,
+            'message': 'Lote ejecutado exitosamente' if not failed else f"Llamadas con falla u omitidas: {', '.join(failed)}",
+            'data': {
+                'results': ordered,
+                'wall_ms': wall_ms,
+                # Suma de duraciones: lo que habría tardado el lote ejecutado en serie
+                'sequential_ms': round(sum(result['duration_ms'] for result in ordered), 2)
+            }
+        }
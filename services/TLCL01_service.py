@@ -1,5 +1,8 @@
 from utils.db_connection import HanaConnection
 from queries.TLCL01_queries import TLCL01Queries
+from utils.jobs import StepLog
+from utils.db_pool import db_pool
+from utils.health import health_monitor
 
 class TLCL01Service:
     """
@@ -32,7 +35,7 @@ class TLCL01Service:
             'details': {
                 'records_processed': 0,
                 'temp_table_cleaned': False,
-                'steps_completed': [],
+                'steps_completed': StepLog(),
                 'initial_temp_count': 0,
                 'final_electric_fact_count': 0
             }
@@ -53,7 +56,7 @@ class TLCL01Service:
             # Paso 0: Verificar conteos iniciales
             result['details']['steps_completed'].append("Iniciando proceso de transferencia Electric Fact")
             
-            initial_temp_count = self.queries.get_temp_electric_fact_count()
+            initial_temp_count = self.queries.get_temp_electric_fact_count(exact=True)
             if initial_temp_count is None:
                 result['message'] = "Error: No se pudo obtener el conteo inicial de la tabla temporal."
                 return result
@@ -69,35 +72,35 @@ class TLCL01Service:
             # Paso 1: Table Consumer - Obtener datos de la tabla temporal
             result['details']['steps_completed'].append("Ejecutando Table Consumer: leyendo TELCEL_EE_TEMPELECTRICFACT")
             
-            temp_result = self.queries.get_temp_electric_fact_data()
-            if not temp_result:
+            batch = self.queries.get_temp_electric_fact_data()
+            if batch is None:
                 result['message'] = "Error: No se pudieron obtener los datos de la tabla temporal."
                 return result
 
-            temp_columns, temp_data = temp_result
-            result['details']['steps_completed'].append(f"Table Consumer completado: {len(temp_data)} registros obtenidos")
+            result['details']['steps_completed'].append(f"Table Consumer completado: {len(batch)} registros obtenidos")
 
             # Paso 2: Data Transform - Agregar campo MESANIO
             result['details']['steps_completed'].append("Ejecutando Data Transform: agregando campo MESANIO")
             
-            transform_result = self.queries.transform_data_with_mesanio(temp_columns, temp_data)
-            if not transform_result:
+            batch = self.queries.transform_data_with_mesanio(batch)
+            if batch is None:
                 result['message'] = "Error: No se pudo realizar la transformación de datos."
                 return result
 
-            transformed_columns, transformed_data = transform_result
+            result['details']['date_memo'] = self.queries.last_memo_stats
             result['details']['steps_completed'].append("Data Transform completado: campo MESANIO agregado")
 
             # Paso 3: Table Producer - UPSERT en tabla destino
             result['details']['steps_completed'].append("Ejecutando Table Producer: UPSERT en TELCEL_EE_ELECTRICFACT")
             
-            upsert_success = self.queries.upsert_electric_fact_data(transformed_columns, transformed_data)
+            upsert_success = self.queries.upsert_electric_fact_data(batch)
             if not upsert_success:
                 result['message'] = "Error: No se pudo realizar el UPSERT en la tabla destino."
                 return result
 
-            result['details']['records_processed'] = len(transformed_data)
-            result['details']['steps_completed'].append(f"Table Producer completado: {len(transformed_data)} registros procesados")
+            result['details']['records_processed'] = len(batch)
+            result['details']['bulk_write'] = self.queries.last_write_stats
+            result['details']['steps_completed'].append(f"Table Producer completado: {len(batch)} registros procesados")
 
             # Paso 4: SQL Executor - Truncar tabla temporal
             result['details']['steps_completed'].append("Ejecutando SQL Executor: truncando tabla temporal")
@@ -135,10 +138,30 @@ class TLCL01Service:
 
         return result
 
-    def get_health_status(self):
+    def get_health_status(self, deep=False, exact=False):
         """
         Verifica el estado de salud del servicio TLCL01.
         
+        Args:
+            deep (bool): True para forzar una verificación fresca; por defecto
+                se sirve el último resultado del health prober.
+            exact (bool): True para conteos exactos con COUNT(*) (siempre fresco).
+        
+        Returns:
+            dict: Estado de salud con información de las tablas.
+        """
+        if exact:
+            return self.probe_health_status(exact=True)
+        return health_monitor.get('TLCL01', deep=deep)
+
+    def probe_health_status(self, exact=False):
+        """
+        Ejecuta la verificación de salud de TLCL01 sobre una conexión del pool.
+        La invoca el health prober en segundo plano o un `?deep=true`.
+        
+        Args:
+            exact (bool): True para conteos con COUNT(*); por defecto RECORD_COUNT de M_TABLES.
+        
         Returns:
             dict: Estado de salud con información de las tablas.
         """
@@ -155,29 +178,25 @@ class TLCL01Service:
         }
 
         try:
-            # Crear instancia de conexión
-            self.hana_conn = HanaConnection()
-
-            # Verificar conexión a la base de datos
-            if not self.hana_conn.connect():
-                health_result['status'] = 'unhealthy'
-                health_result['message'] = 'No se pudo conectar a la base de datos'
-                return health_result
-
-            health_result['details']['database_connection'] = True
-            self.queries = TLCL01Queries(self.hana_conn)
-
-            # Verificar acceso a tabla temporal
-            temp_count = self.queries.get_temp_electric_fact_count()
-            if temp_count is not None:
-                health_result['details']['temp_table_accessible'] = True
-                health_result['details']['temp_records_count'] = temp_count
-
-            # Verificar acceso a tabla destino
-            target_count = self.queries.get_electric_fact_count()
-            if target_count is not None:
-                health_result['details']['target_table_accessible'] = True
-                health_result['details']['target_records_count'] = target_count
+            with db_pool.connection() as hana_conn:
+                health_result['details']['database_connection'] = True
+                queries = TLCL01Queries(hana_conn)
+
+                # Conteos de ambas tablas en una sola consulta (M_TABLES, o COUNT(*) si exact)
+                counts = queries.get_record_counts(exact) or {}
+                health_result['details']['count_source'] = 'COUNT(*)' if exact else 'M_TABLES'
+
+                # Verificar acceso a tabla temporal
+                temp_count = counts.get('TELCEL_EE_TEMPELECTRICFACT')
+                if temp_count is not None:
+                    health_result['details']['temp_table_accessible'] = True
+                    health_result['details']['temp_records_count'] = temp_count
+
+                # Verificar acceso a tabla destino
+                target_count = counts.get('TELCEL_EE_ELECTRICFACT')
+                if target_count is not None:
+                    health_result['details']['target_table_accessible'] = True
+                    health_result['details']['target_records_count'] = target_count
 
             # Determinar estado general
             if not health_result['details']['temp_table_accessible'] or not health_result['details']['target_table_accessible']:
@@ -188,10 +207,7 @@ class TLCL01Service:
             health_result['status'] = 'unhealthy'
             health_result['message'] = f'Error en verificación de salud: {str(e)}'
 
-        finally:
-            if self.hana_conn:
-                self.hana_conn.close()
-
+        health_result['success'] = health_result['status'] != 'unhealthy'
         return health_result
 
     def execute_SP_TLCL_01_sp(self, param1=0, param2=''):
@@ -227,4 +243,8 @@ class TLCL01Service:
             }
         finally:
             if connection:
-                connection.close()
\ No newline at end of file
+                connection.close()
+
+
+# Check de salud de TLCL01 refrescado por el health prober
+health_monitor.register('TLCL01', lambda: TLCL01Service().probe_health_status())
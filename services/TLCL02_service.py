@@ -1,5 +1,7 @@
 from utils.db_connection import HanaConnection
 from queries.TLCL02_queries import TLCL02Queries
+from utils.jobs import StepLog
+from utils.health import check_objects, health_monitor
 
 class TLCL02Service:
     """Servicio para gestionar la transferencia de datos de KPI."""
@@ -22,7 +24,7 @@ class TLCL02Service:
             'details': {
                 'records_processed': 0,
                 'temp_table_cleaned': False,
-                'steps_completed': []
+                'steps_completed': StepLog()
             }
         }
 
@@ -42,18 +44,19 @@ class TLCL02Service:
             result['details']['steps_completed'].append("Iniciando proceso de transferencia")
             
             temp_result = self.queries.get_temp_kpi_data()
-            if not temp_result:
+            if temp_result is None:
                 result['message'] = "Error: No se pudieron obtener los datos de la tabla temporal."
                 return result
 
-            temp_columns, temp_data = temp_result
+            # Lote columnar: las columnas calculadas se agregan sin copiar filas
+            batch = temp_result
+            temp_columns = batch.columns
                         
             # print('Columnas fuente: ', temp_columns)
-            # print('Filas: ', temp_data)
             # print('Result: ', temp_result)
 
             # Validar si la tabla temporal está vacía
-            if not temp_data or len(temp_data) == 0:
+            if len(batch) == 0:
                 result['status'] = 'success'
                 result['message'] = "La tabla temporal está vacía, no hay datos para transferir."
                 result['details']['records_processed'] = 0
@@ -70,8 +73,8 @@ class TLCL02Service:
 
                 return result
 
-            result['details']['records_processed'] = len(temp_data)
-            result['details']['steps_completed'].append(f"Registros obtenidos de tabla temporal: {len(temp_data)}")
+            result['details']['records_processed'] = len(batch)
+            result['details']['steps_completed'].append(f"Registros obtenidos de tabla temporal: {len(batch)}")
 
             # 2. Obtener estructura de la tabla destino
             target_columns = self.queries.get_kpi_table_columns()
@@ -94,69 +97,25 @@ class TLCL02Service:
             
             result['details']['steps_completed'].append("Estructuras de tablas compatibles")
 
-            # 5. Formatear datos con campos calculados en posiciones específicas
-            formatted_data = []
-            for row in temp_data:
-                # Crear una copia de la fila original
-                formatted_row = list(row)
-                
-                # Buscar el campo FECHA (asumiendo que está en alguna posición)
-                fecha_value = None
-                fecha_index = None
-                
-                # Buscar FECHA en las columnas temporales
-                for i, col_name in enumerate(temp_columns):
-                    if col_name.upper() == 'FECHA':
-                        fecha_value = row[i]
-                        fecha_index = i
-                        break
-                
-                if fecha_value and fecha_index is not None:
-                    # Calcular campos de fecha usando la función existente
-                    date_fields = self.queries.calculate_date_fields(fecha_value)
-                    
-                    if date_fields:
-                        # Insertar ANIO, MES, DIA en posiciones 3, 4, 5 (índices 2, 3, 4)
-                        # Insertar en orden correcto: ANIO primero, luego MES, luego DIA
-                        formatted_row.insert(2, date_fields['ANIO'])   # Posición 3
-                        formatted_row.insert(3, date_fields['MES'])    # Posición 4  
-                        formatted_row.insert(4, date_fields['DIA'])    # Posición 5
-                        
-                        # Agregar MESANIO al final
-                        formatted_row.append(date_fields['MESANIO'])
-                        
-                        # print(f"Fila formateada: {formatted_row}")
-                        # print(f"ANIO: {date_fields['ANIO']} (pos 3), MES: {date_fields['MES']} (pos 4), DIA: {date_fields['DIA']} (pos 5), MESANIO: {date_fields['MESANIO']} (final)")
-                
-                formatted_data.append(formatted_row)
-            
-            # Actualizar temp_columns para incluir los campos calculados
-            # Insertar ANIO, MES, DIA después de HORA (posición 2)
-            updated_temp_columns = temp_columns.copy()
-            updated_temp_columns.insert(2, 'ANIO')   # Posición 3
-            updated_temp_columns.insert(3, 'MES')    # Posición 4
-            updated_temp_columns.insert(4, 'DIA')    # Posición 5
-            # Agregar MESANIO al final
-            updated_temp_columns.append('MESANIO')
-            
-            # print('Columnas actualizadas: ', updated_temp_columns)
-            
-            # print('Datos originales: ', temp_data[0] if temp_data else 'No hay datos')
-            # print('Datos formateados: ', formatted_data[0] if formatted_data else 'No hay datos formateados')
+            # 5. Calcular campos de fecha por columna (ANIO, MES, DIA y MESANIO)
+            self.queries.add_date_fields(batch)
+            date_stats = self.queries.last_date_stats
+            result['details']['date_fields'] = date_stats
+            result['details']['steps_completed'].append(
+                f"Campos de fecha calculados: {date_stats['valid']} válidas, {date_stats['errors']} inválidas")
 
-            # print('-----------------')
-
-            # 5. Transferir datos formateados (no los originales)
-            success = self.queries.insert_kpi_data(formatted_data, updated_temp_columns, target_columns)
+            # 6. Transferir datos formateados (no los originales)
+            success = self.queries.insert_kpi_data(batch, target_columns)
             if not success:
                 result['message'] = "Error durante la transferencia de datos."
                 return result
 
-            result['details']['steps_completed'].append(f"Datos transferidos exitosamente: {len(formatted_data)} registros")
+            result['details']['steps_completed'].append(f"Datos transferidos exitosamente: {len(batch)} registros")
+            result['details']['bulk_write'] = self.queries.last_write_stats
             result['status'] = 'success'
-            result['message'] = f"Transferencia completada exitosamente. {len(formatted_data)} registros procesados."
+            result['message'] = f"Transferencia completada exitosamente. {len(batch)} registros procesados."
 
-            # 6. Truncar tabla temporal
+            # 7. Truncar tabla temporal
             # truncate_success = self.queries.truncate_temp_table()
             # print("Borrando tabla...")
             # result['details']['temp_table_truncated'] = truncate_success
@@ -171,4 +130,8 @@ class TLCL02Service:
 
         except Exception as e:
             result['message'] = f"Error en la conexión a la base de datos: {str(e)}"
-            return result
\ No newline at end of file
+            return result
+
+
+# Check de salud de TLCL02 (objetos del workflow) usado por /health/all
+health_monitor.register('TLCL02', lambda: check_objects(tables=('TELCEL_EE_TEMPKPI', 'TELCEL_EE_KPI')))
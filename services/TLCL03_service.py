@@ -5,7 +5,9 @@ Contiene la lógica de negocio para las consultas de TLCL03_Counters.
 
 import logging
 from utils.db_connection import HanaConnection
+from utils.health import check_objects, health_monitor
 from queries.TLCL03_queries import TLCL03Queries
+from utils.jobs import StepLog
 
 class TLCL03Service:
     """Servicio para gestionar las operaciones del proceso Counters."""
@@ -14,28 +16,33 @@ class TLCL03Service:
         """Inicializa el servicio Counters."""
         self.logger = logging.getLogger(__name__)
 
-    def health_check(self):
+    def health_check(self, deep=False):
         """Verifica el estado de salud del servicio Counters.
         
+        Args:
+            deep (bool): True para forzar una verificación fresca; por defecto
+                se sirve el último resultado del health prober.
+            
         Returns:
             dict: Estado del servicio.
         """
         try:
-            connection = HanaConnection()
-            if connection.connect():
-                connection.close()
+            status = health_monitor.get('hana', deep=deep)
+            if status['success']:
                 return {
                     'success': True,
                     'message': 'Servicio Counters funcionando correctamente',
                     'service': 'Counters',
-                    'database_connection': 'OK'
+                    'database_connection': 'OK',
+                    'health_cache': status['health_cache']
                 }
             else:
                 return {
                     'success': False,
-                    'message': 'Error de conexión a la base de datos',
+                    'message': status['message'],
                     'service': 'Counters',
-                    'database_connection': 'ERROR'
+                    'database_connection': 'ERROR',
+                    'health_cache': status['health_cache']
                 }
         except Exception as e:
             return {
@@ -89,7 +96,7 @@ class TLCL03Service:
             'details': {
                 'records_processed': 0,
                 'temp_table_cleaned': False,
-                'steps_completed': []
+                'steps_completed': StepLog()
             }
         }
 
@@ -109,18 +116,19 @@ class TLCL03Service:
             result['details']['steps_completed'].append("Iniciando proceso de transferencia")
             
             temp_result = self.queries.get_temp_huawei_counters_data()
-            if not temp_result:
+            if temp_result is None:
                 result['message'] = "Error: No se pudieron obtener los datos de la tabla temporal."
                 return result
 
-            temp_columns, temp_data = temp_result
+            # Lote columnar: las columnas calculadas se agregan sin copiar filas
+            batch = temp_result
+            temp_columns = batch.columns
                         
             # print('Columnas fuente: ', temp_columns)
-            # print('Filas: ', temp_data)
             # print('Result: ', temp_result)
 
             # Validar si la tabla temporal está vacía
-            if not temp_data or len(temp_data) == 0:
+            if len(batch) == 0:
                 result['status'] = 'success'
                 result['message'] = "La tabla temporal está vacía, no hay datos para transferir."
                 result['details']['records_processed'] = 0
@@ -137,8 +145,8 @@ class TLCL03Service:
 
                 return result
 
-            result['details']['records_processed'] = len(temp_data)
-            result['details']['steps_completed'].append(f"Registros obtenidos de tabla temporal: {len(temp_data)}")
+            result['details']['records_processed'] = len(batch)
+            result['details']['steps_completed'].append(f"Registros obtenidos de tabla temporal: {len(batch)}")
 
             # 2. Obtener estructura de la tabla destino
             target_columns = self.queries.get_huawei_counters_table_columns()
@@ -161,75 +169,25 @@ class TLCL03Service:
             
             result['details']['steps_completed'].append("Estructuras de tablas compatibles")
 
-            # 5. Formatear datos con campos calculados en posiciones específicas
-            formatted_data = []
-            for row in temp_data:
-                # Crear una copia de la fila original
-                formatted_row = list(row)
-                
-                # Buscar el campo FECHA (asumiendo que está en alguna posición)
-                fecha_value = None
-                fecha_index = None
-                
-                # Buscar FECHA en las columnas temporales
-                for i, col_name in enumerate(temp_columns):
-                    if col_name.upper() == 'FECHA':
-                        fecha_value = row[i]
-                        fecha_index = i
-                        break
-                
-                if fecha_value and fecha_index is not None:
-                    # Calcular campos de fecha usando la función existente
-                    date_fields = self.queries.calculate_date_fields(fecha_value)
-                    
-                    if date_fields:
-                        # Reemplazar el valor original de FECHA con el formato correcto (sin hora)
-                        formatted_row[fecha_index] = date_fields['FECHA']
-                        
-                        # Insertar HORA después de FECHA (posición fecha_index + 1)
-                        formatted_row.insert(fecha_index + 1, date_fields['HORA'])
-                        
-                        # Insertar ANIO, MES, DIA después de HORA
-                        formatted_row.insert(fecha_index + 2, date_fields['ANIO'])
-                        formatted_row.insert(fecha_index + 3, date_fields['MES'])
-                        formatted_row.insert(fecha_index + 4, date_fields['DIA'])
-                        
-                        # Agregar MESANIO al final
-                        formatted_row.append(date_fields['MESANIO'])
-                        
-                        # print(f"Fila formateada: {formatted_row}")
-                        # print(f"HORA: 00:00:00 (pos 2), ANIO: {date_fields['ANIO']} (pos 3), MES: {date_fields['MES']} (pos 4), DIA: {date_fields['DIA']} (pos 5), MESANIO: {date_fields['MESANIO']} (final)")
-                
-                formatted_data.append(formatted_row)
-            
-            # Actualizar temp_columns para incluir los campos calculados
-            # Insertar HORA, ANIO, MES, DIA después de FECHA (posición 0)
-            updated_temp_columns = temp_columns.copy()
-            updated_temp_columns.insert(1, 'HORA')   # Posición 1 (después de FECHA)
-            updated_temp_columns.insert(2, 'ANIO')   # Posición 2
-            updated_temp_columns.insert(3, 'MES')    # Posición 3
-            updated_temp_columns.insert(4, 'DIA')    # Posición 4
-            # Agregar MESANIO al final
-            updated_temp_columns.append('MESANIO')
-            
-            # print('Columnas actualizadas: ', updated_temp_columns)
-            
-            # print('Datos originales: ', temp_data[0] if temp_data else 'No hay datos')
-            # print('Datos formateados: ', formatted_data[0] if formatted_data else 'No hay datos formateados')
+            # 5. Calcular campos de fecha por columna (HORA, ANIO, MES, DIA y MESANIO)
+            self.queries.add_date_fields(batch)
+            date_stats = self.queries.last_date_stats
+            result['details']['date_fields'] = date_stats
+            result['details']['steps_completed'].append(
+                f"Campos de fecha calculados: {date_stats['valid']} válidas, {date_stats['errors']} inválidas")
 
-            # print('-----------------')
-
-            # 5. Transferir datos formateados (no los originales)
-            success = self.queries.insert_huawei_counters_data(formatted_data, updated_temp_columns, target_columns)
+            # 6. Transferir datos formateados (no los originales)
+            success = self.queries.insert_huawei_counters_data(batch, target_columns)
             if not success:
                 result['message'] = "Error durante la transferencia de datos."
                 return result
 
-            result['details']['steps_completed'].append(f"Datos transferidos exitosamente: {len(formatted_data)} registros")
+            result['details']['steps_completed'].append(f"Datos transferidos exitosamente: {len(batch)} registros")
+            result['details']['bulk_write'] = self.queries.last_write_stats
             result['status'] = 'success'
-            result['message'] = f"Transferencia completada exitosamente. {len(formatted_data)} registros procesados."
+            result['message'] = f"Transferencia completada exitosamente. {len(batch)} registros procesados."
 
-            # 6. Truncar tabla temporal
+            # 7. Truncar tabla temporal
             # truncate_success = self.queries.truncate_temp_table()
             # print("Borrando tabla...")
             # result['details']['temp_table_truncated'] = truncate_success
@@ -247,5 +205,5 @@ class TLCL03Service:
             return result
 
 
-
-
+# Check de salud de TLCL03 (objetos del workflow) usado por /health/all
+health_monitor.register('TLCL03', lambda: check_objects(tables=('TELCEL_EE_TEMPHUAWEICOUNTERS', 'TELCEL_EE_HUAWEICOUNTERS')))
@@ -5,7 +5,10 @@ Contiene la lógica de negocio para el procesamiento de Ericsson Counters.
 
 import logging
 from utils.db_connection import HanaConnection
+from utils.db_pool import db_pool
+from utils.health import check_objects, health_monitor
 from queries.TLCL04_queries import TLCL04Queries
+from utils.jobs import publish_step
 
 class TLCL04Service:
     """Servicio para gestionar las operaciones del proceso TLCL04."""
@@ -14,28 +17,33 @@ class TLCL04Service:
         """Inicializa el servicio TLCL04."""
         self.logger = logging.getLogger(__name__)
     
-    def health_check(self):
+    def health_check(self, deep=False):
         """Verifica el estado de salud del servicio TLCL04.
         
+        Args:
+            deep (bool): True para forzar una verificación fresca; por defecto
+                se sirve el último resultado del health prober.
+            
         Returns:
             dict: Estado del servicio.
         """
         try:
-            connection = HanaConnection()
-            if connection.connect():
-                connection.close()
+            status = health_monitor.get('hana', deep=deep)
+            if status['success']:
                 return {
                     'success': True,
                     'message': 'Servicio TLCL04 funcionando correctamente',
                     'service': 'TLCL04',
-                    'database_connection': 'OK'
+                    'database_connection': 'OK',
+                    'health_cache': status['health_cache']
                 }
             else:
                 return {
                     'success': False,
-                    'message': 'Error de conexión a la base de datos',
+                    'message': status['message'],
                     'service': 'TLCL04',
-                    'database_connection': 'ERROR'
+                    'database_connection': 'ERROR',
+                    'health_cache': status['health_cache']
                 }
         except Exception as e:
             return {
@@ -76,6 +84,7 @@ class TLCL04Service:
             
             # PASO 1: SQL Executor inicial - Procesar múltiples fuentes de datos
             self.logger.info("PASO 1: Ejecutando SQL Executor inicial")
+            publish_step("PASO 1: Ejecutando SQL Executor inicial")
             initial_result = queries.run_tlcl04_initial_sql()
             if not initial_result['success']:
                 return {
@@ -86,6 +95,7 @@ class TLCL04Service:
             
             # PASO 2: Table Consumer - Leer datos de tabla temporal
             self.logger.info("PASO 2: Table Consumer - Leyendo datos de TEMPERICSSONCOUNTERS")
+            publish_step("PASO 2: Table Consumer - Leyendo datos de TEMPERICSSONCOUNTERS")
             temp_data = queries.get_temp_ericsson_counters_data()
             if not temp_data:
                 self.logger.warning("No se encontraron datos en la tabla temporal")
@@ -100,10 +110,12 @@ class TLCL04Service:
             
             # PASO 3: Data Transform - Agregar campos calculados
             self.logger.info(f"PASO 3: Data Transform - Procesando {len(temp_data)} registros")
+            publish_step(f"PASO 3: Data Transform - Procesando {len(temp_data)} registros")
             transformed_data = queries.transform_and_add_date_fields(temp_data)
             
             # PASO 4: Table Producer - UPSERT a tabla final
             self.logger.info("PASO 4: Table Producer - UPSERT a ERICSSONCOUNTERS")
+            publish_step("PASO 4: Table Producer - UPSERT a ERICSSONCOUNTERS")
             upsert_result = queries.upsert_ericsson_counters(transformed_data)
             if not upsert_result['success']:
                 return {
@@ -114,12 +126,14 @@ class TLCL04Service:
             
             # PASO 5: SQL Executor final - Truncar tabla temporal
             self.logger.info("PASO 5: SQL Executor final - Truncando tabla temporal")
+            publish_step("PASO 5: SQL Executor final - Truncando tabla temporal")
             truncate_result = queries.truncate_temp_table()
             if not truncate_result['success']:
                 self.logger.warning(f"Advertencia al truncar tabla temporal: {truncate_result['message']}")
             
             # PASO 6: Graph Terminator - Obtener estadísticas finales
             self.logger.info("PASO 6: Graph Terminator - Obteniendo estadísticas finales")
+            publish_step("PASO 6: Graph Terminator - Obteniendo estadísticas finales")
             final_counts = queries.get_record_counts()
             
             self.logger.info("=== Proceso TLCL04 completado exitosamente ===")
@@ -131,6 +145,7 @@ class TLCL04Service:
                     'initial_sql': initial_result,
                     'records_processed': len(temp_data),
                     'upsert_result': upsert_result,
+                    'date_fields': queries.last_date_stats,
                     'truncate_result': truncate_result,
                     'final_counts': final_counts.get('counts', {}),
                     'process_steps': [
@@ -155,23 +170,20 @@ class TLCL04Service:
             if connection:
                 connection.close()
 
-    def get_process_status(self):
+    def get_process_status(self, exact=False):
         """Obtiene el estado general del proceso TLCL04.
         
+        Args:
+            exact (bool): True para conteos con COUNT(*); por defecto RECORD_COUNT de M_TABLES.
+        
         Returns:
             dict: Información del estado del proceso.
         """
         try:
-            connection = HanaConnection()
-            if not connection.connect():
-                return {
-                    'success': False,
-                    'message': 'Error al conectar con la base de datos',
-                    'data': None
-                }
-
-            queries = TLCL04Queries(connection)
-            counts = queries.get_record_counts()
+            # Conexión del pool: el status es una consulta corta y no justifica un login nuevo
+            with db_pool.connection() as connection:
+                queries = TLCL04Queries(connection)
+                counts = queries.get_record_counts(exact)
             
             return {
                 'success': True,
@@ -184,6 +196,7 @@ class TLCL04Service:
                         'target': 'TELCEL_EE_ERICSSONCOUNTERS'
                     },
                     'record_counts': counts.get('counts', {}),
+                    'count_source': counts.get('count_source'),
                     'process_flow': [
                         'SQL Executor inicial (múltiples fuentes)',
                         'Table Consumer (TEMPERICSSONCOUNTERS)',
@@ -201,6 +214,7 @@ class TLCL04Service:
                 'message': f'Error interno del servidor: {str(e)}',
                 'data': None
             }
-        finally:
-            if connection:
-                connection.close()
\ No newline at end of file
+
+
+# Check de salud de TLCL04 (objetos del workflow) usado por /health/all
+health_monitor.register('TLCL04', lambda: check_objects(tables=('TELCEL_EE_TEMPERICSSONCOUNTERS', 'TELCEL_EE_ERICSSONCOUNTERS')))
@@ -0,0 +1,61 @@
+"""
+Autorización de los modos y endpoints de administración (`?profile=`, `/api/profiles`, `/api/sql`,
+`/api/traces`).
+Compara el header `X-Admin-Token` (o `Authorization: Bearer <token>`) con `ADMIN_TOKEN`;
+sin `ADMIN_TOKEN` configurado quedan desactivados.
+"""
+
+import hmac
+import logging
+from functools import wraps
+
+from flask import jsonify, request
+from utils.config import ADMIN_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def _request_token():
+    token = request.headers.get('X-Admin-Token')
+    if token:
+        return token
+    authorization = request.headers.get('Authorization', '')
+    if authorization.lower().startswith('bearer '):
+        return authorization[7:].strip()
+    return ''
+
+
+def admin_denied():
+    """Verifica el token de administración del request actual.
+
+    Returns:
+        tuple: (respuesta JSON, código) si el request no está autorizado, o None si lo está.
+    """
+    if not ADMIN_CONFIG['token']:
+        return jsonify({
+            'success': False,
+            'message': 'Funciones de administración desactivadas (ADMIN_TOKEN no configurado)',
+            'data': None
+        }), 403
+
+    if not hmac.compare_digest(_request_token().encode(), ADMIN_CONFIG['token'].encode()):
+        logger.warning(f"Token de administración inválido en {request.method} {request.path}")
+        return jsonify({
+            'success': False,
+            'message': 'Token de administración inválido o ausente (header X-Admin-Token)',
+            'data': None
+        }), 401
+
+    return None
+
+
+def admin_required(view):
+    """Decorador de endpoints que exige el token de administración."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        denied = admin_denied()
+        if denied:
+            return denied
+        return view(*args, **kwargs)
+
+    return wrapper
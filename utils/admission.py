@@ -0,0 +1,166 @@
+"""
+Control de admisión por clase de workflow.
+Limita las ejecuciones simultáneas de cada clase, mantiene una cola de espera acotada
+y rechaza rápido con 429 + Retry-After cuando la cola está llena, protegiendo a HANA
+y a los health checks de ráfagas de ejecuciones pesadas.
+"""
+
+import logging
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify
+from utils.config import ADMISSION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Permiso de admisión del request en curso (para cederlo a jobs en segundo plano)
+_local = threading.local()
+
+
+class AdmissionPermit:
+    """Permiso obtenido de un limitador; liberarlo varias veces es seguro."""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.transferred = False
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        """Devuelve el cupo al limitador (solo la primera vez)."""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self.limiter.release()
+
+
+class WorkflowClassLimiter:
+    """Semáforo con cola de espera acotada para una clase de workflow."""
+
+    def __init__(self, name, concurrency, queue, queue_timeout, retry_after):
+        """Inicializa el limitador.
+
+        Args:
+            name (str): Nombre de la clase ('heavy', 'light').
+            concurrency (int): Ejecuciones simultáneas permitidas.
+            queue (int): Solicitudes que pueden esperar un cupo.
+            queue_timeout (float): Segundos máximos de espera en cola.
+            retry_after (int): Segundos sugeridos al cliente en el 429.
+        """
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Intenta obtener un cupo, esperando en cola si hay lugar.
+
+        Returns:
+            AdmissionPermit: Permiso obtenido, o None si la cola está llena o venció la espera.
+        """
+        with self._cond:
+            if self.active < self.concurrency:
+                self.active += 1
+                return AdmissionPermit(self)
+
+            if self.waiting >= self.queue:
+                self.rejected += 1
+                return None
+
+            self.waiting += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return None
+                    self._cond.wait(remaining)
+                self.active += 1
+                return AdmissionPermit(self)
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        """Libera un cupo y despierta a la siguiente solicitud en cola."""
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def snapshot(self):
+        """Estado actual del limitador."""
+        with self._cond:
+            return {
+                'concurrency': self.concurrency,
+                'active': self.active,
+                'queue': self.queue,
+                'waiting': self.waiting,
+                'rejected': self.rejected
+            }
+
+
+limiters = {
+    name: WorkflowClassLimiter(name, **values)
+    for name, values in ADMISSION_CONFIG.items()
+}
+
+
+def handoff_permit():
+    """Cede el permiso del request actual a quien lo solicite (p. ej. un job en segundo plano).
+
+    Returns:
+        AdmissionPermit: Permiso que el llamador debe liberar, o None si no hay.
+    """
+    permit = getattr(_local, 'permit', None)
+    if permit:
+        permit.transferred = True
+        _local.permit = None
+    return permit
+
+
+def admission_control(workflow_class):
+    """Decorador de endpoints que aplica el presupuesto de la clase indicada.
+
+    Args:
+        workflow_class (str): Clase de workflow configurada en `ADMISSION_CONFIG`.
+    """
+    limiter = limiters[workflow_class]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            permit = limiter.acquire()
+            if permit is None:
+                logger.warning(f"Solicitud rechazada por control de admisión ({workflow_class})")
+                response = jsonify({
+                    'success': False,
+                    'message': f'Capacidad agotada para workflows {workflow_class}, reintente más tarde',
+                    'data': {
+                        'workflow_class': workflow_class,
+                        'retry_after': limiter.retry_after,
+                        **limiter.snapshot()
+                    }
+                })
+                response.status_code = 429
+                response.headers['Retry-After'] = str(limiter.retry_after)
+                return response
+
+            _local.permit = permit
+            try:
+                return view(*args, **kwargs)
+            finally:
+                _local.permit = None
+                if not permit.transferred:
+                    permit.release()
+
+        return wrapper
+
+    return decorator
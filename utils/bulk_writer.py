@@ -0,0 +1,404 @@
+"""
+Escritor por lotes para los Table Producers.
+Envía las filas con `executemany` en lotes cuyo tamaño se adapta a la latencia medida:
+empieza pequeño, mide el costo por fila y por byte, y crece o se reduce hacia una latencia
+objetivo por lote sin superar un techo de memoria estimada. La política de commit
+(cada lote, cada N filas, cada T segundos, una sola transacción o autocommit) es configurable.
+Opcionalmente, antes de escribir colapsa las filas con la misma llave primaria (gana la última,
+igual que con UPSERTs sucesivos) y las ordena por llave para mejorar la localidad de escritura.
+"""
+
+import logging
+import time
+
+from utils.config import BULK_CONFIG
+from utils.jobs import check_cancelled, publish_progress
+from utils.metrics import metrics
+from utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Filas que se muestrean de cada lote para estimar su tamaño en bytes
+_BYTES_SAMPLE_ROWS = 20
+
+# Tamaños de los primeros lotes que se incluyen en el resumen (la rampa del batcher); el resto
+# queda en el histograma `tlcl_bulk_batch_rows`
+_SIZES_SAMPLE = 20
+
+
+def estimate_row_bytes(row):
+    """Estimación barata del tamaño de una fila (para el techo de memoria del lote)."""
+    size = 0
+    for value in row:
+        if value is None:
+            size += 1
+        elif isinstance(value, (str, bytes)):
+            size += len(value)
+        else:
+            size += 8
+    return size
+
+
+def _sort_key(value):
+    """Llave de orden que admite None (va primero)."""
+    return (value is not None, value)
+
+
+def dedupe_rows(rows, key_positions):
+    """Colapsa filas con la misma llave (conserva la última) y las ordena por llave.
+
+    Args:
+        rows (list): Filas a escribir.
+        key_positions (list): Posiciones de las columnas de la llave primaria en cada fila.
+
+    Returns:
+        tuple: (filas únicas ordenadas por llave, escrituras eliminadas).
+    """
+    latest = {}
+    for row in rows:
+        # La última aparición de cada llave reemplaza a las anteriores
+        latest[tuple(row[i] for i in key_positions)] = row
+    unique = list(latest.items())
+    try:
+        unique.sort(key=lambda item: tuple(_sort_key(v) for v in item[0]))
+    except TypeError:
+        # Tipos mezclados en una columna de la llave: ordenar por su representación textual
+        unique.sort(key=lambda item: tuple(str(v) for v in item[0]))
+    return [row for _, row in unique], len(rows) - len(unique)
+
+
+class AdaptiveBatcher:
+    """Calcula el tamaño del siguiente lote a partir de la latencia de los anteriores."""
+
+    def __init__(self, target_seconds=None, initial_size=None, min_size=None, max_size=None, max_bytes=None):
+        """Inicializa el batcher (valores por defecto de `BULK_CONFIG`).
+
+        Args:
+            target_seconds (float): Latencia objetivo por lote.
+            initial_size (int): Filas del primer lote.
+            min_size (int): Mínimo de filas por lote.
+            max_size (int): Máximo de filas por lote.
+            max_bytes (int): Techo de bytes estimados por lote.
+        """
+        self.target_seconds = target_seconds or BULK_CONFIG['target_seconds']
+        self.min_size = min_size or BULK_CONFIG['min_size']
+        self.max_size = max_size or BULK_CONFIG['max_size']
+        self.max_bytes = max_bytes or BULK_CONFIG['max_bytes']
+        self.size = max(self.min_size, min(initial_size or BULK_CONFIG['initial_size'], self.max_size))
+        self.seconds_per_row = None
+        self.seconds_per_byte = None
+        self.bytes_per_row = None
+        self.batches = 0
+        self.rows = 0
+        self.min_batch = None
+        self.max_batch = None
+        self.last_batch = None
+        self.first_sizes = []
+
+    def record(self, rows, seconds, row_bytes):
+        """Registra un lote ejecutado y recalcula el tamaño del siguiente.
+
+        Args:
+            rows (int): Filas del lote.
+            seconds (float): Duración del `executemany`, o None si falló (el lote se cuenta
+                pero no ajusta el tamaño).
+            row_bytes (float): Bytes estimados por fila del lote.
+        """
+        self.batches += 1
+        self.rows += rows
+        self.min_batch = rows if self.min_batch is None else min(self.min_batch, rows)
+        self.max_batch = rows if self.max_batch is None else max(self.max_batch, rows)
+        self.last_batch = rows
+        if len(self.first_sizes) < _SIZES_SAMPLE:
+            self.first_sizes.append(rows)
+        if rows <= 0 or seconds is None:
+            return
+
+        # Promedio móvil para no reaccionar de más a un lote atípico
+        per_row = seconds / rows
+        self.seconds_per_row = per_row if self.seconds_per_row is None else 0.5 * self.seconds_per_row + 0.5 * per_row
+        self.bytes_per_row = row_bytes if self.bytes_per_row is None else 0.5 * self.bytes_per_row + 0.5 * row_bytes
+        if self.bytes_per_row:
+            self.seconds_per_byte = self.seconds_per_row / self.bytes_per_row
+
+        ideal = self.target_seconds / self.seconds_per_row if self.seconds_per_row > 0 else self.max_size
+        # Crecer como mucho al doble por lote; reducir de inmediato si el lote fue lento
+        ideal = min(ideal, self.size * 2)
+        if self.bytes_per_row:
+            ideal = min(ideal, self.max_bytes / self.bytes_per_row)
+        self.size = int(max(self.min_size, min(ideal, self.max_size)))
+
+    def summary(self):
+        """Tamaños elegidos y costos medidos (para el resultado de la ejecución).
+
+        De tamaño acotado aunque la escritura tenga miles de lotes: conteo, mínimo, máximo,
+        promedio, último y los primeros `_SIZES_SAMPLE` tamaños.
+        """
+        return {
+            'target_seconds': self.target_seconds,
+            'batches': self.batches,
+            'first_batch_sizes': self.first_sizes,
+            'min_batch': self.min_batch,
+            'max_batch': self.max_batch,
+            'avg_batch': round(self.rows / self.batches, 1) if self.batches else None,
+            'last_batch': self.last_batch,
+            'final_batch': self.size,
+            'ms_per_row': round(self.seconds_per_row * 1000, 4) if self.seconds_per_row is not None else None,
+            'us_per_byte': round(self.seconds_per_byte * 1e6, 4) if self.seconds_per_byte is not None else None,
+            'bytes_per_row': round(self.bytes_per_row, 1) if self.bytes_per_row is not None else None
+        }
+
+
+class CommitPolicy:
+    """Política de commit de un `BulkWriter`."""
+
+    MODES = ('batch', 'rows', 'seconds', 'single', 'autocommit')
+
+    def __init__(self, mode='batch', value=None):
+        """Inicializa la política.
+
+        Args:
+            mode (str): 'batch', 'rows', 'seconds', 'single' o 'autocommit'.
+            value (float, optional): N filas ('rows') o T segundos ('seconds').
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Política de commit desconocida: {mode}. Opciones: {', '.join(self.MODES)}")
+        if mode in ('rows', 'seconds') and not value:
+            raise ValueError(f"La política '{mode}' requiere un valor (p. ej. '{mode}:1000')")
+        self.mode = mode
+        self.value = value
+
+    @classmethod
+    def parse(cls, spec):
+        """Crea una política desde su forma textual (`batch`, `rows:N`, `seconds:T`, `single`, `autocommit`)."""
+        if isinstance(spec, cls):
+            return spec
+        mode, _, value = str(spec or 'batch').strip().lower().partition(':')
+        return cls(mode, float(value) if value else None)
+
+    @property
+    def explicit(self):
+        """True si el escritor controla los commits (desactiva el autocommit del driver)."""
+        return self.mode != 'autocommit'
+
+    def due(self, rows_since_commit, seconds_since_commit):
+        """True si corresponde confirmar tras el lote recién escrito."""
+        if self.mode == 'batch':
+            return True
+        if self.mode == 'rows':
+            return rows_since_commit >= self.value
+        if self.mode == 'seconds':
+            return seconds_since_commit >= self.value
+        return False
+
+    def describe(self):
+        """Forma textual de la política."""
+        if self.value is None:
+            return self.mode
+        return f"{self.mode}:{self.value:g}"
+
+
+class BulkWriter:
+    """Escritor `executemany` por lotes adaptativos, compartido por los Table Producers."""
+
+    def __init__(self, hana_conn, query, table=None, row_fallback=False, commit='batch', batcher=None,
+                 key_positions=None, dedupe=False):
+        """Inicializa el escritor.
+
+        Args:
+            hana_conn: Instancia de `HanaConnection` con `cursor` y `connection`.
+            query (str): Sentencia parametrizada (INSERT/UPSERT).
+            table (str, optional): Nombre de la tabla destino (para logs).
+            row_fallback (bool): Si un lote falla, reintentar fila por fila todo lo no confirmado
+                (el lote y los anteriores desde el último commit) y contar las fallidas en lugar
+                de abortar (tolerancia por fila de TLCL02/TLCL03). Con una política explícita la
+                reescritura confirma fila por fila, así que `single` deja de ser todo o nada.
+            commit (str | CommitPolicy): Política de commit (ver `CommitPolicy.parse`).
+            batcher (AdaptiveBatcher, optional): Batcher a usar; por defecto uno nuevo.
+            key_positions (list, optional): Posiciones de la llave primaria en cada fila.
+            dedupe (bool): Colapsar duplicados por llave y ordenar por llave antes de escribir
+                (requiere `key_positions`; solo tiene sentido para UPSERT).
+        """
+        self.hana_conn = hana_conn
+        self.query = query
+        self.table = table
+        self.row_fallback = row_fallback
+        self.commit_policy = CommitPolicy.parse(commit)
+        self.batcher = batcher or AdaptiveBatcher()
+        self.key_positions = key_positions
+        self.dedupe = dedupe and bool(key_positions)
+
+    def _write_rows_one_by_one(self, cursor, rows):
+        """Reintenta filas una a una; devuelve (escritas, fallidas, commits, segundos de commit).
+
+        Con una política explícita cada fila se confirma al escribirse: un lock wait timeout
+        o un deadlock revierte toda la transacción abierta en HANA, así que una falla posterior
+        no puede deshacer filas ya contadas como escritas.
+        """
+        explicit = self.commit_policy.explicit
+        connection = self.hana_conn.connection
+        written = failed = commits = 0
+        commit_seconds = 0.0
+        for row in rows:
+            try:
+                cursor.execute(self.query, row)
+                if explicit:
+                    commit_seconds += self._commit()
+                    commits += 1
+                written += 1
+            except Exception as row_error:
+                failed += 1
+                logger.warning(f"Fila descartada en {self.table}: {row_error}")
+                if explicit:
+                    connection.rollback()
+        return written, failed, commits, commit_seconds
+
+    def write(self, rows):
+        """Escribe todas las filas.
+
+        Args:
+            rows (list): Filas (listas/tuplas) en el orden de los parámetros de `query`.
+
+        Returns:
+            dict: {rows_written, rows_failed, affected_rows, seconds, rows_per_second, batching}.
+
+        Si la política controla los commits, el autocommit del driver se desactiva durante
+        la escritura; ante un error se revierte lo no confirmado (todo, con 'single').
+
+        Raises:
+            Exception: El error del driver si un lote falla y `row_fallback` es False.
+        """
+        policy = self.commit_policy
+        connection = self.hana_conn.connection
+        previous_autocommit = None
+        if policy.explicit and hasattr(connection, 'setautocommit'):
+            previous_autocommit = connection.getautocommit()
+            connection.setautocommit(False)
+
+        dedupe_stats = None
+        if self.dedupe:
+            start = time.perf_counter()
+            input_rows = len(rows)
+            rows, eliminated = dedupe_rows(rows, self.key_positions)
+            dedupe_stats = {
+                'input_rows': input_rows,
+                'unique_rows': len(rows),
+                'writes_eliminated': eliminated,
+                'seconds': round(time.perf_counter() - start, 3)
+            }
+            if eliminated:
+                logger.info(f"{eliminated} filas duplicadas por llave descartadas antes de escribir en {self.table}")
+
+        try:
+            with tracer.span(f'executemany {self.table}', kind='client', **{'db.table': self.table, 'rows': len(rows)}) as span:
+                stats = self._write(rows)
+                span.set_attribute('batches', stats['batching']['batches'])
+                span.set_attribute('rows_failed', stats['rows_failed'])
+            stats['dedupe'] = dedupe_stats
+        except Exception:
+            if policy.explicit:
+                connection.rollback()
+            raise
+        finally:
+            if previous_autocommit is not None:
+                connection.setautocommit(previous_autocommit)
+
+        metrics.inc('tlcl_table_rows_total', stats['rows_written'], table=self.table, operation='write')
+        batching = stats['batching']
+        logger.info(f"Escritura por lotes en {self.table}: {stats['rows_written']} filas ({stats['rows_failed']} fallidas) "
+                    f"en {stats['seconds']}s, {batching['batches']} lotes ({batching['min_batch']}-{batching['max_batch']} filas), "
+                    f"commit {policy.describe()} ({stats['commit']['commits']} commits)")
+        return stats
+
+    def _commit(self):
+        """Confirma y devuelve la duración del commit."""
+        start = time.perf_counter()
+        self.hana_conn.connection.commit()
+        return time.perf_counter() - start
+
+    def _write(self, rows):
+        """Bucle de escritura por lotes (ver `write`)."""
+        policy = self.commit_policy
+        cursor = self.hana_conn.cursor
+        total = len(rows)
+        written = failed = affected = 0
+        commits = 0
+        commit_seconds = 0.0
+        rows_since_commit = 0
+        # Escritas y afectadas desde el último commit (se pierden si HANA revierte la transacción)
+        pending_written = pending_affected = 0
+        replayed = 0
+        start = last_commit = time.perf_counter()
+        position = 0
+
+        while position < total:
+            check_cancelled()
+            batch = rows[position:position + self.batcher.size]
+            sample = batch[:_BYTES_SAMPLE_ROWS]
+            row_bytes = sum(estimate_row_bytes(row) for row in sample) / len(sample)
+
+            batch_start = time.perf_counter()
+            batch_seconds = None
+            try:
+                cursor.executemany(self.query, batch)
+                batch_seconds = time.perf_counter() - batch_start
+                batch_affected = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else 0
+                written += len(batch)
+                affected += batch_affected
+                if policy.explicit:
+                    pending_written += len(batch)
+                    pending_affected += batch_affected
+                    rows_since_commit += len(batch)
+            except Exception as batch_error:
+                if not self.row_fallback:
+                    raise
+                # Un lock wait timeout o un deadlock revierte toda la transacción abierta en HANA,
+                # no solo este lote: se revierte explícitamente y se reescribe todo lo no confirmado
+                if policy.explicit:
+                    self.hana_conn.connection.rollback()
+                pending = rows[position - rows_since_commit:position + len(batch)]
+                logger.warning(f"Lote de {len(batch)} filas falló en {self.table} ({batch_error}); "
+                               f"reintentando fila por fila {len(pending)} filas no confirmadas")
+                written -= pending_written
+                affected -= pending_affected
+                ok, ko, row_commits, row_commit_seconds = self._write_rows_one_by_one(cursor, pending)
+                written += ok
+                failed += ko
+                affected += ok
+                commits += row_commits
+                commit_seconds += row_commit_seconds
+                replayed += len(pending) - len(batch)
+                pending_written = pending_affected = rows_since_commit = 0
+                last_commit = time.perf_counter()
+            metrics.observe('tlcl_bulk_batch_rows', len(batch), table=self.table)
+            # El batcher se ajusta con la latencia del executemany, sin contar el commit ni el
+            # reintento fila por fila de un lote fallido
+            self.batcher.record(len(batch), batch_seconds, row_bytes)
+            position += len(batch)
+
+            if policy.explicit and rows_since_commit and policy.due(rows_since_commit, time.perf_counter() - last_commit):
+                commit_seconds += self._commit()
+                commits += 1
+                pending_written = pending_affected = rows_since_commit = 0
+                last_commit = time.perf_counter()
+            publish_progress(position, total, len(batch), time.perf_counter() - batch_start)
+
+        if policy.explicit and rows_since_commit:
+            commit_seconds += self._commit()
+            commits += 1
+
+        seconds = time.perf_counter() - start
+        return {
+            'rows_written': written,
+            'rows_failed': failed,
+            'rows_replayed': replayed,
+            'affected_rows': affected,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(written / seconds, 1) if seconds > 0 else None,
+            'commit': {
+                'policy': policy.describe(),
+                'commits': commits,
+                'commit_seconds': round(commit_seconds, 3)
+            },
+            'batching': self.batcher.summary()
+        }
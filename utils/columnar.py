@@ -0,0 +1,125 @@
+"""
+Representación columnar en memoria de los lotes que viajan entre Table Consumer,
+Data Transform y Table Producer.
+Cada columna es una lista; los campos calculados se agregan como listas nuevas en lugar de
+copiar cada fila e insertar valores en posiciones desplazadas. Las filas (tuplas) solo se
+arman con `zip` al momento del `executemany`.
+"""
+
+
+class ColumnarBatch:
+    """Lote de datos almacenado por columnas."""
+
+    def __init__(self, columns, arrays, length=None):
+        """Inicializa el lote.
+
+        Args:
+            columns (list): Nombres de las columnas.
+            arrays (list): Una lista de valores por columna, en el mismo orden.
+            length (int, optional): Número de filas (necesario si no hay columnas).
+        """
+        if len(columns) != len(arrays):
+            raise ValueError(f"Se recibieron {len(arrays)} columnas de datos para {len(columns)} nombres")
+        self._columns = list(columns)
+        self._arrays = list(arrays)
+        self._index = {name: i for i, name in enumerate(self._columns)}
+        self._length = len(arrays[0]) if arrays else (length or 0)
+        for name, values in zip(self._columns, self._arrays):
+            self._check_length(name, values)
+
+    @classmethod
+    def from_rows(cls, columns, rows, converters=None):
+        """Transpone filas (p. ej. el resultado de `fetchall`) a columnas.
+
+        Args:
+            columns (list): Nombres de las columnas, en el orden de las filas.
+            rows (list): Filas leídas.
+            converters (tuple, optional): Conversor por columna (o None), como los de
+                `utils.converters`; se aplica a la columna completa y respeta los NULL.
+
+        Returns:
+            ColumnarBatch: Lote con los datos de las filas.
+        """
+        if rows:
+            arrays = [list(values) for values in zip(*rows)]
+        else:
+            arrays = [[] for _ in columns]
+        if converters:
+            for i, converter in enumerate(converters):
+                if converter is not None:
+                    arrays[i] = [None if value is None else converter(value) for value in arrays[i]]
+        return cls(columns, arrays, len(rows))
+
+    @property
+    def columns(self):
+        """Nombres de las columnas (copia)."""
+        return list(self._columns)
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def index(self, name):
+        """Posición de una columna (ValueError si no existe, como `list.index`)."""
+        if name not in self._index:
+            raise ValueError(f"La columna {name} no existe en el lote")
+        return self._index[name]
+
+    def column(self, name):
+        """Valores de una columna (la lista interna, sin copiar)."""
+        return self._arrays[self.index(name)]
+
+    def set_column(self, name, values):
+        """Reemplaza los valores de una columna existente."""
+        self._check_length(name, values)
+        self._arrays[self.index(name)] = list(values)
+
+    def add_column(self, name, values, position=None):
+        """Agrega una columna calculada.
+
+        Args:
+            name (str): Nombre de la columna.
+            values (list): Un valor por fila.
+            position (int, optional): Posición de la nueva columna; por defecto al final.
+        """
+        if name in self._index:
+            raise ValueError(f"La columna {name} ya existe en el lote")
+        self._check_length(name, values)
+        if position is None:
+            position = len(self._columns)
+        self._columns.insert(position, name)
+        self._arrays.insert(position, list(values))
+        self._index = {column: i for i, column in enumerate(self._columns)}
+
+    def rows(self, columns=None):
+        """Arma las filas para `executemany`.
+
+        Args:
+            columns (list, optional): Columnas a incluir, en orden (se admiten repetidas, p. ej.
+                las llaves del WHERE de un UPSERT). Una columna que no está en el lote se envía
+                como NULL. Por defecto todas las columnas del lote.
+
+        Returns:
+            list: Lista de tuplas.
+        """
+        if columns is None:
+            arrays = self._arrays
+        else:
+            nulls = None
+            arrays = []
+            for name in columns:
+                if name in self._index:
+                    arrays.append(self._arrays[self._index[name]])
+                else:
+                    if nulls is None:
+                        nulls = [None] * self._length
+                    arrays.append(nulls)
+        if not arrays:
+            return [() for _ in range(self._length)]
+        return list(zip(*arrays))
+
+    def _check_length(self, name, values):
+        if len(values) != self._length:
+            raise ValueError(f"La columna {name} tiene {len(values)} valores; se esperaban {self._length}")
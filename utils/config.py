@@ -3,14 +3,22 @@ Módulo de configuración para la conexión a la base de datos SAP HANA.
 Contiene las credenciales y parámetros de conexión usando variables de entorno.
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Cargar variables de entorno desde .env
 load_dotenv()
 
+# Drivers de base de datos disponibles (ver utils/db_driver.py)
+DB_DRIVERS = ('hdbcli', 'standin')
+
+
 def get_db_config():
     """
     Obtiene la configuración de la base de datos desde variables de entorno.
+
+    Con `DB_DRIVER=standin` se usa el stand-in local de HANA sobre SQLite y las variables
+    HANA_* son opcionales.
     """
     # Configuración desde variables de entorno
     # IMPORTANTE: Las credenciales DEBEN estar en el archivo .env (local) 
@@ -20,6 +28,21 @@ def get_db_config():
     user = os.getenv('HANA_USER')
     password = os.getenv('HANA_PASSWORD')
     schema = os.getenv('HANA_SCHEMA')
+    driver = os.getenv('DB_DRIVER', 'hdbcli').strip().lower()
+
+    if driver not in DB_DRIVERS:
+        raise ValueError(f"DB_DRIVER inválido: {driver}. Valores permitidos: {', '.join(DB_DRIVERS)}")
+
+    # El stand-in local (SQLite) no requiere credenciales de HANA
+    if driver == 'standin':
+        return {
+            'driver': driver,
+            'host': host or 'localhost',
+            'port': int(port),
+            'user': user or 'STANDIN',
+            'password': password or '',
+            'schema': schema or 'STANDIN'
+        }
     
     # Validar que todas las variables requeridas estén presentes
     if not all([host, user, password, schema]):
@@ -35,6 +58,7 @@ def get_db_config():
         )
     
     return {
+        'driver': driver,
         'host': host,
         'port': int(port),
         'user': user,
@@ -43,4 +67,302 @@ def get_db_config():
     }
 
 # Configuración de la conexión a SAP HANA
-DB_CONFIG = get_db_config()
\ No newline at end of file
+DB_CONFIG = get_db_config()
+
+
+def get_admission_config():
+    """
+    Obtiene los presupuestos de concurrencia por clase de workflow desde variables de entorno.
+
+    Cada clase admite `ADMISSION_<CLASE>_CONCURRENCY` (ejecuciones simultáneas),
+    `ADMISSION_<CLASE>_QUEUE` (solicitudes en espera), `ADMISSION_<CLASE>_QUEUE_TIMEOUT`
+    (segundos máximos en espera) y `ADMISSION_<CLASE>_RETRY_AFTER` (segundos sugeridos al cliente).
+    """
+    defaults = {
+        # Workflows que cargan HANA (MERGE, transferencias, stored procedures)
+        'heavy': {'concurrency': 2, 'queue': 2, 'queue_timeout': 60, 'retry_after': 30},
+        # Health checks, status y páginas informativas
+        'light': {'concurrency': 4, 'queue': 8, 'queue_timeout': 2, 'retry_after': 1},
+    }
+
+    config = {}
+    for workflow_class, values in defaults.items():
+        prefix = f'ADMISSION_{workflow_class.upper()}_'
+        config[workflow_class] = {
+            'concurrency': int(os.getenv(prefix + 'CONCURRENCY', values['concurrency'])),
+            'queue': int(os.getenv(prefix + 'QUEUE', values['queue'])),
+            'queue_timeout': float(os.getenv(prefix + 'QUEUE_TIMEOUT', values['queue_timeout'])),
+            'retry_after': int(os.getenv(prefix + 'RETRY_AFTER', values['retry_after'])),
+        }
+    return config
+
+# Presupuestos de concurrencia por clase de workflow
+ADMISSION_CONFIG = get_admission_config()
+
+
+def get_pool_config():
+    """
+    Obtiene la configuración del pool de conexiones HANA y del health prober.
+
+    - `HANA_POOL_SIZE`: conexiones máximas abiertas por worker.
+    - `HANA_POOL_TIMEOUT`: segundos máximos de espera por una conexión libre.
+    - `HEALTH_PROBE_INTERVAL`: segundos entre refrescos del health prober (0 lo desactiva).
+    - `HEALTH_CHECK_TIMEOUT`: segundos máximos por check en `/health/all`.
+    - `HEALTH_CHECK_MAX_TIMEOUT`: tope de `?timeout=` en `/health/all`.
+    - `HEALTH_CHECK_CONCURRENCY`: checks simultáneos de `/health/all`; siempre por debajo de
+      `HANA_POOL_SIZE` para dejar conexiones a los workflows (default `HANA_POOL_SIZE - 1`).
+    """
+    size = int(os.getenv('HANA_POOL_SIZE', '4'))
+    concurrency = int(os.getenv('HEALTH_CHECK_CONCURRENCY', str(size - 1)))
+    return {
+        'size': size,
+        'timeout': float(os.getenv('HANA_POOL_TIMEOUT', '10')),
+        'health_probe_interval': float(os.getenv('HEALTH_PROBE_INTERVAL', '30')),
+        'health_check_timeout': float(os.getenv('HEALTH_CHECK_TIMEOUT', '5')),
+        'health_check_max_timeout': float(os.getenv('HEALTH_CHECK_MAX_TIMEOUT', '30')),
+        'health_check_concurrency': max(1, min(concurrency, size - 1)),
+    }
+
+# Configuración del pool de conexiones
+POOL_CONFIG = get_pool_config()
+
+
+def get_time_budget_config():
+    """
+    Obtiene los presupuestos de tiempo (segundos) por workflow desde variables de entorno.
+
+    - `TIME_BUDGET_<WORKFLOW>`: tiempo máximo de una ejecución del workflow (0 sin límite).
+    - `TIME_BUDGET_DEFAULT`: presupuesto de workflows sin valor propio.
+    - `TIME_BUDGET_SYNC`: tope para ejecuciones síncronas, por debajo del timeout de 180s
+      del router de la plataforma (la sesión HANA seguiría corriendo tras cortar el request).
+    - `WATCHDOG_INTERVAL`: segundos entre revisiones del watchdog.
+    """
+    defaults = {
+        'TLCL01': 900,
+        'TLCL02': 900,
+        'TLCL03': 900,
+        'TLCL04': 900,
+        'SIR': 600,
+        'COBCEN': 600,
+        'SP_BATCH': 900,
+    }
+    return {
+        'workflows': {
+            workflow: float(os.getenv(f'TIME_BUDGET_{workflow}', seconds))
+            for workflow, seconds in defaults.items()
+        },
+        'default': float(os.getenv('TIME_BUDGET_DEFAULT', '900')),
+        'sync': float(os.getenv('TIME_BUDGET_SYNC', '170')),
+        'watchdog_interval': float(os.getenv('WATCHDOG_INTERVAL', '1')),
+    }
+
+# Presupuestos de tiempo por workflow
+TIME_BUDGET_CONFIG = get_time_budget_config()
+
+
+def get_bulk_config():
+    """
+    Obtiene la configuración del escritor por lotes (`executemany`) de los Table Producers.
+
+    - `BULK_TARGET_BATCH_SECONDS`: latencia objetivo por lote; el tamaño se ajusta hacia ella.
+    - `BULK_INITIAL_BATCH` / `BULK_MIN_BATCH` / `BULK_MAX_BATCH`: filas por lote.
+    - `BULK_MAX_BATCH_BYTES`: techo de memoria estimada por lote.
+    - `BULK_COMMIT_<WORKFLOW>`: política de commit del Table Producer: `batch` (cada lote),
+      `rows:N` (cada N filas), `seconds:T` (cada T segundos), `single` (una sola transacción,
+      todo o nada) o `autocommit` (sin commits explícitos, según el modo del driver).
+    - `BULK_DEDUPE_<WORKFLOW>`: colapsar filas con la misma llave primaria (se conserva la última)
+      y ordenarlas por llave antes del UPSERT (`true`/`false`).
+    """
+    # Valores por defecto que conservan el comportamiento previo de cada Table Producer
+    commit_defaults = {
+        'TLCL01': 'batch',
+        'TLCL02': 'single',
+        'TLCL03': 'single',
+        'TLCL04': 'autocommit',
+    }
+    return {
+        'target_seconds': float(os.getenv('BULK_TARGET_BATCH_SECONDS', '0.5')),
+        'initial_size': int(os.getenv('BULK_INITIAL_BATCH', '100')),
+        'min_size': int(os.getenv('BULK_MIN_BATCH', '10')),
+        'max_size': int(os.getenv('BULK_MAX_BATCH', '20000')),
+        'max_bytes': int(os.getenv('BULK_MAX_BATCH_BYTES', str(32 * 1024 * 1024))),
+        'commit_policies': {
+            workflow: os.getenv(f'BULK_COMMIT_{workflow}', policy)
+            for workflow, policy in commit_defaults.items()
+        },
+        # Solo aplica a los Table Producers con UPSERT por llave (TLCL02, TLCL03, TLCL04)
+        'dedupe': {
+            workflow: os.getenv(f'BULK_DEDUPE_{workflow}', 'true').lower() == 'true'
+            for workflow in ('TLCL02', 'TLCL03', 'TLCL04')
+        },
+    }
+
+# Configuración del escritor por lotes
+BULK_CONFIG = get_bulk_config()
+
+
+def get_date_fields_config():
+    """
+    Obtiene la configuración de la derivación de campos de fecha por lote.
+
+    - `DATE_FIELDS_ENGINE`: `auto` (pandas si está instalado y hay suficientes fechas
+      distintas), `python` o `pandas`.
+    - `DATE_FIELDS_PANDAS_MIN_DISTINCT`: fechas distintas a partir de las cuales `auto` usa pandas.
+    - `DATE_FIELDS_MEMO_SIZE`: entradas del memo LRU compartido de derivaciones de fecha
+      (TLCL01–04); 0 lo desactiva.
+    """
+    return {
+        'engine': os.getenv('DATE_FIELDS_ENGINE', 'auto').lower(),
+        'pandas_min_distinct': int(os.getenv('DATE_FIELDS_PANDAS_MIN_DISTINCT', '2000')),
+        'memo_size': int(os.getenv('DATE_FIELDS_MEMO_SIZE', '50000')),
+    }
+
+# Configuración de la derivación de campos de fecha
+DATE_FIELDS_CONFIG = get_date_fields_config()
+
+
+
+def get_metrics_config():
+    """
+    Obtiene la configuración de las métricas de `/metrics`.
+
+    - `METRICS_ENABLED`: registrar métricas (`true`/`false`).
+    - `METRICS_DIR`: directorio compartido donde cada worker de gunicorn vuelca sus métricas
+      para que `/metrics` sume todos los workers (vacío: solo el worker que responde).
+    - `METRICS_FLUSH_INTERVAL`: segundos entre volcados de cada worker.
+    """
+    return {
+        'enabled': os.getenv('METRICS_ENABLED', 'true').lower() == 'true',
+        'directory': os.getenv('METRICS_DIR', ''),
+        'flush_interval': float(os.getenv('METRICS_FLUSH_INTERVAL', '5')),
+    }
+
+# Configuración de métricas
+METRICS_CONFIG = get_metrics_config()
+
+
+def get_tracing_config():
+    """
+    Obtiene la configuración de las trazas de ejecución (`/api/traces`).
+
+    - `TRACING_ENABLED`: registrar spans (`true`/`false`).
+    - `TRACING_BUFFER_SIZE`: trazas completas que se conservan en memoria por worker.
+    - `TRACING_MAX_SPANS`: spans máximos por traza (los demás se descartan y se cuentan).
+    - `TRACING_EXPORT_FILE`: archivo JSON Lines donde se agrega cada traza en formato OTLP/JSON
+      (vacío no exporta).
+    """
+    return {
+        'enabled': os.getenv('TRACING_ENABLED', 'true').lower() == 'true',
+        'buffer_size': int(os.getenv('TRACING_BUFFER_SIZE', '100')),
+        'max_spans': int(os.getenv('TRACING_MAX_SPANS', '2000')),
+        'export_file': os.getenv('TRACING_EXPORT_FILE', ''),
+    }
+
+# Configuración de trazas
+TRACING_CONFIG = get_tracing_config()
+
+def get_admin_config():
+    """
+    Obtiene la configuración de los endpoints y modos de administración.
+
+    - `ADMIN_TOKEN`: token que se envía en el header `X-Admin-Token` (o `Authorization: Bearer`)
+      para usar `?profile=` y los endpoints de administración (`/api/profiles`, `/api/sql`).
+      Vacío los desactiva.
+    """
+    return {
+        'token': os.getenv('ADMIN_TOKEN', ''),
+    }
+
+# Configuración de administración
+ADMIN_CONFIG = get_admin_config()
+
+
+def get_profiling_config():
+    """
+    Obtiene la configuración del profiling bajo demanda (`?profile=cpu|alloc`).
+
+    - `PROFILING_DIR`: directorio donde se guardan los artefactos (pstats, stacks colapsados, resumen).
+    - `PROFILING_MAX_STORED`: perfiles que se conservan por worker (los más antiguos se borran).
+    - `PROFILING_TOP`: hotspots incluidos en el resumen de la respuesta.
+    - `PROFILING_SAMPLE_INTERVAL`: segundos entre muestras de stacks del modo `cpu` (flamegraphs).
+    - `PROFILING_ALLOC_FRAMES`: frames por traceback que guarda tracemalloc en el modo `alloc`.
+    """
+    return {
+        'directory': os.getenv('PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'tlcl_profiles')),
+        'max_stored': int(os.getenv('PROFILING_MAX_STORED', '20')),
+        'top': int(os.getenv('PROFILING_TOP', '20')),
+        'sample_interval': float(os.getenv('PROFILING_SAMPLE_INTERVAL', '0.005')),
+        'alloc_frames': int(os.getenv('PROFILING_ALLOC_FRAMES', '25')),
+    }
+
+# Configuración de profiling
+PROFILING_CONFIG = get_profiling_config()
+
+def get_sql_stats_config():
+    """
+    Obtiene la configuración del registro de sentencias SQL (`/api/sql/stats`).
+
+    - `SQL_STATS_ENABLED`: medir cada execute/executemany/callproc de los cursores (`true`/`false`).
+    - `SQL_SLOW_THRESHOLD_MS`: milisegundos a partir de los cuales una sentencia se registra como lenta.
+    - `SQL_STATS_MAX_FINGERPRINTS`: fingerprints distintos que se agregan por worker (el resto va a `<otros>`).
+    - `SQL_STATS_SAMPLES`: duraciones recientes por fingerprint que se guardan para el p95.
+    - `SQL_SLOW_LOG_SIZE`: sentencias lentas recientes que se conservan para el endpoint.
+    """
+    return {
+        'enabled': os.getenv('SQL_STATS_ENABLED', 'true').lower() == 'true',
+        'slow_threshold_ms': float(os.getenv('SQL_SLOW_THRESHOLD_MS', '1000')),
+        'max_fingerprints': int(os.getenv('SQL_STATS_MAX_FINGERPRINTS', '500')),
+        'samples': int(os.getenv('SQL_STATS_SAMPLES', '1000')),
+        'slow_log_size': int(os.getenv('SQL_SLOW_LOG_SIZE', '100')),
+    }
+
+# Configuración del registro de sentencias SQL
+SQL_STATS_CONFIG = get_sql_stats_config()
+
+# Perfiles de red del stand-in: costos que se suman a cada llamada al driver
+STANDIN_NETWORK_PROFILES = {
+    'local': {'connect_ms': 0, 'latency_ms': 0, 'jitter_ms': 0, 'row_cost_us': 0},
+    # Round trips de 20–80 ms y login con TLS como los observados contra HANA Cloud
+    'hana-cloud': {'connect_ms': 300, 'latency_ms': 20, 'jitter_ms': 60, 'row_cost_us': 15},
+}
+
+
+def get_standin_config():
+    """
+    Obtiene la configuración del stand-in local de HANA (`DB_DRIVER=standin`).
+
+    - `STANDIN_DATABASE`: archivo SQLite compartido por las conexiones del proceso y de los
+      workers (por defecto en el directorio temporal del sistema).
+    - `STANDIN_BUSY_TIMEOUT`: segundos que una conexión espera un bloqueo de escritura.
+    - `STANDIN_NETWORK`: perfil base de costos de red (`local` o `hana-cloud`); cada costo
+      se puede sobrescribir con su variable:
+      `STANDIN_CONNECT_MS` (login), `STANDIN_LATENCY_MS` (por round trip),
+      `STANDIN_JITTER_MS` (extra aleatorio entre 0 y este valor por round trip) y
+      `STANDIN_ROW_COST_US` (por fila enviada o recibida).
+    - `STANDIN_FETCH_SIZE`: filas por round trip al leer resultados.
+    - `STANDIN_RESET_RATE` / `STANDIN_LOCK_TIMEOUT_RATE`: probabilidad (0–1) por llamada de
+      simular un reset de la conexión o un lock wait timeout (solo en escrituras).
+    - `STANDIN_SEED`: semilla para que jitter y fallas sean reproducibles.
+    """
+    network = os.getenv('STANDIN_NETWORK', 'local').lower()
+    if network not in STANDIN_NETWORK_PROFILES:
+        raise ValueError(f"STANDIN_NETWORK inválido: {network}. Valores permitidos: {', '.join(STANDIN_NETWORK_PROFILES)}")
+    profile = STANDIN_NETWORK_PROFILES[network]
+    seed = os.getenv('STANDIN_SEED')
+
+    return {
+        'database': os.getenv('STANDIN_DATABASE') or os.path.join(tempfile.gettempdir(), 'tlcl_hana_standin.db'),
+        'busy_timeout': float(os.getenv('STANDIN_BUSY_TIMEOUT', '30')),
+        'network': network,
+        'connect_ms': float(os.getenv('STANDIN_CONNECT_MS', profile['connect_ms'])),
+        'latency_ms': float(os.getenv('STANDIN_LATENCY_MS', profile['latency_ms'])),
+        'jitter_ms': float(os.getenv('STANDIN_JITTER_MS', profile['jitter_ms'])),
+        'row_cost_us': float(os.getenv('STANDIN_ROW_COST_US', profile['row_cost_us'])),
+        'fetch_size': max(1, int(os.getenv('STANDIN_FETCH_SIZE', '1000'))),
+        'reset_rate': float(os.getenv('STANDIN_RESET_RATE', '0')),
+        'lock_timeout_rate': float(os.getenv('STANDIN_LOCK_TIMEOUT_RATE', '0')),
+        'seed': int(seed) if seed else None,
+    }
+
+# Configuración del stand-in local de HANA
+STANDIN_CONFIG = get_standin_config()
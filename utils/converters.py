@@ -0,0 +1,133 @@
+"""
+Conversores de columnas compilados a partir de los metadatos de HANA.
+Lee DATA_TYPE_NAME de `SYS.TABLE_COLUMNS` para la tabla origen y la destino y arma, una sola
+vez por tabla, una tupla con un conversor por columna. Los valores nativos (DECIMAL, DATE,
+INTEGER, ...) pasan tal cual cuando el tipo destino es compatible; solo las columnas cuyo tipo
+no coincide (o que un transform lee como texto) se convierten.
+"""
+
+import threading
+
+from utils.config import DB_CONFIG
+
+# Familias de tipos de HANA: dentro de una misma familia el driver acepta el valor nativo
+TYPE_FAMILIES = {
+    'numeric': ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'DECIMAL', 'SMALLDECIMAL', 'REAL', 'DOUBLE', 'FLOAT'),
+    'text': ('VARCHAR', 'NVARCHAR', 'ALPHANUM', 'SHORTTEXT', 'CHAR', 'NCHAR', 'CLOB', 'NCLOB', 'TEXT'),
+    'date': ('DATE',),
+    'time': ('TIME',),
+    'timestamp': ('TIMESTAMP', 'SECONDDATE'),
+    'binary': ('VARBINARY', 'BINARY', 'BLOB'),
+    'boolean': ('BOOLEAN',),
+}
+_FAMILY_BY_TYPE = {type_name: family for family, names in TYPE_FAMILIES.items() for type_name in names}
+
+_types_cache = {}
+_types_lock = threading.Lock()
+
+
+def type_family(data_type_name):
+    """Familia de un DATA_TYPE_NAME de HANA (None si no se reconoce)."""
+    return _FAMILY_BY_TYPE.get(str(data_type_name).upper())
+
+
+def to_text(value):
+    """Conversión a texto del Table Consumer original (`isoformat()` para fechas, `str()` para el resto)."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def get_column_types(hana_conn, table_name):
+    """Obtiene (y cachea) los tipos de las columnas de una tabla del esquema.
+
+    Args:
+        hana_conn: Instancia de `HanaConnection` con `cursor`.
+        table_name (str): Nombre de la tabla (sin esquema).
+
+    Returns:
+        dict: {columna: DATA_TYPE_NAME}
+    """
+    key = (DB_CONFIG['schema'], table_name)
+    with _types_lock:
+        if key in _types_cache:
+            return _types_cache[key]
+
+    cursor = hana_conn.cursor
+    cursor.execute(
+        "SELECT COLUMN_NAME, DATA_TYPE_NAME FROM SYS.TABLE_COLUMNS WHERE SCHEMA_NAME = ? AND TABLE_NAME = ? ORDER BY POSITION",
+        key
+    )
+    types = {row[0]: row[1] for row in cursor.fetchall()}
+    with _types_lock:
+        _types_cache[key] = types
+    return types
+
+
+def compile_converters(columns, source_types, target_types, text_columns=()):
+    """Arma la tupla de conversores por columna.
+
+    Args:
+        columns (list): Columnas de la tabla origen, en el orden del SELECT.
+        source_types (dict): {columna: DATA_TYPE_NAME} del origen.
+        target_types (dict): {columna: DATA_TYPE_NAME} del destino.
+        text_columns (tuple): Columnas que un transform posterior procesa como texto
+            (p. ej. FECHA); siempre se convierten con `to_text`.
+
+    Returns:
+        tuple: Un conversor (callable) por columna, o None donde el valor pasa sin cambios.
+    """
+    converters = []
+    for column in columns:
+        source = type_family(source_types.get(column))
+        target = type_family(target_types.get(column))
+        if column in text_columns and source != 'text':
+            converters.append(to_text)
+        elif target == 'text' and source != 'text':
+            # El destino es texto y el origen no: convertir aquí como antes
+            converters.append(to_text)
+        else:
+            # Misma familia, columna solo del origen o texto hacia un tipo que HANA parsea
+            converters.append(None)
+    return tuple(converters)
+
+
+def compile_table_converters(hana_conn, columns, source_table, target_table, text_columns=()):
+    """Compila los conversores de un Table Consumer a partir de `SYS.TABLE_COLUMNS`.
+
+    Si no se pueden leer los metadatos se usa la conversión original (`to_text` en todas
+    las columnas) para no detener el workflow.
+    """
+    try:
+        return compile_converters(
+            columns,
+            get_column_types(hana_conn, source_table),
+            get_column_types(hana_conn, target_table),
+            text_columns
+        )
+    except Exception as e:
+        print(f"Error al compilar conversores de {source_table}: {e}")
+        return (to_text,) * len(columns)
+
+
+def convert_rows(rows, converters):
+    """Aplica los conversores a las filas leídas.
+
+    Solo recorre las columnas con conversor; el resto de valores se copia tal cual.
+
+    Returns:
+        list: Filas como listas (los transforms las modifican en sitio).
+    """
+    active = [(index, converter) for index, converter in enumerate(converters) if converter is not None]
+    if not active:
+        return [list(row) for row in rows]
+
+    data = []
+    for row in rows:
+        row = list(row)
+        for index, converter in active:
+            value = row[index]
+            if value is not None:
+                row[index] = converter(value)
+        data.append(row)
+    return data
@@ -0,0 +1,315 @@
+"""
+Derivación de campos de fecha por lote para los Data Transforms de TLCL01–04.
+Procesa la columna FECHA completa: cada fecha distinta se interpreta una sola vez y el
+resultado se guarda en un memo LRU acotado compartido entre workflows y ejecuciones; si pandas
+está instalado y hay suficientes fechas distintas, el parseo se hace de forma vectorizada.
+Devuelve las columnas FECHA/HORA/ANIO/MES/DIA/MESANIO, una máscara de validez y el conteo de
+errores, con un solo aviso en el log en lugar de un print por fila.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+from utils.config import DATE_FIELDS_CONFIG
+
+try:
+    import pandas as pd
+except ImportError:  # pandas es opcional
+    pd = None
+
+logger = logging.getLogger(__name__)
+
+# Formatos de FECHA: MM/DD/YYYY (TLCL02) y YYYY-MM-DD[ HH:MM[:SS]] (TLCL03)
+LAYOUT_MDY = 'MDY'
+LAYOUT_YMD = 'YMD'
+
+FIELDS = ('FECHA', 'HORA', 'ANIO', 'MES', 'DIA', 'MESANIO')
+
+# Valores inválidos que se incluyen en el aviso del log
+_INVALID_SAMPLES = 5
+
+# Forma canónica que el parseo vectorizado resuelve; cualquier otra pasa por el parser Python
+_PANDAS_PATTERNS = {
+    LAYOUT_MDY: r'^(?P<mes>\d{1,2})/(?P<dia>\d{1,2})/(?P<anio>\d{4})$',
+    LAYOUT_YMD: r'^(?P<anio>\d{4})-(?P<mes>\d{1,2})-(?P<dia>\d{1,2})(?: (?P<hh>\d{1,2}):(?P<mi>\d{1,2})(?::\d{1,2})?)?$',
+}
+
+
+def _build(anio, mes, dia, hora):
+    """Arma la tupla de campos (en el orden de FIELDS) o None si la fecha está fuera de rango."""
+    if not (1 <= mes <= 12) or not (1 <= dia <= 31) or anio < 1900 or anio > 2100:
+        return None
+    mes_formatted = f"{mes:02d}"
+    dia_formatted = f"{dia:02d}"
+    return (f"{anio}-{mes_formatted}-{dia_formatted}", hora, str(anio), mes_formatted, dia_formatted, f"{mes_formatted}.{anio}")
+
+
+def parse_mdy(value):
+    """Interpreta una fecha MM/DD/YYYY de TLCL02 (mes 1–12, día 1–31, año 1900–2100).
+
+    Returns:
+        tuple: Campos en el orden de FIELDS (FECHA se conserva tal cual), o None si es inválida.
+    """
+    try:
+        parts = str(value).strip().split('/')
+        if len(parts) != 3:
+            return None
+        mes, dia, anio = (int(part) for part in parts)
+    except (ValueError, TypeError):
+        return None
+    fields = _build(anio, mes, dia, '00:00:00')
+    return (value,) + fields[1:] if fields else None
+
+
+def parse_ymd(value):
+    """Interpreta una fecha YYYY-MM-DD de TLCL03 con hora opcional separada por espacio o por
+    la `T` de ISO 8601 (mismos rangos que `parse_mdy`; la hora se trunca a HH:MM:00).
+
+    Returns:
+        tuple: Campos en el orden de FIELDS (FECHA sin hora, HORA como HH:MM:00), o None si es inválida.
+    """
+    try:
+        text = str(value).strip()
+        fecha_parte = text
+        hora_parte = '00:00:00'
+        separator = ' ' if ' ' in text else ('T' if 'T' in text else None)
+        if separator:
+            partes = text.split(separator)
+            fecha_parte = partes[0]
+            hora_completa = partes[1]
+            if ':' in hora_completa:
+                hora_partes = hora_completa.split(':')
+                hora_parte = f"{hora_partes[0]:0>2}:{hora_partes[1]:0>2}:00"
+        parts = fecha_parte.split('-')
+        if len(parts) != 3:
+            return None
+        anio, mes, dia = (int(part) for part in parts)
+    except (ValueError, TypeError, IndexError):
+        return None
+    return _build(anio, mes, dia, hora_parte)
+
+
+_PARSERS = {LAYOUT_MDY: parse_mdy, LAYOUT_YMD: parse_ymd}
+
+
+class DerivationMemo:
+    """Memo LRU acotado y thread-safe de derivaciones de fecha, separado por espacio de nombres
+    (formato de FECHA o derivación) para que un mismo texto no se confunda entre workflows."""
+
+    def __init__(self, max_size=None):
+        """Inicializa el memo.
+
+        Args:
+            max_size (int): Máximo de entradas (por defecto `DATE_FIELDS_MEMO_SIZE`); 0 lo desactiva.
+        """
+        self.max_size = DATE_FIELDS_CONFIG['memo_size'] if max_size is None else max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def resolve(self, namespace, values, compute, stats=None):
+        """Resuelve una columna completa: busca cada valor distinto en el memo y calcula solo los faltantes.
+
+        Args:
+            namespace (str): Tipo de derivación (p. ej. 'YMD', 'MDY', 'MESANIO').
+            values (list): Valores de la columna (con repeticiones).
+            compute (callable): Recibe la lista de valores faltantes y devuelve {valor: resultado}.
+            stats (dict, optional): Contadores de la ejecución (ver `new_run_stats`).
+
+        Returns:
+            dict: {valor: resultado} para cada valor distinto.
+        """
+        distinct = list(dict.fromkeys(values))
+        resolved = {}
+        missing = []
+        with self._lock:
+            for value in distinct:
+                key = (namespace, value)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    resolved[value] = self._entries[key]
+                else:
+                    missing.append(value)
+
+        if missing:
+            computed = compute(missing)
+            resolved.update(computed)
+            if self.max_size > 0:
+                with self._lock:
+                    for value in missing:
+                        self._entries[(namespace, value)] = computed[value]
+                        self._entries.move_to_end((namespace, value))
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+
+        if stats is not None:
+            # Un acierto es una fila que no requirió interpretar su valor
+            stats['lookups'] += len(values)
+            stats['computed'] += len(missing)
+            stats['memo_hits'] += len(distinct) - len(missing)
+        return resolved
+
+    def size(self):
+        """Entradas actuales del memo."""
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        """Vacía el memo."""
+        with self._lock:
+            self._entries.clear()
+
+
+def new_run_stats():
+    """Contadores del memo para una ejecución de workflow."""
+    return {'lookups': 0, 'computed': 0, 'memo_hits': 0}
+
+
+def memo_summary(stats):
+    """Resumen del memo para una ejecución: aciertos por fila, ratio y estado del memo compartido."""
+    hits = stats['lookups'] - stats['computed']
+    return {
+        'lookups': stats['lookups'],
+        'hits': hits,
+        'misses': stats['computed'],
+        'hit_ratio': round(hits / stats['lookups'], 4) if stats['lookups'] else None,
+        'shared_hits': stats['memo_hits'],
+        'memo_size': date_memo.size(),
+        'memo_max_size': date_memo.max_size,
+        'memo_evictions': date_memo.evictions
+    }
+
+
+def _parse_with_pandas(values, layout):
+    """Parseo vectorizado de las fechas distintas que tienen la forma canónica del formato.
+
+    Returns:
+        dict: {valor: campos o None} solo para los valores resueltos; el resto queda para el parser Python.
+    """
+    texts = pd.Series([str(value).strip() for value in values], dtype=object)
+    parts = texts.str.extract(_PANDAS_PATTERNS[layout])
+    matched = parts['anio'].notna()
+    anio = pd.to_numeric(parts['anio'], errors='coerce')
+    mes = pd.to_numeric(parts['mes'], errors='coerce')
+    dia = pd.to_numeric(parts['dia'], errors='coerce')
+    in_range = mes.between(1, 12) & dia.between(1, 31) & anio.between(1900, 2100)
+
+    valid = matched & in_range
+    anio_txt = anio.where(valid, 0).astype(int).astype(str)
+    mes_txt = mes.where(valid, 0).astype(int).astype(str).str.zfill(2)
+    dia_txt = dia.where(valid, 0).astype(int).astype(str).str.zfill(2)
+    if layout == LAYOUT_YMD:
+        hora = (parts['hh'].str.zfill(2) + ':' + parts['mi'].str.zfill(2) + ':00').fillna('00:00:00')
+    else:
+        hora = pd.Series('00:00:00', index=texts.index)
+
+    resolved = {}
+    for i, value in enumerate(values):
+        if not matched.iat[i]:
+            continue
+        if not valid.iat[i]:
+            resolved[value] = None
+            continue
+        fecha = value if layout == LAYOUT_MDY else f"{anio_txt.iat[i]}-{mes_txt.iat[i]}-{dia_txt.iat[i]}"
+        resolved[value] = (fecha, hora.iat[i], anio_txt.iat[i], mes_txt.iat[i], dia_txt.iat[i], f"{mes_txt.iat[i]}.{anio_txt.iat[i]}")
+    return resolved
+
+
+def _choose_engine(distinct_count):
+    engine = DATE_FIELDS_CONFIG['engine']
+    if pd is None or engine == 'python':
+        return 'python'
+    if engine == 'pandas' or distinct_count >= DATE_FIELDS_CONFIG['pandas_min_distinct']:
+        return 'pandas'
+    return 'python'
+
+
+def derive_date_fields(values, layout, stats=None):
+    """Deriva los campos de fecha de una columna completa.
+
+    Args:
+        values (list): Columna FECHA.
+        layout (str): `LAYOUT_MDY` (MM/DD/YYYY) o `LAYOUT_YMD` (YYYY-MM-DD[ HH:MM:SS]).
+        stats (dict, optional): Contadores del memo de la ejecución; por defecto se crean nuevos.
+
+    Returns:
+        dict: {
+            'columns': {campo: lista de valores} para cada campo de FIELDS (None en filas inválidas),
+            'valid': máscara por fila,
+            'errors': filas con FECHA no vacía que no se pudo interpretar,
+            'empty': filas con FECHA vacía o NULL,
+            'distinct': fechas distintas,
+            'engine': 'python' o 'pandas' (motor usado para las fechas que no estaban en el memo),
+            'memo': contadores del memo de la ejecución
+        }
+    """
+    parser = _PARSERS[layout]
+    stats = new_run_stats() if stats is None else stats
+    present = [value for value in values if value is not None and str(value).strip() != '']
+    engine = 'python'
+
+    def compute(missing):
+        nonlocal engine
+        engine = _choose_engine(len(missing))
+        computed = _parse_with_pandas(missing, layout) if engine == 'pandas' else {}
+        for value in missing:
+            if value not in computed:
+                computed[value] = parser(value)
+        return computed
+
+    parsed = date_memo.resolve(layout, present, compute, stats)
+
+    columns = {field: [] for field in FIELDS}
+    appenders = [columns[field].append for field in FIELDS]
+    empty_fields = (None,) * len(FIELDS)
+    valid = []
+    errors = 0
+    empty = 0
+    invalid_samples = []
+    for value in values:
+        fields = parsed.get(value)
+        if fields is None:
+            if value is None or str(value).strip() == '':
+                empty += 1
+            else:
+                errors += 1
+                if len(invalid_samples) < _INVALID_SAMPLES and value not in invalid_samples:
+                    invalid_samples.append(value)
+            fields = empty_fields
+            valid.append(False)
+        else:
+            valid.append(True)
+        for append, field_value in zip(appenders, fields):
+            append(field_value)
+
+    if errors:
+        logger.warning(f"{errors} filas con FECHA inválida (formato {layout}); ejemplos: {invalid_samples}")
+
+    return {
+        'columns': columns,
+        'valid': valid,
+        'errors': errors,
+        'empty': empty,
+        'distinct': len(parsed),
+        'engine': engine,
+        'memo': stats
+    }
+
+
+def summarize(derived):
+    """Resumen serializable de una derivación (para los detalles de la ejecución)."""
+    return {
+        'rows': len(derived['valid']),
+        'valid': len(derived['valid']) - derived['errors'] - derived['empty'],
+        'errors': derived['errors'],
+        'empty': derived['empty'],
+        'distinct': derived['distinct'],
+        'engine': derived['engine'],
+        'memo': memo_summary(derived['memo'])
+    }
+
+
+# Memo compartido por los Data Transforms de todos los workflows del worker
+date_memo = DerivationMemo()
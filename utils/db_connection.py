@@ -1,10 +1,13 @@
 """
 Módulo para gestionar la conexión a la base de datos SAP HANA.
 Proporciona funciones para establecer y cerrar conexiones.
+El driver (hdbcli o el stand-in local) se resuelve con `utils.db_driver` según `DB_DRIVER`.
 """
 
-import hdbcli.dbapi
 from utils.config import DB_CONFIG
+from utils.db_driver import get_driver
+from utils.jobs import current_job
+from utils.sql_stats import sql_stats
 
 class HanaConnection:
     """Clase para gestionar la conexión a SAP HANA."""
@@ -14,22 +17,32 @@ class HanaConnection:
         self.connection = None
         self.cursor = None
         self.config = DB_CONFIG
+        self.job = None
     
-    def connect(self):
+    def connect(self, track_job=True):
         """Establece la conexión a la base de datos SAP HANA.
         
+        Args:
+            track_job (bool): Registrar la conexión en el job en curso (el pool registra
+                las suyas por préstamo, no al abrirlas).
+        
         Returns:
             bool: True si la conexión fue exitosa, False en caso contrario.
         """
         try:
-            self.connection = hdbcli.dbapi.connect(
+            self.connection = get_driver(self.config.get('driver')).connect(
                 address=self.config['host'],
                 port=self.config['port'],
                 user=self.config['user'],
                 password=self.config['password'],
                 currentSchema=self.config['schema']
             )
-            self.cursor = self.connection.cursor()
+            # Cursor medido: cada sentencia se agrega por fingerprint (/api/sql/stats)
+            self.cursor = sql_stats.wrap(self.connection.cursor())
+            # Registrar la conexión en el job en curso para que el watchdog pueda cancelarla
+            self.job = current_job() if track_job else None
+            if self.job:
+                self.job.attach_connection(self)
             print("Conexión establecida exitosamente a SAP HANA.")
             return True
         except Exception as e:
@@ -43,6 +56,9 @@ class HanaConnection:
             bool: True si se cerró correctamente, False en caso contrario.
         """
         try:
+            if self.job:
+                self.job.detach_connection(self)
+                self.job = None
             if self.cursor:
                 self.cursor.close()
             if self.connection:
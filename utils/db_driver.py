@@ -0,0 +1,34 @@
+"""
+Capa de drivers de base de datos.
+Resuelve el módulo con la API de `hdbcli.dbapi` (`connect(address=, port=, user=, password=,
+currentSchema=)`) según `DB_DRIVER`: `hdbcli` para SAP HANA o `standin` para el stand-in local
+sobre SQLite (`utils.hana_standin`), que permite ejecutar los workflows sin tenant.
+"""
+
+import importlib
+
+from utils.config import DB_CONFIG, DB_DRIVERS
+
+# Módulo que implementa cada driver; se importa solo al usarlo
+_DRIVER_MODULES = {
+    'hdbcli': 'hdbcli.dbapi',
+    'standin': 'utils.hana_standin',
+}
+
+
+def get_driver(name=None):
+    """Obtiene el módulo del driver configurado.
+
+    Args:
+        name (str, optional): Nombre del driver; por defecto el de `DB_DRIVER`.
+
+    Returns:
+        module: Módulo con la función `connect` compatible con `hdbcli.dbapi`.
+
+    Raises:
+        ValueError: Si el driver no existe.
+    """
+    name = name or DB_CONFIG.get('driver', 'hdbcli')
+    if name not in DB_DRIVERS:
+        raise ValueError(f"Driver de base de datos desconocido: {name}")
+    return importlib.import_module(_DRIVER_MODULES[name])
@@ -0,0 +1,118 @@
+"""
+Pool de conexiones reutilizables a SAP HANA.
+Evita un login nuevo por cada health check o llamada corta reutilizando instancias
+de `HanaConnection` ya conectadas.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.config import POOL_CONFIG
+from utils.db_connection import HanaConnection
+from utils.jobs import track_connection
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """No hubo una conexión libre dentro del tiempo de espera."""
+
+
+class HanaConnectionPool:
+    """Pool thread-safe de `HanaConnection` con tamaño máximo por worker."""
+
+    def __init__(self, size, timeout):
+        """Inicializa el pool (las conexiones se abren bajo demanda).
+
+        Args:
+            size (int): Conexiones máximas abiertas.
+            timeout (float): Segundos máximos de espera por una conexión libre.
+        """
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+    def _checkout(self, timeout):
+        """Obtiene una conexión libre o abre una nueva si hay capacidad."""
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    metrics.observe('tlcl_pool_checkout_wait_seconds', time.monotonic() - start, outcome='idle')
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.observe('tlcl_pool_checkout_wait_seconds', time.monotonic() - start, outcome='timeout')
+                    raise PoolTimeoutError(f'Sin conexiones HANA libres tras {timeout}s (pool de {self.size})')
+                self._cond.wait(remaining)
+        metrics.observe('tlcl_pool_checkout_wait_seconds', time.monotonic() - start, outcome='new')
+
+        # Abrir la conexión fuera del lock
+        hana_conn = HanaConnection()
+        if not hana_conn.connect(track_job=False):
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise ConnectionError('No se pudo establecer la conexión a la base de datos.')
+        return hana_conn
+
+    def _checkin(self, hana_conn, discard):
+        """Devuelve la conexión al pool o la descarta si quedó en estado dudoso."""
+        if discard:
+            hana_conn.close()
+        with self._cond:
+            if discard:
+                self._created -= 1
+            else:
+                self._idle.append(hana_conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Presta una conexión del pool durante el bloque.
+
+        Si el bloque lanza una excepción la conexión se cierra en lugar de reutilizarse.
+
+        Args:
+            timeout (float, optional): Espera máxima; por defecto la configurada.
+
+        Yields:
+            HanaConnection: Conexión con `connection` y `cursor` listos.
+        """
+        hana_conn = self._checkout(self.timeout if timeout is None else timeout)
+        discard = False
+        try:
+            with track_connection(hana_conn):
+                yield hana_conn
+        except Exception:
+            discard = True
+            raise
+        finally:
+            self._checkin(hana_conn, discard)
+
+    def snapshot(self):
+        """Estado actual del pool."""
+        with self._cond:
+            return {
+                'size': self.size,
+                'open': self._created,
+                'idle': len(self._idle),
+                'in_use': self._created - len(self._idle)
+            }
+
+
+db_pool = HanaConnectionPool(POOL_CONFIG['size'], POOL_CONFIG['timeout'])
+metrics.register_gauges('tlcl_hana_pool_connections', lambda: [
+    ((('state', state), ('worker', os.getpid())), value)
+    for state, value in db_pool.snapshot().items() if state != 'size'
+])
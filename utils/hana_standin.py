@@ -0,0 +1,953 @@
+"""
+Stand-in local de SAP HANA sobre SQLite para benchmarks y pruebas sin tenant (`DB_DRIVER=standin`).
+Implementa la parte de la API de `hdbcli.dbapi` que usa el hub (conexión con autocommit,
+commit/rollback/cancel y cursor con execute, executemany, callproc, fetch* y nextset) y traduce
+el subconjunto de SQL de HANA que ejecutan los workflows:
+
+- Nombres calificados con el esquema (`"ESQUEMA"."TABLA"`, `ESQUEMA.TABLA`) y `DUMMY`.
+- Catálogo: `SYS.TABLES`, `SYS.TABLE_COLUMNS`, `SYS.PROCEDURES`, `SYS.PROCEDURE_PARAMETERS` y `M_TABLES`.
+- `UPSERT ... VALUES ... WHERE`, `UPSERT ... VALUES` / `UPSERT ... SELECT` por llave primaria,
+  `MERGE INTO ... USING ... WHEN [NOT] MATCHED`, `SELECT ... INTO tabla` y `TRUNCATE TABLE`.
+- Funciones: TO_DATE, TO_VARCHAR, LPAD, MONTH, YEAR, `TRIM(BOTH 'c' FROM x)`, entre otras.
+- `CALL` de los stored procedures de los workflows, emulados en Python con sus OUT y result sets.
+
+Las tablas se crean desde `hana_standin_schema.sql` en un archivo SQLite compartido por todas
+las conexiones del proceso (y de los workers de gunicorn). `NetworkModel` agrega a cada llamada
+la latencia, el jitter y el costo por fila de un round trip a HANA Cloud, y puede simular resets
+de conexión y lock wait timeouts (ver `STANDIN_*` en `utils/config.py`).
+"""
+
+import datetime
+import decimal
+import functools
+import math
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from utils.config import DB_CONFIG, STANDIN_CONFIG
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hana_standin_schema.sql')
+
+# Excepciones con los nombres de la API DB-API 2.0
+Error = sqlite3.Error
+DatabaseError = sqlite3.DatabaseError
+IntegrityError = sqlite3.IntegrityError
+OperationalError = sqlite3.OperationalError
+NotSupportedError = sqlite3.NotSupportedError
+
+# Sentencias traducidas que se conservan por conexión
+_PLAN_CACHE_SIZE = 512
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Tipos: los valores se leen con los tipos nativos que devuelve hdbcli
+# ---------------------------------------------------------------------------
+
+def _convert_decimal(value):
+    text = value.decode()
+    try:
+        return decimal.Decimal(text)
+    except decimal.InvalidOperation:
+        return text
+
+
+def _convert_date(value):
+    text = value.decode()
+    try:
+        return datetime.date.fromisoformat(text[:10])
+    except ValueError:
+        return text
+
+
+def _convert_timestamp(value):
+    text = value.decode()
+    try:
+        return datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+sqlite3.register_adapter(decimal.Decimal, str)
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(sep=' '))
+sqlite3.register_adapter(datetime.time, lambda value: value.isoformat())
+for _type_name in ('DECIMAL', 'SMALLDECIMAL'):
+    sqlite3.register_converter(_type_name, _convert_decimal)
+sqlite3.register_converter('DATE', _convert_date)
+for _type_name in ('TIMESTAMP', 'SECONDDATE'):
+    sqlite3.register_converter(_type_name, _convert_timestamp)
+
+
+# ---------------------------------------------------------------------------
+# Funciones de HANA registradas en cada conexión
+# ---------------------------------------------------------------------------
+
+_FORMAT_TOKENS = re.compile(r'YYYY|MONTH|MON|MM|DD|HH24|HH12|HH|MI|SS')
+_FORMAT_MAP = {'YYYY': '%Y', 'MONTH': '%B', 'MON': '%b', 'MM': '%m', 'DD': '%d',
+               'HH24': '%H', 'HH12': '%I', 'HH': '%H', 'MI': '%M', 'SS': '%S'}
+
+
+def _python_format(hana_format):
+    """Convierte un formato de fecha de HANA (`MON DD YYYY`, `YYYY-MM-DD`) a `strftime`."""
+    return _FORMAT_TOKENS.sub(lambda m: _FORMAT_MAP[m.group(0)], str(hana_format).upper())
+
+
+# Los scripts convierten la misma fecha en cada fila: se memorizan las fechas distintas
+@functools.lru_cache(maxsize=4096)
+def _parse_datetime(value, hana_format=None):
+    if isinstance(value, (int, float)):
+        raise ValueError(f"No es una fecha: {value}")
+    text = str(value).strip()
+    if hana_format:
+        return datetime.datetime.strptime(text, _python_format(hana_format))
+    return datetime.datetime.fromisoformat(text)
+
+
+def _to_date(value, hana_format=None):
+    if value is None:
+        return None
+    return _parse_datetime(value, hana_format).date().isoformat()
+
+
+def _to_timestamp(value, hana_format=None):
+    if value is None:
+        return None
+    return _parse_datetime(value, hana_format).isoformat(sep=' ')
+
+
+def _to_varchar(value, hana_format=None):
+    if value is None:
+        return None
+    if hana_format:
+        return _parse_datetime(value).strftime(_python_format(hana_format))
+    return str(value)
+
+
+def _to_decimal(value, *precision):
+    if value is None:
+        return None
+    return float(str(value).strip())
+
+
+def _to_integer(value):
+    if value is None:
+        return None
+    return int(decimal.Decimal(str(value).strip()))
+
+
+def _pad(left):
+    def pad(value, length, pattern=' '):
+        if value is None:
+            return None
+        text = str(value)
+        length = int(length)
+        if len(text) >= length:
+            return text[:length]
+        filler = (str(pattern) * length)[:length - len(text)]
+        return filler + text if left else text + filler
+    return pad
+
+
+def _date_part(attribute):
+    def part(value):
+        if value is None:
+            return None
+        return getattr(_parse_datetime(str(value)[:10]), attribute)
+    return part
+
+
+def _add_days(value, days):
+    if value is None or days is None:
+        return None
+    return (_parse_datetime(str(value)[:10]) + datetime.timedelta(days=int(days))).date().isoformat()
+
+
+def _register_functions(db):
+    functions = [
+        ('TO_DATE', -1, _to_date),
+        ('TO_TIMESTAMP', -1, _to_timestamp),
+        ('TO_VARCHAR', -1, _to_varchar),
+        ('TO_NVARCHAR', -1, _to_varchar),
+        ('TO_DECIMAL', -1, _to_decimal),
+        ('TO_INTEGER', 1, _to_integer),
+        ('TO_BIGINT', 1, _to_integer),
+        ('LPAD', -1, _pad(True)),
+        ('RPAD', -1, _pad(False)),
+        ('YEAR', 1, _date_part('year')),
+        ('MONTH', 1, _date_part('month')),
+        ('DAYOFMONTH', 1, _date_part('day')),
+        ('ADD_DAYS', 2, _add_days),
+        ('LEFT', 2, lambda value, n: None if value is None else str(value)[:int(n)]),
+        ('RIGHT', 2, lambda value, n: None if value is None else (str(value)[-int(n):] if int(n) else '')),
+        ('LOCATE', 2, lambda haystack, needle: None if haystack is None or needle is None else str(haystack).find(str(needle)) + 1),
+        ('CEIL', 1, lambda value: None if value is None else math.ceil(float(value))),
+        ('FLOOR', 1, lambda value: None if value is None else math.floor(float(value))),
+    ]
+    for name, arity, function in functions:
+        db.create_function(name, arity, function, deterministic=True)
+    db.create_function('RAND', 0, random.random)
+    db.create_function('NOW', 0, lambda: datetime.datetime.now().isoformat(sep=' '))
+    db.create_function('SYSUUID', 0, lambda: uuid.uuid4().hex.upper())
+
+
+# ---------------------------------------------------------------------------
+# Stored procedures emulados
+# ---------------------------------------------------------------------------
+
+_procedures = {}
+_procedures_created = datetime.datetime.now().replace(microsecond=0)
+
+Parameter = namedtuple('Parameter', 'name mode data_type')
+
+
+def register_procedure(name, parameters, body):
+    """Registra un stored procedure emulado.
+
+    Args:
+        name (str): Nombre del procedimiento (sin esquema).
+        parameters (list): `Parameter(name, mode, data_type)` en orden; mode es IN, OUT o INOUT.
+        body (callable): Recibe (cursor del stand-in, {parámetro IN: valor}) y devuelve
+            {'out': {parámetro OUT: valor}, 'result_sets': [(columnas, filas)]}.
+    """
+    _procedures[name.upper()] = {'parameters': list(parameters), 'body': body}
+
+
+# Firma común de los SP de los workflows: (IN PARAM1, IN PARAM2, OUT FLAG, OUT MENSAJE)
+_FLAG_MESSAGE_PARAMETERS = [
+    Parameter('PARAM1', 'IN', 'INTEGER'),
+    Parameter('PARAM2', 'IN', 'NVARCHAR'),
+    Parameter('FLAG', 'OUT', 'INTEGER'),
+    Parameter('MENSAJE', 'OUT', 'NVARCHAR'),
+]
+
+
+def _sp_tlcl_01(cursor, params):
+    """Proceso TLCL01 completo: TEMPELECTRICFACT -> ELECTRICFACT con MESANIO."""
+    target = set(cursor.connection.table_columns('TELCEL_EE_ELECTRICFACT'))
+    columns = [column for column in cursor.connection.table_columns('TELCEL_EE_TEMPELECTRICFACT')
+               if column in target and column != 'MESANIO']
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    cursor.execute(
+        f"INSERT INTO TELCEL_EE_ELECTRICFACT ({column_list}, MESANIO) "
+        f"SELECT {column_list}, LPAD(MESFACENC, 2, '0') || '.' || ANIOFACENC FROM TELCEL_EE_TEMPELECTRICFACT"
+    )
+    return {'out': {'FLAG': 1, 'MENSAJE': f'{cursor.rowcount} registros procesados'}, 'result_sets': []}
+
+
+def _sp_tlcl_cobcen(cursor, params):
+    """COBCEN no tiene tablas en el stand-in: solo responde con el flag de éxito."""
+    return {'out': {'FLAG': 1, 'MENSAJE': 'Proceso COBCEN ejecutado'}, 'result_sets': []}
+
+
+def _sp_tlcl_sir(cursor, params):
+    """SIR responde con un result set (FLAG, MENSAJE) en lugar de parámetros OUT."""
+    return {'out': {}, 'result_sets': [(['FLAG', 'MENSAJE'], [(1, 'Proceso SIR ejecutado')])]}
+
+
+register_procedure('SP_TLCL_01', _FLAG_MESSAGE_PARAMETERS, _sp_tlcl_01)
+register_procedure('SP_TLCL_COBCEN', _FLAG_MESSAGE_PARAMETERS, _sp_tlcl_cobcen)
+register_procedure('SP_TLCL_SIR', [Parameter('PARAM1', 'IN', 'INTEGER'), Parameter('PARAM2', 'IN', 'NVARCHAR')], _sp_tlcl_sir)
+
+
+# ---------------------------------------------------------------------------
+# Traducción de SQL de HANA a SQLite
+# ---------------------------------------------------------------------------
+
+_Plan = namedtuple('_Plan', 'kind statements values_count refresh_counts ddl')
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_IDENT = r'(?:"[^"]+"|[A-Za-z_][\w$#]*)'
+_SYS_OBJECT = re.compile(r'\bSYS\s*\.\s*"?([A-Za-z_]\w*)"?', re.I)
+_QUALIFIED = re.compile(rf'({_IDENT})\s*\.\s*({_IDENT})')
+_TRIM = re.compile(r"\bTRIM\s*\(\s*(BOTH|LEADING|TRAILING)\s+('(?:[^']|'')*')\s+FROM\s+", re.I)
+_TRIM_FUNCTIONS = {'BOTH': 'TRIM', 'LEADING': 'LTRIM', 'TRAILING': 'RTRIM'}
+_SELECT_INTO = re.compile(rf'\s+INTO\s+({_IDENT})\s*$', re.I)
+_MERGE_HEAD = re.compile(rf'MERGE\s+INTO\s+({_IDENT})\s+(?:AS\s+)?(\w+)\s+USING\s*', re.I)
+_MERGE_WHEN = re.compile(r'\bWHEN\s+(NOT\s+)?MATCHED\s+THEN\b', re.I)
+_CALL = re.compile(rf'CALL\s+((?:{_IDENT}\s*\.\s*)?{_IDENT})\s*\((.*)\)\s*$', re.I | re.S)
+# Objetos del catálogo que en el stand-in no llevan el prefijo SYS_
+_UNPREFIXED = {'DUMMY', 'M_TABLES'}
+
+
+def _map_code(sql, function):
+    """Aplica `function` solo al texto fuera de las literales de cadena."""
+    parts = []
+    last = 0
+    for match in _LITERAL.finditer(sql):
+        parts.append(function(sql[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(function(sql[last:]))
+    return ''.join(parts)
+
+
+def _closing_paren(text, start):
+    """Posición del paréntesis que cierra el abierto en `start` (ignora literales)."""
+    depth = 0
+    i = start
+    while i < len(text):
+        char = text[i]
+        if char == "'":
+            i = text.index("'", i + 1)
+            while i + 1 < len(text) and text[i + 1] == "'":
+                i = text.index("'", i + 2)
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise OperationalError(f"Paréntesis sin cerrar en: {text[start:start + 80]}")
+
+
+def _split_top(text, separator=','):
+    """Divide por `separator` fuera de paréntesis y literales."""
+    parts = []
+    depth = 0
+    current = []
+    in_literal = False
+    for char in text:
+        if char == "'":
+            in_literal = not in_literal
+        elif not in_literal:
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == separator and depth == 0:
+                parts.append(''.join(current))
+                current = []
+                continue
+        current.append(char)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _writes(plan):
+    """True si la sentencia escribe (los lock wait timeouts solo se simulan en escrituras)."""
+    return plan.kind != 'sql' or re.match(r'\s*(SELECT|WITH)\b', plan.statements[0], re.I) is None
+
+
+def _count_params(sql):
+    return sum(part.count('?') for part in _LITERAL.split(sql))
+
+
+def _rewrite_trim(sql):
+    """`TRIM(BOTH 'c' FROM x)` -> `TRIM(x, 'c')` (LEADING/TRAILING -> LTRIM/RTRIM)."""
+    while True:
+        match = _TRIM.search(sql)
+        if not match:
+            return sql
+        close = _closing_paren(sql, sql.index('(', match.start()))
+        function = _TRIM_FUNCTIONS[match.group(1).upper()]
+        sql = f"{sql[:match.start()]}{function}({sql[match.end():close]}, {match.group(2)}){sql[close + 1:]}"
+
+
+class _Translator:
+    """Traduce sentencias de HANA para una conexión (conoce sus tablas para quitar el esquema)."""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def _normalize(self, code):
+        def sys_object(match):
+            name = match.group(1).upper()
+            return name if name in _UNPREFIXED else f'SYS_{name}'
+
+        def unqualify(match):
+            name = match.group(2).strip('"').upper()
+            return match.group(2) if name in self.tables else match.group(0)
+
+        code = _SYS_OBJECT.sub(sys_object, code)
+        return _QUALIFIED.sub(unqualify, code)
+
+    def translate(self, sql):
+        sql = sql.strip().rstrip(';').strip()
+        sql = _map_code(_rewrite_trim(sql), self._normalize)
+        code = _map_code(sql, lambda part: part.upper())
+        keyword = code.split(None, 1)[0] if code else ''
+        refresh_counts = re.search(r'\bM_TABLES\b', code) is not None
+        ddl = keyword in ('CREATE', 'DROP', 'ALTER')
+
+        if keyword == 'TRUNCATE':
+            statement = re.sub(r'^TRUNCATE\s+TABLE\s+', 'DELETE FROM ', sql, flags=re.I)
+            return _Plan('sql', [statement], 0, False, False)
+        if keyword == 'UPSERT':
+            return self._upsert(sql)
+        if keyword == 'MERGE':
+            return self._merge(sql)
+        if keyword == 'CALL':
+            return _Plan('call', [sql], 0, False, False)
+        if keyword == 'SELECT':
+            match = _SELECT_INTO.search(sql)
+            if match:
+                return _Plan('sql', [f'INSERT INTO {match.group(1)} {sql[:match.start()]}'], 0, False, False)
+        return _Plan('sql', [sql], 0, refresh_counts, ddl)
+
+    def _upsert(self, sql):
+        match = re.match(rf'UPSERT\s+({_IDENT})\s*', sql, re.I)
+        table = match.group(1)
+        rest = sql[match.end():]
+        columns = ''
+        if rest.startswith('('):
+            close = _closing_paren(rest, 0)
+            columns = rest[:close + 1]
+            rest = rest[close + 1:].lstrip()
+
+        if not re.match(r'VALUES\b', rest, re.I):
+            # UPSERT ... SELECT: reemplazo por llave primaria
+            return _Plan('sql', [f'INSERT OR REPLACE INTO {table} {columns} {rest}'], 0, False, False)
+
+        open_at = rest.index('(')
+        close = _closing_paren(rest, open_at)
+        values = rest[open_at + 1:close]
+        tail = rest[close + 1:].strip()
+        where = re.match(r'WHERE\b(.*)$', tail, re.I | re.S)
+        if not where:
+            # Sin WHERE (o WITH PRIMARY KEY) HANA usa la llave primaria
+            return _Plan('sql', [f'INSERT OR REPLACE INTO {table} {columns} VALUES ({values})'], 0, False, False)
+
+        # Con WHERE: UPDATE de las filas que cumplen la condición o INSERT si no hay ninguna.
+        # Los parámetros llegan como VALUES + WHERE, el mismo orden que SET + WHERE del UPDATE
+        names = _split_top(columns[1:-1])
+        assignments = ', '.join(f'{name} = {expression}' for name, expression in zip(names, _split_top(values)))
+        update = f'UPDATE {table} SET {assignments} WHERE {where.group(1).strip()}'
+        insert = f'INSERT INTO {table} {columns} VALUES ({values})'
+        return _Plan('upsert_where', [update, insert], _count_params(values), False, False)
+
+    def _merge(self, sql):
+        match = _MERGE_HEAD.match(sql)
+        if not match:
+            raise NotSupportedError(f"MERGE no soportado por el stand-in: {sql[:80]}")
+        target, alias = match.group(1), match.group(2)
+        rest = sql[match.end():]
+        if rest.startswith('('):
+            close = _closing_paren(rest, 0)
+            source = rest[:close + 1]
+            rest = rest[close + 1:]
+        else:
+            source_match = re.match(_IDENT, rest)
+            source = source_match.group(0)
+            rest = rest[source_match.end():]
+        on = re.match(r'\s*(?:AS\s+)?(\w+)\s+ON\s+', rest, re.I)
+        source_alias = on.group(1)
+        parts = _MERGE_WHEN.split(rest[on.end():])
+        condition = parts[0].strip()
+
+        statements = []
+        inserts = []
+        for negated, clause in zip(parts[1::2], parts[2::2]):
+            clause = clause.strip()
+            if not negated:
+                set_match = re.match(r'UPDATE\s+SET\s+(.*)$', clause, re.I | re.S)
+                if not set_match:
+                    raise NotSupportedError(f"Cláusula WHEN MATCHED no soportada: {clause[:60]}")
+                assignments = []
+                for assignment in _split_top(set_match.group(1)):
+                    column, expression = assignment.split('=', 1)
+                    column = re.sub(rf'^{alias}\s*\.\s*', '', column.strip(), flags=re.I)
+                    assignments.append(f'{column} = {expression.strip()}')
+                # Primero el UPDATE sobre las filas existentes, como el MERGE que evalúa el estado previo
+                statements.append(f"UPDATE {target} AS {alias} SET {', '.join(assignments)} "
+                                  f"FROM {source} AS {source_alias} WHERE {condition}")
+            else:
+                insert_match = re.match(r'INSERT\s*(\(.*?\))\s*VALUES\s*\((.*)\)\s*$', clause, re.I | re.S)
+                if not insert_match:
+                    raise NotSupportedError(f"Cláusula WHEN NOT MATCHED no soportada: {clause[:60]}")
+                inserts.append(f"INSERT INTO {target} {insert_match.group(1)} SELECT {insert_match.group(2)} "
+                               f"FROM {source} AS {source_alias} "
+                               f"WHERE NOT EXISTS (SELECT 1 FROM {target} AS {alias} WHERE {condition})")
+        return _Plan('multi', statements + inserts, 0, False, False)
+
+
+# ---------------------------------------------------------------------------
+# Red simulada: latencia, costo por fila y fallas
+# ---------------------------------------------------------------------------
+
+class InjectedFault(OperationalError):
+    """Falla simulada con el código y el texto que reporta hdbcli."""
+
+    def __init__(self, kind, errorcode, errortext):
+        super().__init__(f"({errorcode}) {errortext}")
+        self.kind = kind
+        self.errorcode = errorcode
+        self.errortext = errortext
+
+
+_FAULTS = {
+    'connection_reset': (-10709, 'Connection failed (RTE:[89008] Socket closed by peer)'),
+    'lock_timeout': (131, 'transaction rolled back by lock wait timeout'),
+}
+
+
+class NetworkModel:
+    """Costo de red de cada llamada al driver, para que los benchmarks locales paguen lo mismo
+    que contra HANA Cloud: un round trip por execute/executemany/callproc/commit, un costo por
+    fila enviada o leída y fallas aleatorias reproducibles con `STANDIN_SEED`."""
+
+    def __init__(self, config):
+        """Inicializa el modelo.
+
+        Args:
+            config (dict): Costos y probabilidades (ver `get_standin_config`).
+        """
+        self.connect_seconds = config['connect_ms'] / 1000
+        self.latency_seconds = config['latency_ms'] / 1000
+        self.jitter_seconds = config['jitter_ms'] / 1000
+        self.row_seconds = config['row_cost_us'] / 1_000_000
+        self.fetch_size = config['fetch_size']
+        self.reset_rate = config['reset_rate']
+        self.lock_timeout_rate = config['lock_timeout_rate']
+        self._random = random.Random(config['seed'])
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reinicia los contadores."""
+        with self._lock:
+            self._stats = {'connects': 0, 'round_trips': 0, 'rows_sent': 0, 'rows_fetched': 0,
+                           'injected_seconds': 0.0, 'faults': {kind: 0 for kind in _FAULTS}}
+
+    def stats(self):
+        """Round trips, filas transferidas, tiempo inyectado y fallas desde el último reinicio."""
+        with self._lock:
+            stats = dict(self._stats, faults=dict(self._stats['faults']))
+        stats['injected_seconds'] = round(stats['injected_seconds'], 3)
+        return stats
+
+    def _wait(self, seconds, counter=None, amount=1):
+        with self._lock:
+            if counter:
+                self._stats[counter] += amount
+            self._stats['injected_seconds'] += seconds
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _draw(self, write):
+        """Sortea una falla para la llamada (None si no hay)."""
+        with self._lock:
+            if self.reset_rate and self._random.random() < self.reset_rate:
+                kind = 'connection_reset'
+            elif write and self.lock_timeout_rate and self._random.random() < self.lock_timeout_rate:
+                kind = 'lock_timeout'
+            else:
+                return None
+            self._stats['faults'][kind] += 1
+            return kind
+
+    def _jitter(self):
+        if not self.jitter_seconds:
+            return 0.0
+        with self._lock:
+            return self._random.uniform(0, self.jitter_seconds)
+
+    def connect(self):
+        """Costo del login; puede fallar con un reset."""
+        self._wait(self.connect_seconds + self._jitter(), 'connects')
+        if self._draw(write=False):
+            raise InjectedFault('connection_reset', *_FAULTS['connection_reset'])
+
+    def round_trip(self, connection, rows=0, write=False, faults=True):
+        """Costo de una llamada que envía `rows` filas; puede simular una falla.
+
+        Raises:
+            InjectedFault: Reset (la conexión queda cerrada) o lock wait timeout (solo en
+                escrituras; la transacción abierta se revierte, como en HANA).
+        """
+        with self._lock:
+            self._stats['rows_sent'] += rows
+        self._wait(self.latency_seconds + self._jitter() + rows * self.row_seconds, 'round_trips')
+        kind = self._draw(write) if faults else None
+        if kind is None:
+            return
+        if kind == 'connection_reset':
+            connection._abort()
+        else:
+            connection._rollback()
+        raise InjectedFault(kind, *_FAULTS[kind])
+
+    def fetched(self, already_fetched, rows):
+        """Costo de leer `rows` filas más: por fila y un round trip por cada bloque de
+        `STANDIN_FETCH_SIZE` filas después del primero (que llega con el execute)."""
+        if rows <= 0:
+            return
+        blocks = -(-(already_fetched + rows) // self.fetch_size) - max(-(-already_fetched // self.fetch_size), 1)
+        blocks = max(blocks, 0)
+        with self._lock:
+            self._stats['rows_fetched'] += rows
+            self._stats['round_trips'] += blocks
+        self._wait(sum(self.latency_seconds + self._jitter() for _ in range(blocks)) + rows * self.row_seconds)
+
+
+network = NetworkModel(STANDIN_CONFIG)
+
+
+# ---------------------------------------------------------------------------
+# Conexión y cursor
+# ---------------------------------------------------------------------------
+
+def ensure_schema(database=None):
+    """Crea las tablas de los workflows una vez por archivo y proceso.
+
+    Args:
+        database (str, optional): Archivo SQLite; por defecto `STANDIN_DATABASE`.
+    """
+    database = database or STANDIN_CONFIG['database']
+    with _init_lock:
+        if database in _initialized:
+            return
+        db = sqlite3.connect(database, timeout=STANDIN_CONFIG['busy_timeout'])
+        try:
+            db.execute('PRAGMA journal_mode=WAL')
+            with open(SCHEMA_FILE, 'r', encoding='utf-8') as schema_file:
+                db.executescript(schema_file.read())
+            db.commit()
+        finally:
+            db.close()
+        _initialized.add(database)
+
+
+def connect(address=None, port=None, user=None, password=None, currentSchema=None, database=None, **kwargs):
+    """Abre una conexión al stand-in (misma firma que `hdbcli.dbapi.connect`).
+
+    Args:
+        currentSchema (str, optional): Esquema que reporta el catálogo; por defecto el configurado.
+        database (str, optional): Archivo SQLite; por defecto `STANDIN_DATABASE`.
+
+    Returns:
+        StandinConnection: Conexión en modo autocommit.
+    """
+    return StandinConnection(database or STANDIN_CONFIG['database'], currentSchema or DB_CONFIG['schema'])
+
+
+class StandinConnection:
+    """Conexión del stand-in con la interfaz de `hdbcli.dbapi.Connection` que usa el hub."""
+
+    def __init__(self, database, schema):
+        """Abre el archivo SQLite y crea los objetos de catálogo de la sesión.
+
+        Args:
+            database (str): Ruta del archivo SQLite.
+            schema (str): Esquema que se reporta en SYS.* y M_TABLES.
+        """
+        ensure_schema(database)
+        network.connect()
+        self.database = database
+        self.schema = schema
+        self._db = sqlite3.connect(database, timeout=STANDIN_CONFIG['busy_timeout'], isolation_level=None,
+                                   check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._autocommit = True
+        self._closed = False
+        self._plans = {}
+        _register_functions(self._db)
+        self._create_catalog()
+        self._load_tables()
+
+    def _create_catalog(self):
+        """DUMMY, vistas SYS_* sobre sqlite_master y M_TABLES como objetos temporales de la sesión."""
+        schema = self.schema.replace("'", "''")
+        self._db.executescript(f"""
+            CREATE TEMP TABLE DUMMY (DUMMY NVARCHAR(1));
+            INSERT INTO DUMMY VALUES ('X');
+            CREATE TEMP VIEW SYS_TABLES AS
+                SELECT '{schema}' AS SCHEMA_NAME, name AS TABLE_NAME, 'COLUMN' AS TABLE_TYPE
+                FROM main.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%';
+            CREATE TEMP VIEW SYS_TABLE_COLUMNS AS
+                SELECT '{schema}' AS SCHEMA_NAME, m.name AS TABLE_NAME, c.name AS COLUMN_NAME,
+                       c.cid + 1 AS POSITION,
+                       UPPER(CASE WHEN INSTR(c.type, '(') > 0 THEN SUBSTR(c.type, 1, INSTR(c.type, '(') - 1) ELSE c.type END) AS DATA_TYPE_NAME,
+                       CASE WHEN c."notnull" THEN 'FALSE' ELSE 'TRUE' END AS IS_NULLABLE
+                FROM main.sqlite_master m JOIN pragma_table_info(m.name, 'main') c
+                WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%';
+            CREATE TEMP TABLE SYS_PROCEDURES (
+                SCHEMA_NAME NVARCHAR(256), PROCEDURE_NAME NVARCHAR(256), PROCEDURE_TYPE NVARCHAR(16), CREATE_TIME TIMESTAMP);
+            CREATE TEMP TABLE SYS_PROCEDURE_PARAMETERS (
+                SCHEMA_NAME NVARCHAR(256), PROCEDURE_NAME NVARCHAR(256), PARAMETER_NAME NVARCHAR(256),
+                PARAMETER_TYPE NVARCHAR(7), DATA_TYPE_NAME NVARCHAR(16), POSITION INTEGER, TABLE_TYPE_NAME NVARCHAR(256));
+            CREATE TEMP TABLE M_TABLES (SCHEMA_NAME NVARCHAR(256), TABLE_NAME NVARCHAR(256), RECORD_COUNT BIGINT);
+        """)
+        for name, procedure in _procedures.items():
+            self._db.execute("INSERT INTO SYS_PROCEDURES VALUES (?, ?, 'SQLSCRIPT', ?)",
+                             (self.schema, name, _procedures_created))
+            self._db.executemany(
+                "INSERT INTO SYS_PROCEDURE_PARAMETERS VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                [(self.schema, name, p.name, p.mode, p.data_type, position)
+                 for position, p in enumerate(procedure['parameters'], start=1)]
+            )
+
+    def _load_tables(self):
+        rows = self._db.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'").fetchall()
+        self._translator = _Translator({row[0].upper() for row in rows})
+        self._plans.clear()
+
+    def _refresh_record_counts(self):
+        """Llena M_TABLES con el conteo actual de cada tabla."""
+        self._db.execute('DELETE FROM M_TABLES')
+        for table in sorted(self._translator.tables):
+            count = self._db.execute(f'SELECT COUNT(*) FROM main."{table}"').fetchone()[0]
+            self._db.execute('INSERT INTO M_TABLES VALUES (?, ?, ?)', (self.schema, table, count))
+
+    def plan(self, sql):
+        """Traducción (cacheada) de una sentencia de HANA."""
+        plan = self._plans.get(sql)
+        if plan is None:
+            plan = self._translator.translate(sql)
+            if len(self._plans) >= _PLAN_CACHE_SIZE:
+                self._plans.clear()
+            self._plans[sql] = plan
+        return plan
+
+    def table_columns(self, table):
+        """Columnas de una tabla en orden."""
+        return [row[1] for row in self._db.execute('SELECT * FROM pragma_table_info(?)', (table,))]
+
+    def begin(self):
+        """Abre la transacción implícita cuando el autocommit está desactivado."""
+        if not self._autocommit and not self._db.in_transaction:
+            self._db.execute('BEGIN')
+
+    def check_open(self):
+        """Falla como hdbcli si la conexión se cerró (o la cerró un reset simulado)."""
+        if self._closed:
+            raise OperationalError('Connection is closed')
+
+    def cursor(self):
+        """Crea un cursor nuevo."""
+        self.check_open()
+        return StandinCursor(self)
+
+    def commit(self):
+        self.check_open()
+        network.round_trip(self)
+        if self._db.in_transaction:
+            self._db.execute('COMMIT')
+
+    def rollback(self):
+        self.check_open()
+        network.round_trip(self, faults=False)
+        self._rollback()
+
+    def _rollback(self):
+        if self._db.in_transaction:
+            self._db.execute('ROLLBACK')
+
+    def _abort(self):
+        """Reset simulado: el servidor revierte lo no confirmado y la conexión queda inutilizable."""
+        self._rollback()
+        self._db.close()
+        self._closed = True
+
+    def setautocommit(self, autocommit=True):
+        """Activa o desactiva el autocommit; al activarlo se confirma la transacción abierta."""
+        if autocommit and self._db.in_transaction:
+            self.commit()
+        self._autocommit = bool(autocommit)
+
+    def getautocommit(self):
+        return self._autocommit
+
+    def cancel(self):
+        """Interrumpe la sentencia en curso (como `hdbcli` con `connection.cancel()`)."""
+        self._db.interrupt()
+        return True
+
+    def isconnected(self):
+        return not self._closed
+
+    def close(self):
+        """Cierra la conexión; lo no confirmado se revierte."""
+        if not self._closed:
+            self._rollback()
+            self._db.close()
+            self._closed = True
+
+
+class StandinCursor:
+    """Cursor del stand-in con la interfaz de `hdbcli.dbapi.Cursor` que usa el hub."""
+
+    arraysize = 1
+
+    def __init__(self, connection, internal=False):
+        """Crea el cursor.
+
+        Args:
+            connection (StandinConnection): Conexión dueña del cursor.
+            internal (bool): Cursor de un procedimiento emulado: sus sentencias corren en el
+                servidor y no pagan costos de red.
+        """
+        self.connection = connection
+        self._network = None if internal else network
+        self._cursor = connection._db.cursor()
+        self._result_sets = []
+        self._result = None
+        self._fetched = 0
+        self.rowcount = -1
+
+    @property
+    def description(self):
+        if self._result is not None:
+            return self._result[0]
+        return self._cursor.description
+
+    def execute(self, operation, parameters=None):
+        """Ejecuta una sentencia de HANA con parámetros `?`."""
+        self.connection.check_open()
+        plan = self.connection.plan(operation)
+        parameters = tuple(parameters or ())
+        if self._network:
+            self._network.round_trip(self.connection, rows=1 if parameters else 0, write=_writes(plan))
+        self._run(plan, parameters)
+
+    def executemany(self, operation, seq_of_parameters):
+        """Ejecuta la sentencia para cada fila en un solo round trip; `rowcount` suma las filas afectadas."""
+        self.connection.check_open()
+        plan = self.connection.plan(operation)
+        seq_of_parameters = list(seq_of_parameters)
+        if self._network:
+            self._network.round_trip(self.connection, rows=len(seq_of_parameters), write=_writes(plan))
+        if plan.kind == 'sql':
+            self._reset()
+            self.connection.begin()
+            self._cursor.executemany(plan.statements[0], seq_of_parameters)
+            self.rowcount = self._cursor.rowcount
+            return
+        total = 0
+        for parameters in seq_of_parameters:
+            self._run(plan, tuple(parameters))
+            total += max(self.rowcount, 0)
+        self.rowcount = total
+
+    def _reset(self):
+        self._result_sets = []
+        self._result = None
+        self._fetched = 0
+
+    def _run(self, plan, parameters):
+        self._reset()
+        connection = self.connection
+        connection.begin()
+        if plan.refresh_counts:
+            connection._refresh_record_counts()
+
+        if plan.kind == 'call':
+            self._call_statement(plan.statements[0], parameters)
+        elif plan.kind == 'upsert_where':
+            update, insert = plan.statements
+            self._cursor.execute(update, parameters)
+            if self._cursor.rowcount == 0:
+                self._cursor.execute(insert, parameters[:plan.values_count])
+            self.rowcount = max(self._cursor.rowcount, 1)
+        elif plan.kind == 'multi':
+            total = 0
+            offset = 0
+            for statement in plan.statements:
+                count = _count_params(statement)
+                self._cursor.execute(statement, parameters[offset:offset + count])
+                offset += count
+                total += max(self._cursor.rowcount, 0)
+            self.rowcount = total
+        else:
+            self._cursor.execute(plan.statements[0], parameters)
+            self.rowcount = self._cursor.rowcount
+
+        if plan.ddl:
+            connection._load_tables()
+
+    def _call_statement(self, sql, parameters):
+        """`CALL esquema.proc(args)`: evalúa los argumentos y ejecuta el procedimiento emulado."""
+        match = _CALL.match(sql)
+        if not match:
+            raise OperationalError(f"CALL no soportado por el stand-in: {sql[:80]}")
+        arguments = match.group(2).strip()
+        values = list(self._cursor.execute(f'SELECT {arguments}', parameters).fetchone()) if arguments else []
+        self._invoke(match.group(1), values)
+
+    def callproc(self, procname, parameters=()):
+        """Ejecuta un procedimiento y devuelve los parámetros con los OUT rellenados."""
+        self.connection.check_open()
+        if self._network:
+            self._network.round_trip(self.connection, rows=1, write=True)
+        self._reset()
+        self.connection.begin()
+        return self._invoke(procname, list(parameters or ()))
+
+    def _invoke(self, procname, values):
+        name = procname.split('.')[-1].strip().strip('"').upper()
+        procedure = _procedures.get(name)
+        if procedure is None:
+            raise OperationalError(f"invalid name of function or procedure: {name}")
+        parameters = procedure['parameters']
+        values = values + [None] * (len(parameters) - len(values))
+        inputs = {p.name: values[i] for i, p in enumerate(parameters) if p.mode in ('IN', 'INOUT')}
+
+        outcome = procedure['body'](StandinCursor(self.connection, internal=True), inputs)
+        outs = outcome.get('out', {})
+        returned = [outs.get(p.name, values[i]) if p.mode in ('OUT', 'INOUT') else values[i]
+                    for i, p in enumerate(parameters)]
+        self._result_sets = [
+            (tuple((column, None, None, None, None, None, None) for column in columns), list(rows))
+            for columns, rows in outcome.get('result_sets', [])
+        ]
+        self.rowcount = -1
+        self.nextset()
+        return returned
+
+    def nextset(self):
+        """Avanza al siguiente result set de un CALL (None si no hay más)."""
+        if not self._result_sets:
+            self._result = None
+            return None
+        description, rows = self._result_sets.pop(0)
+        self._result = [description, rows, 0]
+        return True
+
+    def _count_fetched(self, rows):
+        if self._network:
+            self._network.fetched(self._fetched, rows)
+        self._fetched += rows
+
+    def fetchone(self):
+        if self._result is None:
+            row = self._cursor.fetchone()
+        else:
+            _, rows, position = self._result
+            row = rows[position] if position < len(rows) else None
+            self._result[2] += row is not None
+        self._count_fetched(0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        if self._result is None:
+            rows = self._cursor.fetchmany(size)
+        else:
+            _, result_rows, position = self._result
+            rows = result_rows[position:position + size]
+            self._result[2] += len(rows)
+        self._count_fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        if self._result is None:
+            rows = self._cursor.fetchall()
+        else:
+            _, result_rows, position = self._result
+            rows = result_rows[position:]
+            self._result[2] = len(result_rows)
+        self._count_fetched(len(rows))
+        return rows
+
+    def close(self):
+        self._reset()
+        self._cursor.close()
@@ -0,0 +1,377 @@
+-- Esquema del stand-in local de HANA (DB_DRIVER=standin).
+-- Tablas que leen y escriben los workflows TLCL01–04, con columnas representativas y los tipos
+-- de HANA (DATA_TYPE_NAME en SYS.TABLE_COLUMNS). Se aplica al abrir la primera conexión.
+
+--TLCL01 ElectricFact------------------------------------
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPELECTRICFACT (
+    RPU NVARCHAR(20),
+    CUENTA NVARCHAR(30),
+    TARIFA NVARCHAR(10),
+    MESFACENC INTEGER,
+    ANIOFACENC INTEGER,
+    FECHAINICIO DATE,
+    FECHAFIN DATE,
+    KWH DECIMAL(18,2),
+    IMPORTE DECIMAL(18,2)
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_ELECTRICFACT (
+    RPU NVARCHAR(20),
+    CUENTA NVARCHAR(30),
+    TARIFA NVARCHAR(10),
+    MESFACENC INTEGER,
+    ANIOFACENC INTEGER,
+    FECHAINICIO DATE,
+    FECHAFIN DATE,
+    KWH DECIMAL(18,2),
+    IMPORTE DECIMAL(18,2),
+    MESANIO NVARCHAR(7)
+);
+
+--TLCL02 KPI------------------------------------
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPKPI (
+    FECHA NVARCHAR(10),
+    HORA NVARCHAR(8),
+    PROPIEDAD NVARCHAR(100),
+    VALOR DECIMAL(18,4),
+    UNIDAD NVARCHAR(20)
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_KPI (
+    FECHA NVARCHAR(10),
+    HORA NVARCHAR(8),
+    ANIO NVARCHAR(4),
+    MES NVARCHAR(2),
+    DIA NVARCHAR(2),
+    PROPIEDAD NVARCHAR(100),
+    VALOR DECIMAL(18,4),
+    UNIDAD NVARCHAR(20),
+    MESANIO NVARCHAR(7),
+    PRIMARY KEY (FECHA, HORA, ANIO, MES, DIA, PROPIEDAD)
+);
+
+--TLCL03 Huawei Counters------------------------------------
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPWCDMAHUAWEICOUNTERS (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    VSCELLDYNSHUTDOWN DECIMAL(18,4),
+    DELTA INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPLTEDFEEHUAWEICOUNTERS (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    LCHMEASDFEECARRIERDYNMUTINGTTI NVARCHAR(30),
+    LCHMEASDFEECARRIEROFF NVARCHAR(30),
+    LCHMEASDFEEOPPRFOFF NVARCHAR(30),
+    LCHMEASDFEERFOFF NVARCHAR(30),
+    LCHMEASDFEEPROACTIVESCHTTI NVARCHAR(30),
+    DELTA INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPLTENODEHUAWEICOUNTERS (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    VSENERGYADDINGGSM2G NVARCHAR(30),
+    VSENERGYADDINGUMTS3G NVARCHAR(30),
+    VSENERGYADDINGLTE4G NVARCHAR(30),
+    VSENERGYADDINGR5G NVARCHAR(30),
+    DELTA INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMP5GHUAWEICOUNTERS (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    NPOWERSAVINGSYMBOLSHUTDOWN NVARCHAR(30),
+    NPOWERSAVINGRFSHUTDOWN NVARCHAR(30),
+    DELTA INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPHUAWEICOUNTERS (
+    FECHA NVARCHAR(20),
+    BTSNAME NVARCHAR(10),
+    IDBTSNAME NVARCHAR(50),
+    VSCELLDYNSHUTDOWN DECIMAL(18,4),
+    LCHMEASDFEECARRIERDYNMUTINGTTI DECIMAL(18,4),
+    LCHMEASDFEECARRIEROFF DECIMAL(18,4),
+    LCHMEASDFEEOPPRFOFF DECIMAL(18,4),
+    LCHMEASDFEERFOFF DECIMAL(18,4),
+    VSENERGYGSM2G DECIMAL(18,4),
+    VSENERGYUMTS3G DECIMAL(18,4),
+    VSENERGYLTE4G DECIMAL(18,4),
+    VSENERGYNR5G DECIMAL(18,4),
+    NPOWERSAVINGSYMBOLSHUTDOWN DECIMAL(18,4),
+    NPOWERSAVINGRFSHUTDOWN DECIMAL(18,4)
+);
+
+-- Llave de los MERGE de TLCL03_merge.sql: HANA la resuelve con hash join en column store,
+-- SQLite necesita el índice para no recorrer la tabla por cada fila de origen
+CREATE INDEX IF NOT EXISTS IX_TEMPHUAWEICOUNTERS_MERGE ON TELCEL_EE_TEMPHUAWEICOUNTERS (FECHA, BTSNAME, IDBTSNAME);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_HUAWEICOUNTERS (
+    FECHA NVARCHAR(10),
+    HORA NVARCHAR(8),
+    ANIO NVARCHAR(4),
+    MES NVARCHAR(2),
+    DIA NVARCHAR(2),
+    BTSNAME NVARCHAR(10),
+    IDBTSNAME NVARCHAR(50),
+    VSCELLDYNSHUTDOWN DECIMAL(18,4),
+    LCHMEASDFEECARRIERDYNMUTINGTTI DECIMAL(18,4),
+    LCHMEASDFEECARRIEROFF DECIMAL(18,4),
+    LCHMEASDFEEOPPRFOFF DECIMAL(18,4),
+    LCHMEASDFEERFOFF DECIMAL(18,4),
+    VSENERGYGSM2G DECIMAL(18,4),
+    VSENERGYUMTS3G DECIMAL(18,4),
+    VSENERGYLTE4G DECIMAL(18,4),
+    VSENERGYNR5G DECIMAL(18,4),
+    NPOWERSAVINGSYMBOLSHUTDOWN DECIMAL(18,4),
+    NPOWERSAVINGRFSHUTDOWN DECIMAL(18,4),
+    MESANIO NVARCHAR(7),
+    PRIMARY KEY (FECHA, HORA, ANIO, BTSNAME, IDBTSNAME, MESANIO)
+);
+
+--TLCL04 Ericsson Counters: tablas temporales de origen------------------------------------
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPENERGYMETERERICSSON5G (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    MINPOWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10)
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPENERGYCONSUMEDERICSSON5G (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    MINPOWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10)
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPBBCONSUMEDENERGYMEASUREMENTERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    POWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10)
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPBBENERGYMETERERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    MAXPOWERCONSUMPTION NVARCHAR(30),
+    MINPOWERRCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10)
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPDUCONSUMEDENERGYMEASUREMENTERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    POWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10)
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPDUENERGYMETERERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    POWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10)
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPEUTRANERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    MIMOSLEEPOPPTIME NVARCHAR(30),
+    MIMOSLEEPTIME NVARCHAR(30),
+    CELLSLEEPFAILUECAP NVARCHAR(30),
+    CELLSLEEPTIME NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10)
+);
+
+--TLCL04 Ericsson Counters: históricos------------------------------------
+CREATE TABLE IF NOT EXISTS TELCEL_EE_ENERGYMETERERICSSON5G (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    MINPOWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10),
+    DELTA INTEGER,
+    ANIOMES NVARCHAR(7),
+    PRIMARY KEY ("TIME", NODEBNAME, "HOUR")
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_ENERGYCONSUMEDERICSSON5G (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    MINPOWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10),
+    DELTA INTEGER,
+    ANIOMES NVARCHAR(7),
+    PRIMARY KEY ("TIME", NODEBNAME, "HOUR")
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_BBCONSUMEDENERGYMEASUREMENTERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    POWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10),
+    DELTA INTEGER,
+    ANIOMES NVARCHAR(7),
+    PRIMARY KEY ("TIME", NODEBNAME, "HOUR")
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_BBENERGYMETERERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    MAXPOWERCONSUMPTION NVARCHAR(30),
+    MINPOWERRCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10),
+    DELTA INTEGER,
+    ANIOMES NVARCHAR(7),
+    PRIMARY KEY ("TIME", NODEBNAME, "HOUR")
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_DUCONSUMEDENERGYMEASUREMENTERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    POWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10),
+    DELTA INTEGER,
+    ANIOMES NVARCHAR(7),
+    PRIMARY KEY ("TIME", NODEBNAME, "HOUR")
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_DUENERGYMETERERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    CONSUMEDENERGY NVARCHAR(30),
+    CONSUMEDENERGYACCUMULATED NVARCHAR(30),
+    POWERCONSUMPTION NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10),
+    DELTA INTEGER,
+    ANIOMES NVARCHAR(7),
+    PRIMARY KEY ("TIME", NODEBNAME, "HOUR")
+);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_EUTRANERICSSON (
+    "TIME" NVARCHAR(20),
+    NODEBNAME NVARCHAR(50),
+    "HOUR" INTEGER,
+    MIMOSLEEPOPPTIME NVARCHAR(30),
+    MIMOSLEEPTIME NVARCHAR(30),
+    CELLSLEEPFAILUECAP NVARCHAR(30),
+    CELLSLEEPTIME NVARCHAR(30),
+    VOLTAGE NVARCHAR(30),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10),
+    DELTA INTEGER,
+    MESANIO NVARCHAR(7),
+    PRIMARY KEY ("TIME", NODEBNAME, "HOUR")
+);
+
+--TLCL04 Ericsson Counters: Table Consumer y Table Producer------------------------------------
+CREATE TABLE IF NOT EXISTS TELCEL_EE_TEMPERICSSONCOUNTERS (
+    FECHA NVARCHAR(10),
+    HORA NVARCHAR(8),
+    BTSNAME NVARCHAR(10),
+    IDBTSNAME NVARCHAR(50),
+    CONSUMEDENERGY DECIMAL(18,4),
+    CONSUMEDENERGYACCUMULATED DECIMAL(18,4),
+    VOLTAGE DECIMAL(18,4),
+    POWERCONSUMPTION DECIMAL(18,4),
+    MINPOWERCONSUMPTION DECIMAL(18,4),
+    MAXPOWERCONSUMPTION DECIMAL(18,4),
+    MIMOSLEEPOPPTIME DECIMAL(18,4),
+    MIMOSLEEPTIME DECIMAL(18,4),
+    CELLSLEEPFAILUECAP DECIMAL(18,4),
+    CELLSLEEPTIME DECIMAL(18,4),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10),
+    OBJECTTYPE NVARCHAR(50)
+);
+
+-- Llave del MERGE de EUTRAN en TLCL04_initial.sql (ver IX_TEMPHUAWEICOUNTERS_MERGE)
+CREATE INDEX IF NOT EXISTS IX_TEMPERICSSONCOUNTERS_MERGE ON TELCEL_EE_TEMPERICSSONCOUNTERS (FECHA, HORA, BTSNAME, IDBTSNAME);
+
+CREATE TABLE IF NOT EXISTS TELCEL_EE_ERICSSONCOUNTERS (
+    FECHA DATE,
+    HORA NVARCHAR(8),
+    BTSNAME NVARCHAR(10),
+    IDBTSNAME NVARCHAR(50),
+    CONSUMEDENERGY DECIMAL(18,4),
+    CONSUMEDENERGYACCUMULATED DECIMAL(18,4),
+    VOLTAGE DECIMAL(18,4),
+    POWERCONSUMPTION DECIMAL(18,4),
+    MINPOWERCONSUMPTION DECIMAL(18,4),
+    MAXPOWERCONSUMPTION DECIMAL(18,4),
+    MIMOSLEEPOPPTIME DECIMAL(18,4),
+    MIMOSLEEPTIME DECIMAL(18,4),
+    CELLSLEEPFAILUECAP DECIMAL(18,4),
+    CELLSLEEPTIME DECIMAL(18,4),
+    PROVEEDOR NVARCHAR(20),
+    TECNOLOGIA NVARCHAR(10),
+    OBJECTTYPE NVARCHAR(50),
+    ANIO INTEGER,
+    MES INTEGER,
+    DIA INTEGER,
+    Fecha_Txt NVARCHAR(10),
+    ANIOMES NVARCHAR(7),
+    PRIMARY KEY (FECHA, HORA, BTSNAME, IDBTSNAME)
+);
@@ -0,0 +1,237 @@
+"""
+Subsistema de health checks con caché.
+Un prober en segundo plano refresca cada dependencia registrada cada cierto intervalo;
+los endpoints sirven el último resultado en memoria y `?deep=true` fuerza una verificación
+fresca sobre una conexión del pool (`SELECT 1 FROM DUMMY`) en lugar de un login nuevo.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from utils.config import DB_CONFIG, POOL_CONFIG
+from utils.db_pool import db_pool
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Registro de checks de salud con resultados cacheados y refresco periódico."""
+
+    def __init__(self, interval, concurrency=1):
+        """Inicializa el monitor.
+
+        Args:
+            interval (float): Segundos entre refrescos del prober (0 lo desactiva).
+            concurrency (int): Checks simultáneos de `check_all` (cada uno toma una conexión del pool).
+        """
+        self.interval = interval
+        self.concurrency = concurrency
+        self._checks = {}
+        self._cache = {}
+        self._inflight = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, name, check):
+        """Registra un check.
+
+        Args:
+            name (str): Nombre de la dependencia (p. ej. 'hana', 'TLCL01').
+            check (callable): Función sin argumentos que devuelve un dict con `success`.
+        """
+        self._checks[name] = check
+
+    def refresh(self, name):
+        """Ejecuta el check indicado y actualiza la caché.
+
+        Returns:
+            dict: Entrada de caché {result, checked_at, latency_ms}.
+        """
+        start = time.perf_counter()
+        try:
+            result = self._checks[name]()
+        except Exception as e:
+            result = {'success': False, 'message': f'Error en health check: {str(e)}'}
+        entry = {
+            'result': result,
+            'checked_at': time.time(),
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+        with self._lock:
+            self._cache[name] = entry
+        return entry
+
+    def get(self, name, deep=False):
+        """Obtiene el estado de una dependencia.
+
+        Args:
+            name (str): Nombre del check registrado.
+            deep (bool): True para forzar una verificación fresca.
+
+        Returns:
+            dict: Resultado del check con metadatos en `health_cache`.
+        """
+        self.ensure_started()
+        with self._lock:
+            entry = self._cache.get(name)
+        cached = entry is not None and not deep
+        if not cached:
+            entry = self.refresh(name)
+
+        result = dict(entry['result'])
+        result['health_cache'] = {
+            'cached': cached,
+            'deep': deep,
+            'checked_at': entry['checked_at'],
+            'age_seconds': round(time.time() - entry['checked_at'], 3),
+            'latency_ms': entry['latency_ms']
+        }
+        return result
+
+    def check_all(self, timeout, deep=True):
+        """Ejecuta todos los checks registrados en paralelo con timeout por check.
+
+        Corren a lo sumo `concurrency` checks a la vez, por debajo del tamaño del pool, y un
+        check que sigue en curso (p. ej. colgado de un request anterior) no se vuelve a lanzar:
+        se espera el mismo. Así los checks lentos no agotan las conexiones de los workflows.
+
+        Args:
+            timeout (float): Segundos máximos de espera por los checks.
+            deep (bool): False para devolver los resultados cacheados sin ejecutar checks.
+
+        Returns:
+            dict: {name: resultado} con `status`, `latency_ms` y el resultado de cada check.
+        """
+        names = list(self._checks)
+        if not deep:
+            return {name: self._format_entry(self.get(name)) for name in names}
+
+        futures = {name: self._submit(name) for name in names}
+        # Los que no terminan a tiempo siguen en su hilo y actualizan la caché al terminar
+        wait(futures.values(), timeout=timeout)
+
+        checks = {}
+        for name, future in futures.items():
+            if future.done():
+                entry = future.result()
+                checks[name] = {
+                    'status': 'ok' if entry['result'].get('success') else 'error',
+                    'latency_ms': entry['latency_ms'],
+                    'result': entry['result']
+                }
+            else:
+                checks[name] = {
+                    'status': 'timeout',
+                    'latency_ms': round(timeout * 1000, 2),
+                    'result': {'success': False, 'message': f'Health check sin respuesta tras {timeout}s'}
+                }
+        return checks
+
+    def _submit(self, name):
+        """Lanza el check en el executor acotado, o devuelve el que ya está en curso."""
+        with self._lock:
+            future = self._inflight.get(name)
+            if future is None or future.done():
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                        thread_name_prefix='health-check')
+                future = self._inflight[name] = self._executor.submit(self.refresh, name)
+            return future
+
+    def _format_entry(self, result):
+        """Da a un resultado cacheado el mismo formato que `check_all`."""
+        result = dict(result)
+        cache = result.pop('health_cache')
+        return {
+            'status': 'ok' if result.get('success') else 'error',
+            'latency_ms': cache['latency_ms'],
+            'age_seconds': cache['age_seconds'],
+            'result': result
+        }
+
+    def _run(self):
+        """Bucle del prober en segundo plano."""
+        while True:
+            for name in list(self._checks):
+                self.refresh(name)
+            time.sleep(self.interval)
+
+    def ensure_started(self):
+        """Arranca el prober (una vez por worker) si está habilitado."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='health-prober', daemon=True)
+        self._thread.start()
+        logger.info(f"Health prober iniciado (intervalo {self.interval}s)")
+
+
+def ping_database():
+    """Verifica HANA con `SELECT 1 FROM DUMMY` sobre una conexión del pool.
+
+    Returns:
+        dict: Estado de la conexión a la base de datos.
+    """
+    try:
+        with db_pool.connection() as hana_conn:
+            hana_conn.cursor.execute('SELECT 1 FROM DUMMY')
+            hana_conn.cursor.fetchone()
+        return {
+            'success': True,
+            'message': 'Conexión a HANA operativa',
+            'database_connection': 'OK'
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f'Error de conexión a la base de datos: {str(e)}',
+            'database_connection': 'ERROR'
+        }
+
+
+def check_objects(tables=(), procedures=()):
+    """Verifica en una sola consulta por tipo que existan las tablas y procedimientos de un workflow.
+
+    Args:
+        tables (tuple): Nombres de tablas en el esquema configurado.
+        procedures (tuple): Nombres de stored procedures en el esquema configurado.
+
+    Returns:
+        dict: Estado con los objetos faltantes, si hay.
+    """
+    try:
+        missing = []
+        with db_pool.connection() as hana_conn:
+            cursor = hana_conn.cursor
+            for catalog, column, names in (('SYS.TABLES', 'TABLE_NAME', tables),
+                                           ('SYS.PROCEDURES', 'PROCEDURE_NAME', procedures)):
+                if not names:
+                    continue
+                placeholders = ', '.join(['?' for _ in names])
+                cursor.execute(
+                    f"SELECT {column} FROM {catalog} WHERE SCHEMA_NAME = ? AND {column} IN ({placeholders})",
+                    [DB_CONFIG['schema'], *names]
+                )
+                found = {row[0] for row in cursor.fetchall()}
+                missing.extend(name for name in names if name not in found)
+        return {
+            'success': not missing,
+            'message': 'Objetos accesibles' if not missing else f"Objetos no encontrados: {', '.join(missing)}",
+            'database_connection': 'OK',
+            'missing_objects': missing
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f'Error de conexión a la base de datos: {str(e)}',
+            'database_connection': 'ERROR'
+        }
+
+
+health_monitor = HealthMonitor(POOL_CONFIG['health_probe_interval'], POOL_CONFIG['health_check_concurrency'])
+health_monitor.register('hana', ping_database)
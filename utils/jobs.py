@@ -0,0 +1,592 @@
+"""
+Registro en memoria de ejecuciones (jobs) de workflows.
+Permite publicar el progreso de cada paso (pasos, filas procesadas, throughput y ETA)
+para consumirlo en vivo como Server-Sent Events desde /api/jobs/<id>/events.
+Cada job tiene un presupuesto de tiempo vigilado por un watchdog que, al vencer (o ante
+DELETE /api/jobs/<id>), cancela la sentencia en curso en HANA con `connection.cancel()`.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from flask import jsonify, request
+from utils.admission import handoff_permit
+from utils.config import TIME_BUDGET_CONFIG
+from utils.metrics import metrics, step_label
+from utils.profiling import profiler
+from utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Ids aceptados en el header `X-Job-Id` (los generados son uuid4 en hexadecimal)
+JOB_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+# Job asociado al hilo actual (cada request/hilo de fondo ejecuta a lo sumo un job)
+_local = threading.local()
+
+
+class JobCancelledError(Exception):
+    """El job fue cancelado (por el cliente o por agotar su presupuesto de tiempo)."""
+
+
+class Job:
+    """Ejecución individual de un workflow con su flujo de eventos de progreso."""
+
+    def __init__(self, job_id, workflow):
+        """Inicializa el job.
+
+        Args:
+            job_id (str): Identificador único del job.
+            workflow (str): Nombre del workflow (p. ej. 'TLCL04').
+        """
+        self.id = job_id
+        self.workflow = workflow
+        self.status = 'running'
+        self.created_at = time.time()
+        self.finished_at = None
+        self.current_step = None
+        self.rows_processed = 0
+        self.rows_total = None
+        self.throughput = None
+        self.result = None
+        self.events = []
+        self.budget_seconds = None
+        self.deadline = None
+        self.statement_index = None
+        self.statement_total = None
+        self.statement_sql = None
+        self.cancellation = None
+        self._connections = []
+        # Span del job (padre de los spans de sus pasos, queries y SQL)
+        self.span = None
+        # Perfil de la ejecución en segundo plano (`?profile=` con `?async=true`)
+        self.profile_id = None
+        # Inicio del paso actual (duraciones por paso en /metrics)
+        self._step_mark = time.monotonic()
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        """True si el job ya terminó (con cualquier estado)."""
+        return self.status != 'running'
+
+    def _publish(self, event_type, data):
+        """Agrega un evento y despierta a los consumidores SSE."""
+        with self._cond:
+            data = dict(data)
+            data['elapsed_seconds'] = round(time.time() - self.created_at, 3)
+            self.events.append({'id': len(self.events) + 1, 'event': event_type, 'data': data})
+            self._cond.notify_all()
+
+    @property
+    def cancel_requested(self):
+        """True si se pidió cancelar el job."""
+        return self.cancellation is not None
+
+    def set_budget(self, seconds):
+        """Fija el presupuesto de tiempo del job (0 o None sin límite)."""
+        self.budget_seconds = seconds or None
+        self.deadline = time.monotonic() + seconds if seconds else None
+
+    def attach_connection(self, hana_conn):
+        """Registra una conexión en uso por el job para poder cancelar su sentencia."""
+        with self._cond:
+            self._connections.append(hana_conn)
+
+    def detach_connection(self, hana_conn):
+        """Quita una conexión registrada con `attach_connection`."""
+        with self._cond:
+            if hana_conn in self._connections:
+                self._connections.remove(hana_conn)
+
+    def statement(self, index, total=None, sql=None):
+        """Registra la sentencia en ejecución (se reporta si el job se cancela).
+
+        Args:
+            index (int): Posición de la sentencia (1-based).
+            total (int, optional): Número de sentencias del script.
+            sql (str, optional): Texto de la sentencia (se guarda un extracto).
+        """
+        self.statement_index = index
+        self.statement_total = total
+        self.statement_sql = ' '.join(sql.split())[:200] if sql else None
+
+    def cancel(self, reason='cancelled'):
+        """Cancela el job: marca la cancelación y cancela la sentencia en curso en HANA.
+
+        Args:
+            reason (str): 'cancelled' (cliente) o 'timeout' (presupuesto agotado).
+
+        Returns:
+            bool: False si el job ya había terminado.
+        """
+        with self._cond:
+            if self.finished:
+                return False
+            if self.cancellation is not None:
+                return True
+            self.cancellation = {
+                'reason': reason,
+                'requested_at': time.time(),
+                'elapsed_seconds': round(time.time() - self.created_at, 3),
+                'step': self.current_step,
+                'statement_index': self.statement_index,
+                'statement_total': self.statement_total,
+                'statement': self.statement_sql
+            }
+            connections = list(self._connections)
+
+        logger.warning(f"Cancelando job {self.id} ({self.workflow}) por {reason} en la sentencia {self.statement_index}")
+        self._publish('cancel', self.cancellation)
+        for hana_conn in connections:
+            try:
+                # hdbcli: cancela la sentencia que se ejecuta en la sesión
+                hana_conn.connection.cancel()
+            except Exception as e:
+                logger.error(f"No se pudo cancelar la sentencia del job {self.id}: {str(e)}")
+        return True
+
+    def raise_if_cancelled(self):
+        """Lanza `JobCancelledError` si se pidió cancelar el job."""
+        if self.cancellation is not None:
+            raise JobCancelledError(
+                f"Job cancelado ({self.cancellation['reason']}) en la sentencia {self.cancellation['statement_index']}"
+            )
+
+    def step(self, message):
+        """Publica el inicio/fin de un paso del workflow.
+
+        Args:
+            message (str): Descripción del paso (mismo texto que `steps_completed`).
+        """
+        self._observe_step()
+        tracer.step(message)
+        self.current_step = message
+        self._publish('step', {'message': message})
+
+    def _observe_step(self):
+        """Registra en /metrics la duración del paso actual (hasta el siguiente paso o el fin)."""
+        now = time.monotonic()
+        if self.current_step is not None:
+            metrics.observe('tlcl_workflow_step_duration_seconds', now - self._step_mark,
+                            workflow=self.workflow, step=step_label(self.current_step))
+        self._step_mark = now
+
+    def progress(self, rows_processed, rows_total=None, batch_rows=None, batch_seconds=None):
+        """Publica el avance en filas del paso actual.
+
+        Args:
+            rows_processed (int): Filas procesadas hasta el momento.
+            rows_total (int, optional): Total de filas esperado (para ETA).
+            batch_rows (int, optional): Filas del último lote.
+            batch_seconds (float, optional): Duración del último lote en segundos.
+        """
+        self.rows_processed = rows_processed
+        if rows_total is not None:
+            self.rows_total = rows_total
+        if batch_rows and batch_seconds and batch_seconds > 0:
+            self.throughput = batch_rows / batch_seconds
+
+        eta_seconds = None
+        if self.throughput and self.rows_total is not None:
+            eta_seconds = round(max(self.rows_total - rows_processed, 0) / self.throughput, 3)
+
+        self._publish('progress', {
+            'step': self.current_step,
+            'rows_processed': rows_processed,
+            'rows_total': self.rows_total,
+            'rows_per_second': round(self.throughput, 2) if self.throughput else None,
+            'eta_seconds': eta_seconds
+        })
+
+    def finish(self, result):
+        """Marca el job como terminado a partir del dict de resultado del servicio.
+
+        Los servicios devuelven `success` (bool) o `status` ('success', 'warning', 'error').
+        """
+        if isinstance(result, dict) and 'success' in result:
+            status = 'success' if result.get('success') else 'error'
+        elif isinstance(result, dict) and result.get('status') in ('success', 'warning'):
+            status = result['status']
+        else:
+            status = 'error'
+
+        if self.cancellation is not None:
+            status = 'timeout' if self.cancellation['reason'] == 'timeout' else 'cancelled'
+            result = dict(result) if isinstance(result, dict) else {'success': False, 'data': None}
+            result['success'] = False
+            result['message'] = f"Job cancelado ({self.cancellation['reason']}): {result.get('message') or 'sin resultado'}"
+            result['cancellation'] = self.cancellation
+
+        self.result = result
+        self.finished_at = time.time()
+        self.status = status
+        self._observe_step()
+        metrics.observe('tlcl_workflow_run_duration_seconds', self.finished_at - self.created_at,
+                        workflow=self.workflow, status=status)
+        self._publish('end', {'status': status, 'message': (result or {}).get('message') if isinstance(result, dict) else None})
+
+    def wait_events(self, last_event_id, timeout):
+        """Espera eventos posteriores a `last_event_id`.
+
+        Args:
+            last_event_id (int): Último id de evento ya entregado al cliente.
+            timeout (float): Segundos máximos de espera.
+
+        Returns:
+            list: Eventos nuevos (puede estar vacía si venció el timeout).
+        """
+        with self._cond:
+            if len(self.events) <= last_event_id and not self.finished:
+                self._cond.wait(timeout)
+            return self.events[last_event_id:]
+
+    def to_dict(self):
+        """Resumen serializable del job."""
+        return {
+            'job_id': self.id,
+            'workflow': self.workflow,
+            'status': self.status,
+            'current_step': self.current_step,
+            'rows_processed': self.rows_processed,
+            'rows_total': self.rows_total,
+            'rows_per_second': round(self.throughput, 2) if self.throughput else None,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'events': len(self.events),
+            'time_budget_seconds': self.budget_seconds,
+            'statement_index': self.statement_index,
+            'statement_total': self.statement_total,
+            'cancellation': self.cancellation,
+            'result': self.result
+        }
+
+
+class JobRegistry:
+    """Registro thread-safe de jobs por worker, con historial acotado."""
+
+    def __init__(self, max_history=100):
+        """Inicializa el registro.
+
+        Args:
+            max_history (int): Número máximo de jobs terminados que se conservan.
+        """
+        self.max_history = max_history
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, workflow, job_id=None):
+        """Crea y registra un job nuevo.
+
+        Args:
+            workflow (str): Nombre del workflow.
+            job_id (str, optional): Id propuesto por el cliente (header `X-Job-Id`); si es
+                inválido o ya está registrado se genera uno nuevo.
+
+        Returns:
+            Job: Job registrado.
+        """
+        if job_id is not None and not JOB_ID_PATTERN.fullmatch(job_id):
+            logger.warning(f"Id de job inválido descartado ({workflow}): {job_id[:80]!r}")
+            job_id = None
+        with self._lock:
+            if job_id in self._jobs:
+                # Otro request registró el mismo id entre la validación y la creación
+                logger.warning(f"Id de job {job_id} en uso, se genera uno nuevo ({workflow})")
+                job_id = None
+            job = Job(job_id or uuid.uuid4().hex, workflow)
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def client_id_error(self, job_id):
+        """Valida un id propuesto por el cliente (header `X-Job-Id`).
+
+        Args:
+            job_id (str): Id propuesto.
+
+        Returns:
+            tuple: (mensaje, código HTTP) si el id es inválido (400) o ya está registrado (409),
+            o None si puede usarse.
+        """
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return 'X-Job-Id inválido: 1 a 64 caracteres entre letras, dígitos, "-" y "_"', 400
+        existing = self.get(job_id)
+        if existing is not None:
+            state = 'en ejecución' if not existing.finished else 'terminado'
+            return f'El job {job_id} ya existe ({existing.workflow}, {state}); use otro X-Job-Id', 409
+        return None
+
+    def get(self, job_id):
+        """Obtiene un job por id o None si no existe en este worker."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def running(self):
+        """Jobs en ejecución en este worker."""
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.finished]
+
+    def _prune(self):
+        """Descarta los jobs terminados más antiguos por encima de `max_history`."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.max_history, 0)]:
+            del self._jobs[job_id]
+
+
+job_registry = JobRegistry(max_history=int(os.getenv('JOBS_MAX_HISTORY', '100')))
+
+
+class JobWatchdog:
+    """Hilo que cancela los jobs que superan su presupuesto de tiempo."""
+
+    def __init__(self, registry, interval):
+        """Inicializa el watchdog.
+
+        Args:
+            registry (JobRegistry): Registro de jobs a vigilar.
+            interval (float): Segundos entre revisiones.
+        """
+        self.registry = registry
+        self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _run(self):
+        """Bucle del watchdog."""
+        while True:
+            now = time.monotonic()
+            for job in self.registry.running():
+                if job.deadline is not None and now > job.deadline and not job.cancel_requested:
+                    job.cancel('timeout')
+            time.sleep(self.interval)
+
+    def ensure_started(self):
+        """Arranca el watchdog (una vez por worker)."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='job-watchdog', daemon=True)
+        self._thread.start()
+        logger.info(f"Watchdog de jobs iniciado (intervalo {self.interval}s)")
+
+
+job_watchdog = JobWatchdog(job_registry, TIME_BUDGET_CONFIG['watchdog_interval'])
+
+
+def time_budget(workflow, sync=False):
+    """Presupuesto de tiempo (segundos) de un workflow; 0 sin límite.
+
+    Las ejecuciones síncronas se acotan además por `TIME_BUDGET_SYNC`.
+    """
+    budget = TIME_BUDGET_CONFIG['workflows'].get(workflow, TIME_BUDGET_CONFIG['default'])
+    if sync and TIME_BUDGET_CONFIG['sync']:
+        budget = min(budget, TIME_BUDGET_CONFIG['sync']) if budget else TIME_BUDGET_CONFIG['sync']
+    return budget
+
+
+def _start_job(workflow, job_id, sync):
+    """Crea el job con su presupuesto de tiempo y asegura el watchdog."""
+    job = job_registry.create(workflow, job_id)
+    job.set_budget(time_budget(workflow, sync))
+    if job.deadline is not None:
+        job_watchdog.ensure_started()
+    return job
+
+
+def current_job():
+    """Devuelve el job ligado al hilo actual o None."""
+    return getattr(_local, 'job', None)
+
+
+@contextmanager
+def bind_job(job):
+    """Liga un job (y su span) al hilo actual mientras dura el bloque."""
+    previous = current_job()
+    _local.job = job
+    try:
+        with tracer.activate(job.span):
+            yield job
+    finally:
+        _local.job = previous
+
+
+def _job_span(job, **kwargs):
+    """Abre el span de un job (raíz si no hay span activo ni padre)."""
+    return tracer.start_span(f'job {job.workflow}', root=True,
+                             **{'job.id': job.id, 'job.workflow': job.workflow}, **kwargs)
+
+
+def _traced_run(job, fn, span=None):
+    """Ejecuta `fn` ligado al job dentro de su span y cierra el job con el resultado.
+
+    Args:
+        job (Job): Job registrado.
+        fn (callable): Función sin argumentos que devuelve el dict de resultado.
+        span (Span, optional): Span del job ya abierto en otro hilo; por defecto se abre aquí.
+    """
+    if span is None:
+        span = _job_span(job)
+    job.span = span
+    result = None
+    try:
+        with bind_job(job):
+            result = fn()
+    except Exception as e:
+        span.set_error(e)
+        raise
+    finally:
+        job.finish(result)
+        span.set_attribute('job.status', job.status)
+        if job.status not in ('success', 'warning'):
+            span.set_error((job.result or {}).get('message') if isinstance(job.result, dict) else job.status)
+        tracer.end_span(span)
+
+
+def publish_step(message):
+    """Publica un paso en el job actual (no hace nada fuera de un job)."""
+    job = current_job()
+    if job:
+        job.step(message)
+
+
+def publish_progress(rows_processed, rows_total=None, batch_rows=None, batch_seconds=None):
+    """Publica avance de filas en el job actual (no hace nada fuera de un job)."""
+    job = current_job()
+    if job:
+        job.progress(rows_processed, rows_total, batch_rows, batch_seconds)
+
+
+def publish_statement(index, total=None, sql=None):
+    """Registra la sentencia en curso del job actual y corta si fue cancelado."""
+    job = current_job()
+    if job:
+        job.raise_if_cancelled()
+        job.statement(index, total, sql)
+
+
+def check_cancelled():
+    """Punto de cancelación cooperativa: lanza `JobCancelledError` si el job actual fue cancelado."""
+    job = current_job()
+    if job:
+        job.raise_if_cancelled()
+
+
+@contextmanager
+def track_connection(hana_conn):
+    """Registra la conexión en el job actual mientras dura el bloque (para cancelarla)."""
+    job = current_job()
+    if job:
+        job.attach_connection(hana_conn)
+    try:
+        yield hana_conn
+    finally:
+        if job:
+            job.detach_connection(hana_conn)
+
+
+class StepLog(list):
+    """Lista de `steps_completed` que además publica cada paso en el job actual."""
+
+    def append(self, message):
+        super().append(message)
+        publish_step(message)
+
+
+def run_job(workflow, fn, job_id=None):
+    """Ejecuta `fn` de forma síncrona dentro de un job registrado.
+
+    Args:
+        workflow (str): Nombre del workflow.
+        fn (callable): Función sin argumentos que devuelve el dict de resultado.
+        job_id (str, optional): Id propuesto por el cliente.
+
+    Returns:
+        tuple: (job, result)
+    """
+    job = _start_job(workflow, job_id, sync=True)
+    _traced_run(job, fn)
+    # Si el job fue cancelado, `job.result` incluye los datos de la cancelación
+    return job, job.result
+
+
+def submit_job(workflow, fn, job_id=None):
+    """Ejecuta `fn` en un hilo de fondo dentro de un job registrado.
+
+    Returns:
+        Job: Job en ejecución; el resultado queda en `job.result` al terminar.
+    """
+    job = _start_job(workflow, job_id, sync=False)
+    # El cupo de admisión del request se conserva hasta que termine el job
+    permit = handoff_permit()
+    # El span del job se abre aquí, colgando del span del request, para que la traza siga abierta
+    # hasta que termine el job aunque el request responda antes
+    span = _job_span(job, parent=tracer.current_span(), detached=True)
+    # El perfil pedido con `?profile=` pasa al hilo del job
+    profile = profiler.handoff()
+    if profile:
+        job.profile_id = profile.id
+
+    def _fn():
+        try:
+            return fn()
+        except Exception as e:
+            return {'success': False, 'message': f'Error interno del servidor: {str(e)}', 'data': None}
+
+    def _target():
+        try:
+            with profiler.resume(profile, f'job {workflow}'):
+                _traced_run(job, _fn, span)
+        finally:
+            if permit:
+                permit.release()
+
+    threading.Thread(target=_target, name=f'job-{job.id}', daemon=True).start()
+    return job
+
+
+def job_links(job):
+    """Datos de respuesta 202 para un job lanzado en segundo plano."""
+    links = {
+        'job_id': job.id,
+        'workflow': job.workflow,
+        'status': job.status,
+        'status_url': f'/api/jobs/{job.id}',
+        'events_url': f'/api/jobs/{job.id}/events'
+    }
+    if job.profile_id:
+        links['profile_url'] = f'/api/profiles/{job.profile_id}'
+    return links
+
+
+def dispatch_job(workflow, fn):
+    """Ejecuta `fn` como job del request actual: en segundo plano con `?async=true`, si no síncrono.
+
+    En segundo plano el progreso se consulta en /api/jobs/<id>/events. El id del job puede
+    fijarse con el header `X-Job-Id`.
+
+    Args:
+        workflow (str): Nombre del workflow.
+        fn (callable): Función sin argumentos que devuelve el dict de resultado.
+
+    Returns:
+        tuple: (respuesta 202 con `job_links`, None) si se lanzó en segundo plano, o
+        (None, resultado con `job_id`) si se ejecutó de forma síncrona.
+    """
+    job_id = request.headers.get('X-Job-Id')
+    if request.args.get('async', '').lower() == 'true':
+        job = submit_job(workflow, fn, job_id)
+        return (jsonify(job_links(job)), 202), None
+
+    job, result = run_job(workflow, fn, job_id)
+    if isinstance(result, dict):
+        result['job_id'] = job.id
+    return None, result
@@ -0,0 +1,240 @@
+"""
+Métricas en formato de exposición de Prometheus para `/metrics`.
+Contadores e histogramas en memoria del worker (un lock y un `bisect` por observación, sin
+dependencias externas). Con `METRICS_DIR` cada worker de gunicorn vuelca su estado a
+`<METRICS_DIR>/metrics_<pid>.json` cada `METRICS_FLUSH_INTERVAL` segundos y `/metrics` suma
+los archivos de todos los workers, así que el resultado no depende de qué worker atiende el
+scrape. Los contadores de un worker reciclado siguen sumando con su último volcado.
+"""
+
+import bisect
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from utils.config import METRICS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Buckets (segundos) de latencias: de requests cacheados a workflows de varios minutos
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+# Buckets (filas) de los lotes de executemany
+ROWS_BUCKETS = (10, 50, 100, 500, 1000, 2500, 5000, 10000, 20000, 50000)
+
+# Nombre: (tipo, ayuda, buckets)
+DEFINITIONS = {
+    'tlcl_http_request_duration_seconds': (
+        'histogram', 'Latencia de requests HTTP por blueprint, ruta, método y código', DURATION_BUCKETS),
+    'tlcl_workflow_run_duration_seconds': (
+        'histogram', 'Duración de cada ejecución de workflow por estado final', DURATION_BUCKETS),
+    'tlcl_workflow_step_duration_seconds': (
+        'histogram', 'Duración de cada paso de workflow (hasta el siguiente paso o el fin)', DURATION_BUCKETS),
+    'tlcl_table_rows_total': (
+        'counter', 'Filas leídas (read) o escritas (write) por tabla', None),
+    'tlcl_bulk_batch_rows': (
+        'histogram', 'Filas por lote executemany de los Table Producers', ROWS_BUCKETS),
+    'tlcl_sql_statement_duration_seconds': (
+        'histogram', 'Duración de cada sentencia ejecutada por SqlRunner', DURATION_BUCKETS),
+    'tlcl_sp_call_duration_seconds': (
+        'histogram', 'Duración de cada llamada a stored procedure', DURATION_BUCKETS),
+    'tlcl_pool_checkout_wait_seconds': (
+        'histogram', 'Espera por una conexión del pool HANA', DURATION_BUCKETS),
+    'tlcl_hana_pool_connections': (
+        'gauge', 'Conexiones del pool HANA por estado y worker', None),
+}
+
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+def step_label(message):
+    """Etiqueta estable de un paso: sin los conteos que cambian en cada ejecución."""
+    return _NUMBERS.sub('N', message)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Contadores, histogramas y gauges del worker, con volcado opcional para multi-worker."""
+
+    def __init__(self, enabled=True, directory=None, flush_interval=5.0):
+        """Inicializa el registro.
+
+        Args:
+            enabled (bool): False para no registrar nada (las llamadas quedan en no-op).
+            directory (str, optional): Directorio compartido por los workers (`METRICS_DIR`).
+            flush_interval (float): Segundos entre volcados del estado del worker.
+        """
+        self.enabled = enabled
+        self.directory = directory or None
+        self.flush_interval = flush_interval
+        self._counters = {}
+        self._histograms = {}
+        self._gauge_sources = {}
+        self._lock = threading.Lock()
+        self._thread_pid = None
+        self._thread_lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """Suma `value` al contador `name` con las etiquetas indicadas."""
+        if not self.enabled:
+            return
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Registra una observación en el histograma `name`."""
+        if not self.enabled:
+            return
+        buckets = DEFINITIONS[name][2]
+        position = bisect.bisect_left(buckets, value)
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Conteos por bucket (no acumulados), suma y total
+                histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            histogram[0][position] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def register_gauges(self, name, source):
+        """Registra una función que devuelve [(etiquetas, valor)] al momento del scrape/volcado."""
+        self._gauge_sources[name] = source
+
+    def snapshot(self):
+        """Estado serializable del worker: contadores, histogramas y gauges."""
+        with self._lock:
+            counters = [[name, list(labels), value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, list(labels), list(data[0]), data[1], data[2]]
+                          for (name, labels), data in self._histograms.items()]
+        gauges = []
+        for name, source in self._gauge_sources.items():
+            try:
+                gauges.extend([name, [list(item) for item in labels], value] for labels, value in source())
+            except Exception as e:
+                logger.error(f"No se pudo leer el gauge {name}: {str(e)}")
+        return {'pid': os.getpid(), 'written_at': time.time(),
+                'counters': counters, 'histograms': histograms, 'gauges': gauges}
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'metrics_{pid}.json')
+
+    def flush(self):
+        """Vuelca el estado del worker a su archivo en `METRICS_DIR` (escritura atómica)."""
+        if not (self.enabled and self.directory):
+            return
+        path = self._path(os.getpid())
+        tmp_path = f'{path}.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(self.snapshot(), handle)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"No se pudieron volcar las métricas en {path}: {str(e)}")
+
+    def _run(self):
+        """Bucle de volcado periódico."""
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def ensure_started(self):
+        """Arranca el volcado periódico (una vez por worker; solo con `METRICS_DIR`).
+
+        Los hilos no sobreviven al fork de gunicorn con `--preload`: se arranca por pid.
+        """
+        if not (self.enabled and self.directory and self.flush_interval > 0) or self._thread_pid == os.getpid():
+            return
+        with self._thread_lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            thread = threading.Thread(target=self._run, name='metrics-flusher', daemon=True)
+        thread.start()
+        logger.info(f"Volcado de métricas iniciado en {self.directory} (intervalo {self.flush_interval}s)")
+
+    def _snapshots(self):
+        """Estado propio (en vivo) más el último volcado de los demás workers."""
+        own = self.snapshot()
+        if not self.directory:
+            return [own]
+        snapshots = [own]
+        stale_after = max(self.flush_interval * 3, 30)
+        for path in glob.glob(os.path.join(self.directory, 'metrics_*.json')):
+            if path == self._path(own['pid']):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as handle:
+                    snapshot = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            # Los gauges de un worker que dejó de volcar ya no describen nada vivo
+            if time.time() - snapshot.get('written_at', 0) > stale_after:
+                snapshot['gauges'] = []
+            snapshots.append(snapshot)
+        return snapshots
+
+    def render(self):
+        """Texto en formato de exposición de Prometheus (0.0.4) con la suma de los workers."""
+        counters = {}
+        histograms = {}
+        gauges = {}
+        for snapshot in self._snapshots():
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, buckets, total, count in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                current = histograms.get(key)
+                if current is None or len(current[0]) != len(buckets):
+                    histograms[key] = [list(buckets), total, count]
+                else:
+                    current[0] = [a + b for a, b in zip(current[0], buckets)]
+                    current[1] += total
+                    current[2] += count
+            for name, labels, value in snapshot['gauges']:
+                gauges[(name, tuple(map(tuple, labels)))] = value
+
+        lines = []
+        for name, (kind, help_text, buckets) in DEFINITIONS.items():
+            series = {'counter': counters, 'histogram': histograms, 'gauge': gauges}[kind]
+            keys = sorted(key for key in series if key[0] == name)
+            if not keys:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key in keys:
+                labels = key[1]
+                if kind != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(series[key])}')
+                    continue
+                counts, total, count = series[key]
+                cumulative = 0
+                for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    le = bound if bound == '+Inf' else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(round(total, 6))}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry(METRICS_CONFIG['enabled'], METRICS_CONFIG['directory'], METRICS_CONFIG['flush_interval'])
@@ -0,0 +1,381 @@
+"""
+Profiling bajo demanda de una ejecución (`?profile=cpu|alloc` con el token de administración).
+
+- `cpu`: cProfile del hilo que ejecuta el workflow (artefacto `.pstats`, hotspots por tiempo propio)
+  más un muestreo de su stack cada `PROFILING_SAMPLE_INTERVAL` segundos (artefacto `.collapsed`
+  para flamegraph.pl o speedscope).
+- `alloc`: tracemalloc; snapshot en el pico de memoria traceada (hotspots por línea y `.collapsed`
+  con bytes por stack).
+
+Los artefactos y un resumen `.json` quedan en `PROFILING_DIR` (consultables en /api/profiles).
+Hay un solo perfil activo por worker: tracemalloc es global al intérprete y cProfile no admite
+perfiles simultáneos en Python 3.12+.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.config import PROFILING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+MODES = ('cpu', 'alloc')
+
+# Sesión del request en curso (para cederla a un job en segundo plano)
+_local = threading.local()
+
+_PROFILE_ID = re.compile(r'^[0-9a-f]{16}$')
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# En modo alloc se toma un snapshot nuevo cuando la memoria traceada supera el pico anterior en 10%
+_ALLOC_SNAPSHOT_GROWTH = 1.10
+_ALLOC_MIN_INTERVAL = 0.05
+
+
+class ProfilerBusy(Exception):
+    """Ya hay un perfil activo en este worker."""
+
+
+def _short_path(path):
+    """Ruta relativa al repositorio, o desde `site-packages` / el nombre del archivo."""
+    if path.startswith(_ROOT):
+        return os.path.relpath(path, _ROOT)
+    marker = f'site-packages{os.sep}'
+    if marker in path:
+        return path.split(marker, 1)[1]
+    return os.path.basename(path)
+
+
+def _frame_label(code):
+    return f'{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})'
+
+
+class ProfileSession:
+    """Perfil de una ejecución; instrumenta el hilo que llama a `begin`."""
+
+    def __init__(self, profiler, mode, name):
+        self.profiler = profiler
+        self.id = uuid.uuid4().hex[:16]
+        self.mode = mode
+        self.name = name
+        self.started_at = None
+        self._start = None
+        self._done = threading.Event()
+        self._sampler = None
+        self._profile = None
+        self._thread_id = None
+        self._stacks = {}
+        self._samples = 0
+        self._peak_snapshot = None
+        self._peak_size = 0
+        self._closed = False
+
+    def begin(self):
+        """Empieza a perfilar el hilo actual."""
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._thread_id = threading.get_ident()
+        self._done.clear()
+        if self.mode == 'cpu':
+            self._stacks = {}
+            self._samples = 0
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            target = self._sample_stacks
+        else:
+            self._peak_snapshot = None
+            self._peak_size = 0
+            tracemalloc.start(self.profiler.alloc_frames)
+            target = self._watch_memory
+        self._sampler = threading.Thread(target=target, name=f'profile-{self.id}', daemon=True)
+        self._sampler.start()
+
+    def _sample_stacks(self):
+        """Muestrea el stack del hilo perfilado (stacks colapsados para flamegraphs)."""
+        while not self._done.wait(self.profiler.sample_interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack = ';'.join(reversed(labels))
+            self._stacks[stack] = self._stacks.get(stack, 0) + 1
+            self._samples += 1
+
+    def _watch_memory(self):
+        """Toma un snapshot de tracemalloc cada vez que la memoria traceada marca un pico nuevo."""
+        interval = max(self.profiler.sample_interval, _ALLOC_MIN_INTERVAL)
+        while not self._done.wait(interval):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self._peak_size * _ALLOC_SNAPSHOT_GROWTH:
+                self._peak_snapshot = tracemalloc.take_snapshot()
+                self._peak_size = current
+
+    def _halt(self):
+        """Detiene la instrumentación y devuelve los datos crudos del modo."""
+        self._done.set()
+        if self.mode == 'cpu':
+            self._profile.disable()
+            self._sampler.join()
+            return self._profile
+        self._sampler.join()
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        if self._peak_snapshot is None or current >= self._peak_size:
+            self._peak_snapshot, self._peak_size = snapshot, current
+        return {'peak': peak, 'at_end': current}
+
+    def pause(self):
+        """Descarta lo perfilado en este hilo sin liberar el perfil (se reanuda en otro hilo)."""
+        if self._start is not None:
+            self._halt()
+            self._start = None
+
+    def discard(self):
+        """Descarta el perfil y libera el worker."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.pause()
+        finally:
+            self.profiler._release(self)
+
+    def stop(self):
+        """Termina el perfil, guarda sus artefactos y libera el worker.
+
+        Returns:
+            dict: Resumen con hotspots y URLs de los artefactos, o None si ya estaba cerrado.
+        """
+        if self._closed or self._start is None:
+            self.discard()
+            return None
+        self._closed = True
+        try:
+            duration = time.perf_counter() - self._start
+            data = self._halt()
+            if self.mode == 'cpu':
+                summary = self.profiler._save_cpu(self, data, duration)
+            else:
+                summary = self.profiler._save_alloc(self, data, duration)
+            logger.info(f"Perfil {self.mode} {self.id} guardado ({self.name}, {round(duration * 1000)} ms)")
+            return summary
+        except Exception as e:
+            logger.error(f"No se pudo guardar el perfil {self.id}: {str(e)}")
+            return None
+        finally:
+            self.profiler._release(self)
+
+
+class Profiler:
+    """Sesiones de profiling del worker y registro de sus artefactos."""
+
+    def __init__(self, directory, max_stored=20, top=20, sample_interval=0.005, alloc_frames=25):
+        """Inicializa el profiler.
+
+        Args:
+            directory (str): Directorio de artefactos (`PROFILING_DIR`).
+            max_stored (int): Perfiles que se conservan; los más antiguos se borran.
+            top (int): Hotspots incluidos en el resumen.
+            sample_interval (float): Segundos entre muestras de stacks (modo cpu).
+            alloc_frames (int): Frames por traceback de tracemalloc (modo alloc).
+        """
+        self.directory = directory
+        self.max_stored = max_stored
+        self.top = top
+        self.sample_interval = sample_interval
+        self.alloc_frames = alloc_frames
+        self._active = None
+        self._stored = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, mode, name):
+        """Abre un perfil en el hilo actual.
+
+        Args:
+            mode (str): 'cpu' o 'alloc'.
+            name (str): Qué se perfila (p. ej. 'POST /api/TLCL03/merge').
+
+        Returns:
+            ProfileSession: Sesión activa; cerrarla con `stop` o `discard`.
+
+        Raises:
+            ValueError: Si el modo no es válido.
+            ProfilerBusy: Si ya hay un perfil activo en el worker.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Modo de profiling inválido: {mode} (usar {' o '.join(MODES)})")
+        session = ProfileSession(self, mode, name)
+        with self._lock:
+            if self._active is not None:
+                raise ProfilerBusy(f'Ya hay un perfil activo en este worker ({self._active.name})')
+            self._active = session
+        try:
+            session.begin()
+        except Exception:
+            self._release(session)
+            raise
+        _local.session = session
+        return session
+
+    def _release(self, session):
+        with self._lock:
+            if self._active is session:
+                self._active = None
+        if getattr(_local, 'session', None) is session:
+            _local.session = None
+
+    def handoff(self):
+        """Cede el perfil del request actual a un job en segundo plano.
+
+        Returns:
+            ProfileSession: Sesión pausada que el job reanuda con `resume`, o None si no hay.
+        """
+        session = getattr(_local, 'session', None)
+        if session is None:
+            return None
+        _local.session = None
+        session.pause()
+        return session
+
+    def current_session(self):
+        """Sesión abierta por el request actual (None si no hay o si se cedió a un job)."""
+        return getattr(_local, 'session', None)
+
+    @contextmanager
+    def resume(self, session, name):
+        """Reanuda en el hilo actual un perfil cedido con `handoff` y lo guarda al salir."""
+        if session is None:
+            yield None
+            return
+        session.name = name
+        session.begin()
+        try:
+            yield session
+        finally:
+            session.stop()
+
+    def _path(self, profile_id, extension):
+        return os.path.join(self.directory, f'{profile_id}.{extension}')
+
+    def _summary(self, session, duration, hotspots, artifacts, **extra):
+        return {
+            'id': session.id,
+            'name': session.name,
+            'mode': session.mode,
+            'pid': os.getpid(),
+            'started_at': session.started_at,
+            'duration_ms': round(duration * 1000, 1),
+            **extra,
+            'hotspots': hotspots,
+            'artifacts': {kind: f'/api/profiles/{session.id}/{kind}' for kind in artifacts}
+        }
+
+    def _save_cpu(self, session, profile, duration):
+        os.makedirs(self.directory, exist_ok=True)
+        profile.dump_stats(self._path(session.id, 'pstats'))
+        stats = pstats.Stats(profile)
+        total = stats.total_tt or 1
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        hotspots = [{
+            # Las funciones built-in (C) no tienen archivo: cProfile las reporta como '~'
+            'function': func if filename == '~' else f'{func} ({_short_path(filename)}:{line})',
+            'calls': calls,
+            'own_ms': round(own * 1000, 2),
+            'cumulative_ms': round(cumulative * 1000, 2),
+            'own_pct': round(own / total * 100, 1)
+        } for (filename, line, func), (_, calls, own, cumulative, _) in ranked]
+        self._write_collapsed(session.id, session._stacks)
+        return self._store(self._summary(
+            session, duration, hotspots, ('pstats', 'collapsed'),
+            total_calls=stats.total_calls, samples=session._samples))
+
+    def _save_alloc(self, session, memory, duration):
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot = session._peak_snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        hotspots = [{
+            'location': f'{_short_path(stat.traceback[-1].filename)}:{stat.traceback[-1].lineno}',
+            'size_kb': round(stat.size / 1024, 1),
+            'blocks': stat.count
+        } for stat in snapshot.statistics('lineno')[:self.top]]
+        stacks = {}
+        for stat in snapshot.statistics('traceback'):
+            stack = ';'.join(f'{_short_path(frame.filename)}:{frame.lineno}' for frame in stat.traceback)
+            stacks[stack] = stacks.get(stack, 0) + stat.size
+        self._write_collapsed(session.id, stacks)
+        return self._store(self._summary(
+            session, duration, hotspots, ('collapsed',),
+            peak_kb=round(memory['peak'] / 1024, 1), at_end_kb=round(memory['at_end'] / 1024, 1),
+            snapshot_kb=round(session._peak_size / 1024, 1)))
+
+    def _write_collapsed(self, profile_id, stacks):
+        with open(self._path(profile_id, 'collapsed'), 'w', encoding='utf-8') as handle:
+            for stack, value in sorted(stacks.items(), key=lambda item: item[1], reverse=True):
+                handle.write(f'{stack} {value}\n')
+
+    def _store(self, summary):
+        """Guarda el resumen y borra los perfiles más antiguos que `max_stored`."""
+        with open(self._path(summary['id'], 'json'), 'w', encoding='utf-8') as handle:
+            json.dump(summary, handle)
+        with self._lock:
+            self._stored[summary['id']] = summary
+            expired = []
+            while len(self._stored) > self.max_stored:
+                expired.append(self._stored.popitem(last=False)[0])
+        for profile_id in expired:
+            for extension in ('json', 'pstats', 'collapsed'):
+                try:
+                    os.remove(self._path(profile_id, extension))
+                except OSError:
+                    pass
+        return summary
+
+    def profiles(self):
+        """Resúmenes (sin hotspots) de los perfiles de este worker, del más reciente al más antiguo."""
+        with self._lock:
+            summaries = list(reversed(self._stored.values()))
+        return [{key: value for key, value in summary.items() if key != 'hotspots'} for summary in summaries]
+
+    def get(self, profile_id):
+        """Resumen de un perfil (también de otros workers si comparten `PROFILING_DIR`), o None."""
+        with self._lock:
+            summary = self._stored.get(profile_id)
+        if summary is not None:
+            return summary
+        path = self.artifact_path(profile_id, 'json')
+        if path is None:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def artifact_path(self, profile_id, kind):
+        """Ruta del artefacto (`json`, `pstats` o `collapsed`) si existe, o None."""
+        if kind not in ('json', 'pstats', 'collapsed') or not _PROFILE_ID.match(profile_id):
+            return None
+        path = self._path(profile_id, kind)
+        return path if os.path.exists(path) else None
+
+
+profiler = Profiler(PROFILING_CONFIG['directory'], PROFILING_CONFIG['max_stored'], PROFILING_CONFIG['top'],
+                    PROFILING_CONFIG['sample_interval'], PROFILING_CONFIG['alloc_frames'])
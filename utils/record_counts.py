@@ -0,0 +1,87 @@
+"""
+Proveedor de conteos de registros para endpoints de status y health.
+Lee RECORD_COUNT de la vista de monitoreo M_TABLES en una sola consulta para todas las
+tablas (con caché breve) en lugar de ejecutar un `SELECT COUNT(*)` por tabla.
+El conteo exacto con COUNT(*) queda disponible como opción explícita.
+"""
+
+import os
+import threading
+import time
+
+from utils.config import DB_CONFIG
+
+
+class RecordCountProvider:
+    """Conteos de registros estimados desde M_TABLES con caché por tabla."""
+
+    def __init__(self, ttl):
+        """Inicializa el proveedor.
+
+        Args:
+            ttl (float): Segundos que se reutiliza un conteo leído de M_TABLES.
+        """
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get_counts(self, hana_conn, tables, exact=False):
+        """Obtiene el número de registros de varias tablas del esquema.
+
+        Args:
+            hana_conn: Instancia de `HanaConnection` con `cursor`.
+            tables (list): Nombres de tabla (sin esquema).
+            exact (bool): True para ejecutar COUNT(*) por tabla (costoso en tablas grandes).
+
+        Returns:
+            dict: {tabla: conteo}; None para tablas que no existen en el esquema.
+        """
+        cursor = hana_conn.cursor
+        schema = DB_CONFIG['schema']
+
+        if exact:
+            counts = {}
+            for table in tables:
+                cursor.execute(f'SELECT COUNT(*) FROM "{schema}"."{table}"')
+                counts[table] = cursor.fetchone()[0]
+            self._store(counts)
+            return counts
+
+        now = time.monotonic()
+        with self._lock:
+            counts = {
+                table: self._cache[table][0]
+                for table in tables
+                if table in self._cache and now - self._cache[table][1] < self.ttl
+            }
+
+        pending = [table for table in tables if table not in counts]
+        if pending:
+            placeholders = ', '.join(['?' for _ in pending])
+            cursor.execute(
+                f"SELECT TABLE_NAME, RECORD_COUNT FROM M_TABLES WHERE SCHEMA_NAME = ? AND TABLE_NAME IN ({placeholders})",
+                [schema, *pending]
+            )
+            fetched = {row[0]: int(row[1]) for row in cursor.fetchall()}
+            self._store(fetched)
+            for table in pending:
+                counts[table] = fetched.get(table)
+
+        return {table: counts[table] for table in tables}
+
+    def invalidate(self, tables):
+        """Descarta los conteos cacheados de tablas que acaban de modificarse."""
+        with self._lock:
+            for table in tables:
+                self._cache.pop(table, None)
+
+    def _store(self, counts):
+        """Guarda conteos en la caché con la marca de tiempo actual."""
+        now = time.monotonic()
+        with self._lock:
+            for table, count in counts.items():
+                if count is not None:
+                    self._cache[table] = (count, now)
+
+
+record_counts = RecordCountProvider(float(os.getenv('RECORD_COUNT_CACHE_TTL', '10')))
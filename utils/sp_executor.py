@@ -0,0 +1,279 @@
+"""
+Ejecutor genérico de stored procedures de HANA.
+Lee la firma de cada procedimiento de `SYS.PROCEDURE_PARAMETERS` una sola vez (caché por
+esquema y nombre) y con ella arma una única llamada con la forma correcta: `CALL` con
+parámetros de entrada si no hay OUT escalares, o `callproc` con los OUT como `None` si los hay.
+Recoge los OUT, todos los result sets y el tiempo de cada ejecución.
+"""
+
+import logging
+import threading
+import time
+
+from utils.config import DB_CONFIG
+from utils.jobs import publish_statement
+from utils.metrics import metrics
+from utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class StoredProcedureExecutor:
+    """Ejecuta stored procedures a partir de su firma cacheada."""
+
+    def __init__(self):
+        """Inicializa las cachés de firmas y estadísticas."""
+        self._signatures = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get_signature(self, hana_conn, procedure, schema=None):
+        """Obtiene (y cachea) los parámetros del procedimiento.
+
+        Args:
+            hana_conn: Instancia de `HanaConnection` con `cursor`.
+            procedure (str): Nombre del stored procedure.
+            schema (str, optional): Esquema; por defecto el configurado.
+
+        Returns:
+            list: Parámetros en orden, cada uno {name, mode, data_type, position, is_table}.
+        """
+        schema = schema or DB_CONFIG['schema']
+        key = (schema, procedure)
+        with self._lock:
+            signature = self._signatures.get(key)
+        if signature is not None:
+            return signature
+
+        cursor = hana_conn.cursor
+        cursor.execute(
+            """
+            SELECT PARAMETER_NAME, PARAMETER_TYPE, DATA_TYPE_NAME, POSITION, TABLE_TYPE_NAME
+            FROM SYS.PROCEDURE_PARAMETERS
+            WHERE SCHEMA_NAME = ? AND PROCEDURE_NAME = ?
+            ORDER BY POSITION
+            """,
+            (schema, procedure)
+        )
+        signature = [
+            {
+                'name': row[0],
+                'mode': row[1],
+                'data_type': row[2],
+                'position': row[3],
+                # Los parámetros de tipo tabla no viajan en la llamada: los OUT llegan como result sets
+                'is_table': row[4] is not None or row[2] == 'TABLE_TYPE'
+            }
+            for row in cursor.fetchall()
+        ]
+        if not signature:
+            cursor.execute(
+                "SELECT COUNT(*) FROM SYS.PROCEDURES WHERE SCHEMA_NAME = ? AND PROCEDURE_NAME = ?",
+                (schema, procedure)
+            )
+            if not cursor.fetchone()[0]:
+                raise LookupError(f'Stored procedure {schema}.{procedure} no encontrado')
+
+        with self._lock:
+            self._signatures[key] = signature
+        described = ', '.join(f"{p['mode']} {p['name']}" for p in signature) or 'sin parámetros'
+        logger.info(f"Firma de {schema}.{procedure} cacheada: {described}")
+        return signature
+
+    def invalidate(self, procedure=None, schema=None):
+        """Descarta firmas cacheadas (todas, o la del procedimiento indicado)."""
+        with self._lock:
+            if procedure is None:
+                self._signatures.clear()
+            else:
+                self._signatures.pop((schema or DB_CONFIG['schema'], procedure), None)
+
+    def _bind_inputs(self, procedure, signature, params):
+        """Ordena los valores de entrada según la firma.
+
+        Args:
+            params (list | tuple | dict): Valores posicionales de los IN/INOUT, o un dict por nombre.
+
+        Returns:
+            list: Un valor por parámetro escalar; `None` en los OUT.
+        """
+        scalars = [p for p in signature if not p['is_table']]
+        inputs = [p for p in scalars if p['mode'] in ('IN', 'INOUT')]
+
+        if isinstance(params, dict):
+            by_name = {str(name).upper(): value for name, value in params.items()}
+            unknown = set(by_name) - {p['name'].upper() for p in inputs}
+            if unknown:
+                raise ValueError(f"Parámetros desconocidos para {procedure}: {', '.join(sorted(unknown))}")
+            missing = [p['name'] for p in inputs if p['name'].upper() not in by_name]
+            if missing:
+                raise ValueError(f"Faltan parámetros para {procedure}: {', '.join(missing)}")
+            values = iter([by_name[p['name'].upper()] for p in inputs])
+        else:
+            params = list(params or ())
+            if len(params) != len(inputs):
+                raise ValueError(f'{procedure} espera {len(inputs)} parámetros de entrada, se recibieron {len(params)}')
+            values = iter(params)
+
+        return [next(values) if p['mode'] in ('IN', 'INOUT') else None for p in scalars]
+
+    def execute(self, hana_conn, procedure, params=(), schema=None):
+        """Ejecuta el procedimiento con una sola llamada.
+
+        Args:
+            hana_conn: Instancia de `HanaConnection` con `cursor`.
+            procedure (str): Nombre del stored procedure.
+            params (list | tuple | dict): Valores de entrada (ver `_bind_inputs`).
+            schema (str, optional): Esquema; por defecto el configurado.
+
+        Returns:
+            dict: {procedure, out_params, result_sets, duration_ms}.
+        """
+        schema = schema or DB_CONFIG['schema']
+        signature = self.get_signature(hana_conn, procedure, schema)
+        values = self._bind_inputs(procedure, signature, params)
+        scalars = [p for p in signature if not p['is_table']]
+        has_out = any(p['mode'] in ('OUT', 'INOUT') for p in scalars)
+
+        cursor = hana_conn.cursor
+        publish_statement(1, 1, f"CALL {schema}.{procedure}")
+        span = tracer.start_span(f'CALL {procedure}', kind='client', **{'db.statement': f'CALL {schema}.{procedure}'})
+        start = time.perf_counter()
+        try:
+            if has_out:
+                # hdbcli devuelve los parámetros con los OUT rellenados
+                returned = cursor.callproc(f"{schema}.{procedure}", values)
+                returned = list(returned if returned is not None else values)
+            else:
+                placeholders = ', '.join(['?' for _ in values])
+                cursor.execute(f"CALL {schema}.{procedure}({placeholders})", values)
+                returned = values
+            result_sets = self._fetch_result_sets(cursor)
+        except Exception as e:
+            # La firma pudo cambiar (procedimiento redefinido): releerla en la próxima llamada
+            self.invalidate(procedure, schema)
+            self._record(procedure, time.perf_counter() - start, failed=True)
+            span.set_error(e)
+            raise
+        finally:
+            tracer.end_span(span)
+
+        duration = time.perf_counter() - start
+        self._record(procedure, duration)
+
+        out_params = {
+            p['name']: returned[i]
+            for i, p in enumerate(scalars)
+            if p['mode'] in ('OUT', 'INOUT') and i < len(returned)
+        }
+        logger.info(f"{schema}.{procedure} ejecutado en {duration * 1000:.1f} ms "
+                    f"({len(out_params)} OUT, {len(result_sets)} result sets)")
+        return {
+            'procedure': procedure,
+            'out_params': out_params,
+            'result_sets': result_sets,
+            'duration_ms': round(duration * 1000, 2)
+        }
+
+    def _fetch_result_sets(self, cursor):
+        """Lee todos los result sets pendientes del cursor."""
+        result_sets = []
+        while True:
+            if cursor.description is not None:
+                result_sets.append([list(row) for row in cursor.fetchall()])
+            next_set = getattr(cursor, 'nextset', None)
+            if next_set is None or not next_set():
+                break
+        return result_sets
+
+    def _record(self, procedure, duration, failed=False):
+        """Acumula el tiempo de una ejecución."""
+        metrics.observe('tlcl_sp_call_duration_seconds', duration, procedure=procedure,
+                        status='error' if failed else 'ok')
+        with self._lock:
+            stats = self._stats.setdefault(procedure, {'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0})
+            duration_ms = duration * 1000
+            stats['calls'] += 1
+            stats['errors'] += int(failed)
+            stats['total_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['last_ms'] = duration_ms
+
+    def stats(self):
+        """Tiempos acumulados por procedimiento en este worker."""
+        with self._lock:
+            return {
+                procedure: {
+                    'calls': s['calls'],
+                    'errors': s['errors'],
+                    'avg_ms': round(s['total_ms'] / s['calls'], 2) if s['calls'] else 0.0,
+                    'max_ms': round(s['max_ms'], 2),
+                    'last_ms': round(s['last_ms'], 2)
+                }
+                for procedure, s in self._stats.items()
+            }
+
+
+def flag_and_message(execution):
+    """Extrae el par (flag, mensaje) con el que responden los SP de los workflows.
+
+    Se toma de los OUT escalares si el procedimiento los declara; si no, de la primera
+    fila del primer result set.
+
+    Returns:
+        tuple: (flag, mensaje, fila) con `None` donde el SP no devolvió nada.
+    """
+    out_values = list(execution['out_params'].values())
+    if out_values:
+        return (out_values[0], out_values[1] if len(out_values) > 1 else None, out_values)
+    for result_set in execution['result_sets']:
+        if result_set:
+            row = result_set[0]
+            return (row[0] if row else None, row[1] if len(row) > 1 else None, row)
+    return None, None, None
+
+
+def sp_response(execution, success_message='Stored procedure ejecutado exitosamente', require_flag=False,
+                response_key='respuesta_completa', error_from_sp=False):
+    """Arma la respuesta estándar de los endpoints de SP a partir de una ejecución.
+
+    El SP se considera exitoso si su flag es 1, o si no devolvió flag.
+
+    Args:
+        execution (dict): Resultado de `sp_executor.execute`.
+        success_message (str): Mensaje de la respuesta exitosa.
+        require_flag (bool): Contrato de COBCEN: un result set sin filas (o una fila vacía) es un
+            fallo ('No se obtuvo respuesta del stored procedure', `data` None); solo un SP sin
+            result set ni OUT se da por exitoso, con flag 1.
+        response_key (str): Clave de `data` con la fila o los OUT devueltos ('response' en COBCEN).
+        error_from_sp (bool): Usar el mensaje del SP como `message` si falla (COBCEN); por defecto
+            es 'Error en stored procedure' y el texto del SP queda en `data.mensaje_error`.
+
+    Returns:
+        dict: {success, message, data} con flag, mensaje, OUT, result sets y duración.
+    """
+    flag, mensaje_error, row = flag_and_message(execution)
+    if require_flag and flag is None:
+        if execution['out_params'] or execution['result_sets']:
+            return {
+                'success': False,
+                'message': 'No se obtuvo respuesta del stored procedure',
+                'data': None
+            }
+        flag, mensaje_error = 1, 'Procedimiento ejecutado correctamente'
+    success = flag == 1 if flag is not None else True
+    return {
+        'success': success,
+        'message': success_message if success else (error_from_sp and mensaje_error or 'Error en stored procedure'),
+        'data': {
+            'flag': flag,
+            'mensaje_error': mensaje_error,
+            response_key: row,
+            'out_params': execution['out_params'],
+            'result_sets': execution['result_sets'],
+            'duration_ms': execution['duration_ms']
+        }
+    }
+
+
+sp_executor = StoredProcedureExecutor()
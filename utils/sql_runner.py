@@ -5,6 +5,11 @@ Provee ejecución secuencial, control de transacciones y limpieza básica de SQL
 
 import os
 import re
+import time
+
+from utils.jobs import current_job, publish_statement
+from utils.metrics import metrics
+from utils.tracing import tracer
 
 
 class SqlRunner:
@@ -25,6 +30,11 @@ class SqlRunner:
         """
         self.hana_connection = hana_connection
 
+    def _cancelled(self) -> bool:
+        """True si el job en curso fue cancelado (no se sigue con el script)."""
+        job = current_job()
+        return job is not None and job.cancel_requested
+
     def _clean_sql(self, sql_text: str) -> str:
         """Elimina comentarios y normaliza el SQL.
 
@@ -42,6 +52,17 @@ class SqlRunner:
             cleaned_lines.append(line)
         return '\n'.join(cleaned_lines)
 
+    def _execute(self, cursor, stmt, script, idx):
+        """Ejecuta una sentencia con su span y registra su duración en /metrics (también si falla)."""
+        kind = stmt.split(None, 1)[0].upper()
+        start = time.perf_counter()
+        try:
+            with tracer.span(f'SQL {kind}', kind='client', **{'db.statement': stmt, 'sql.script': script, 'sql.index': idx}):
+                cursor.execute(stmt)
+        finally:
+            metrics.observe('tlcl_sql_statement_duration_seconds', time.perf_counter() - start,
+                            script=script, statement=idx, kind=kind)
+
     def _split_statements(self, sql_text: str):
         """Divide el texto SQL en sentencias por `;`.
 
@@ -80,7 +101,9 @@ class SqlRunner:
             for idx, stmt in enumerate(statements, start=1):
                 try:
                     # print(stmt)
-                    cursor.execute(stmt)
+                    # Punto de cancelación: registra la sentencia en curso en el job
+                    publish_statement(idx, len(statements), stmt)
+                    self._execute(cursor, stmt, os.path.basename(file_path), idx)
                     executed += 1
                     if commit_mode == 'per_statement':
                         try:
@@ -93,7 +116,7 @@ class SqlRunner:
                         'index': idx,
                         'error': str(e)
                     })
-                    if stop_on_error:
+                    if stop_on_error or self._cancelled():
                         break
 
             if commit_mode == 'end' and not errors:
@@ -109,7 +132,9 @@ class SqlRunner:
                 'details': {
                     'file': file_path,
                     'statements_executed': executed,
-                    'errors': errors
+                    'statements_total': len(statements),
+                    'errors': errors,
+                    'cancelled': self._cancelled()
                 }
             }
         except Exception as e:
@@ -134,7 +159,8 @@ class SqlRunner:
 
             for idx, stmt in enumerate(statements, start=1):
                 try:
-                    cursor.execute(stmt)
+                    publish_statement(idx, len(statements), stmt)
+                    self._execute(cursor, stmt, 'inline', idx)
                     executed += 1
                     if commit_mode == 'per_statement':
                         try:
@@ -147,7 +173,7 @@ class SqlRunner:
                         'index': idx,
                         'error': str(e)
                     })
-                    if stop_on_error:
+                    if stop_on_error or self._cancelled():
                         break
 
             if commit_mode == 'end' and not errors:
@@ -162,7 +188,9 @@ class SqlRunner:
                 'message': 'Sentencias ejecutadas' if len(errors) == 0 else 'Sentencias ejecutadas con errores',
                 'details': {
                     'statements_executed': executed,
-                    'errors': errors
+                    'statements_total': len(statements),
+                    'errors': errors,
+                    'cancelled': self._cancelled()
                 }
             }
         except Exception as e:
@@ -0,0 +1,284 @@
+"""
+Registro de sentencias SQL por fingerprint.
+Los cursores de `HanaConnection` se envuelven en `StatementCursor`, que mide cada `execute`,
+`executemany` y `callproc` (UPSERT por fila, secciones de TLCL04_initial.sql, consultas a
+SYS.TABLE_COLUMNS, CALL de stored procedures...). Cada sentencia se normaliza a un fingerprint
+(literales y listas de parámetros reemplazados, espacios colapsados) y se agregan conteo, tiempo
+total, máximo, p95 y filas por fingerprint. Las que superan `SQL_SLOW_THRESHOLD_MS` se registran
+en el log con la cantidad de binds y el rowcount, y quedan en un buffer para `/api/sql/slow`.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+
+from utils.config import SQL_STATS_CONFIG
+from utils.jobs import current_job
+
+logger = logging.getLogger(__name__)
+
+# Fingerprint que agrupa las sentencias cuando se alcanza `SQL_STATS_MAX_FINGERPRINTS`
+OVERFLOW_FINGERPRINT = '<otros>'
+
+# Longitud máxima del SQL mostrado en el log y en los endpoints
+_MAX_SQL_LENGTH = 500
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_NUMBERS = re.compile(r'(?<![\w"])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b')
+_PARAM_LISTS = re.compile(r'\?(?:\s*,\s*\?)+')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normaliza una sentencia: sin literales, comentarios ni listas de parámetros.
+
+    `UPSERT ... VALUES (?, ?, ?)` y `WHERE FECHA = '2024-01-01' AND ID = 5` quedan como
+    `VALUES (?+)` y `WHERE FECHA = ? AND ID = ?`.
+
+    Args:
+        sql (str): Sentencia tal como se envió al cursor.
+
+    Returns:
+        str: Fingerprint de la sentencia.
+    """
+    normalized = _STRINGS.sub('?', sql)
+    normalized = _COMMENTS.sub(' ', normalized)
+    normalized = _NUMBERS.sub('?', normalized)
+    normalized = _PARAM_LISTS.sub('?+', normalized)
+    return _SPACES.sub(' ', normalized).strip().rstrip(';').strip()
+
+
+@lru_cache(maxsize=2048)
+def _classify(sql):
+    """Fingerprint y su id corto (cacheado: las mismas sentencias se repiten por fila y por lote)."""
+    key = fingerprint(sql)
+    return key, hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+
+def _bind_count(parameters):
+    if parameters is None:
+        return 0
+    try:
+        return len(parameters)
+    except TypeError:
+        return -1
+
+
+def _truncate(sql):
+    return sql if len(sql) <= _MAX_SQL_LENGTH else sql[:_MAX_SQL_LENGTH] + '…'
+
+
+def _percentile(sorted_values, fraction):
+    """Percentil por rango más cercano de una lista ordenada."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+class _FingerprintStats:
+    """Acumulado de un fingerprint."""
+
+    __slots__ = ('sql', 'methods', 'count', 'total', 'max', 'rows', 'errors', 'slow', 'samples', 'last_seen')
+
+    def __init__(self, sql, samples):
+        self.sql = sql
+        self.methods = set()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.errors = 0
+        self.slow = 0
+        self.samples = deque(maxlen=samples)
+        self.last_seen = None
+
+
+class StatementStats:
+    """Estadísticas por fingerprint y log de sentencias lentas del worker."""
+
+    def __init__(self, enabled=True, slow_threshold_ms=1000, max_fingerprints=500, samples=1000,
+                 slow_log_size=100):
+        """Inicializa el registro.
+
+        Args:
+            enabled (bool): False para no envolver los cursores.
+            slow_threshold_ms (float): Umbral de sentencia lenta en milisegundos (0 registra todas).
+            max_fingerprints (int): Fingerprints distintos que se agregan; el resto va a `<otros>`.
+            samples (int): Duraciones recientes por fingerprint para el p95.
+            slow_log_size (int): Sentencias lentas recientes que se conservan.
+        """
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self.max_fingerprints = max_fingerprints
+        self.samples = samples
+        self.since = time.time()
+        self._stats = OrderedDict()
+        self._slow = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def wrap(self, cursor):
+        """Envuelve un cursor del driver para medir sus sentencias (o lo devuelve tal cual si está desactivado)."""
+        if not self.enabled or cursor is None:
+            return cursor
+        return StatementCursor(cursor, self)
+
+    def record(self, method, sql, duration, binds, rows, rowcount, error=None):
+        """Agrega una sentencia medida y la registra como lenta si supera el umbral.
+
+        Args:
+            method (str): 'execute', 'executemany' o 'callproc'.
+            sql (str): Sentencia enviada (o `CALL <procedimiento>` para callproc).
+            duration (float): Segundos que tardó la llamada al driver.
+            binds (int): Parámetros enlazados (por fila en executemany).
+            rows (int): Filas de parámetros enviadas (1 salvo en executemany).
+            rowcount (int): `cursor.rowcount` después de la llamada (-1 si el driver no lo informa).
+            error (Exception, optional): Error del driver, si falló.
+        """
+        key, fingerprint_id = _classify(sql)
+        duration_ms = duration * 1000
+        slow = duration_ms >= self.slow_threshold_ms
+        with self._lock:
+            stats = self._stats.get(fingerprint_id)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    fingerprint_id = OVERFLOW_FINGERPRINT
+                    stats = self._stats.get(fingerprint_id)
+                if stats is None:
+                    stats = self._stats[fingerprint_id] = _FingerprintStats(
+                        OVERFLOW_FINGERPRINT if fingerprint_id == OVERFLOW_FINGERPRINT else _truncate(key),
+                        self.samples)
+            stats.methods.add(method)
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            stats.rows += max(rowcount, 0)
+            stats.samples.append(duration)
+            stats.last_seen = time.time()
+            if error is not None:
+                stats.errors += 1
+            if slow:
+                stats.slow += 1
+
+        if not slow:
+            return
+        job = current_job()
+        entry = {
+            'at': time.time(),
+            'fingerprint_id': fingerprint_id,
+            'method': method,
+            'duration_ms': round(duration_ms, 2),
+            'binds': binds,
+            'rows': rows,
+            'rowcount': rowcount,
+            'workflow': job.workflow if job else None,
+            'job_id': job.id if job else None,
+            'error': str(error) if error is not None else None,
+            'sql': _truncate(key)
+        }
+        with self._lock:
+            self._slow.append(entry)
+        batch = f' x{rows} filas' if method == 'executemany' else ''
+        logger.warning(
+            f"Sentencia lenta {method} {entry['duration_ms']} ms (umbral {self.slow_threshold_ms} ms) "
+            f"[{fingerprint_id}] binds={binds}{batch} rowcount={rowcount}"
+            f"{' workflow=' + job.workflow if job else ''}: {entry['sql'][:200]}"
+        )
+
+    def stats(self, sort='total', limit=None):
+        """Estadísticas por fingerprint.
+
+        Args:
+            sort (str): 'total', 'p95', 'max', 'avg', 'count' o 'errors' (descendente).
+            limit (int, optional): Fingerprints devueltos.
+
+        Returns:
+            list: Un dict por fingerprint con conteo, tiempos (ms) y filas.
+        """
+        with self._lock:
+            snapshot = [(fingerprint_id, stats, sorted(stats.samples)) for fingerprint_id, stats in self._stats.items()]
+            items = [{
+                'fingerprint_id': fingerprint_id,
+                'sql': stats.sql,
+                'methods': sorted(stats.methods),
+                'count': stats.count,
+                'total_ms': round(stats.total * 1000, 2),
+                'avg_ms': round(stats.total / stats.count * 1000, 3),
+                'p95_ms': round(_percentile(samples, 0.95) * 1000, 3),
+                'max_ms': round(stats.max * 1000, 3),
+                'rows': stats.rows,
+                'errors': stats.errors,
+                'slow': stats.slow,
+                'last_seen': stats.last_seen
+            } for fingerprint_id, stats, samples in snapshot]
+        key = {'total': 'total_ms', 'p95': 'p95_ms', 'max': 'max_ms', 'avg': 'avg_ms'}.get(sort, sort)
+        if key not in ('total_ms', 'p95_ms', 'max_ms', 'avg_ms', 'count', 'errors'):
+            key = 'total_ms'
+        items.sort(key=lambda item: item[key], reverse=True)
+        return items[:limit]
+
+    def slow_statements(self, limit=None):
+        """Sentencias lentas recientes, de la más reciente a la más antigua."""
+        with self._lock:
+            entries = list(reversed(self._slow))
+        return entries[:limit]
+
+    def reset(self):
+        """Borra las estadísticas y el log de sentencias lentas."""
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self.since = time.time()
+
+
+class StatementCursor:
+    """Cursor del driver que mide execute, executemany y callproc; el resto se delega."""
+
+    def __init__(self, cursor, registry):
+        self._cursor = cursor
+        self._registry = registry
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _measure(self, method, sql, binds, rows, call):
+        start = time.perf_counter()
+        try:
+            result = call()
+        except Exception as e:
+            self._registry.record(method, sql, time.perf_counter() - start, binds, rows, -1, e)
+            raise
+        rowcount = getattr(self._cursor, 'rowcount', None)
+        self._registry.record(method, sql, time.perf_counter() - start, binds, rows,
+                              rowcount if rowcount is not None else -1)
+        return result
+
+    def execute(self, operation, parameters=None, *args, **kwargs):
+        return self._measure('execute', operation, _bind_count(parameters), 1,
+                             lambda: self._cursor.execute(operation, parameters, *args, **kwargs)
+                             if parameters is not None else self._cursor.execute(operation, *args, **kwargs))
+
+    def executemany(self, operation, seq_of_parameters, *args, **kwargs):
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters)
+        binds = _bind_count(seq_of_parameters[0]) if seq_of_parameters else 0
+        return self._measure('executemany', operation, binds, len(seq_of_parameters),
+                             lambda: self._cursor.executemany(operation, seq_of_parameters, *args, **kwargs))
+
+    def callproc(self, procname, parameters=None, *args, **kwargs):
+        return self._measure('callproc', f'CALL {procname}', _bind_count(parameters), 1,
+                             lambda: self._cursor.callproc(procname, parameters, *args, **kwargs)
+                             if parameters is not None else self._cursor.callproc(procname, *args, **kwargs))
+
+
+sql_stats = StatementStats(SQL_STATS_CONFIG['enabled'], SQL_STATS_CONFIG['slow_threshold_ms'],
+                           SQL_STATS_CONFIG['max_fingerprints'], SQL_STATS_CONFIG['samples'],
+                           SQL_STATS_CONFIG['slow_log_size'])
@@ -0,0 +1,379 @@
+"""
+Trazas de ejecución con spans anidados: request → job → paso → queries → SQL.
+Cada span mide su duración y guarda atributos y el span padre. Una traza empieza en el handler
+del blueprint (o en un job) y termina cuando se cierran todos sus spans, incluidos los de jobs
+en segundo plano; las trazas completas quedan en un buffer circular en memoria (consultable en
+/api/traces) y, con `TRACING_EXPORT_FILE`, se agregan a un archivo JSON Lines con el formato de
+OTLP/JSON (`resourceSpans`) para analizarlas fuera de línea.
+
+Fuera de una traza (p. ej. el health prober) los spans no hacen nada.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.config import TRACING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Pila de spans activos del hilo actual (el último es el padre de los nuevos)
+_local = threading.local()
+
+# Kinds de OTLP: INTERNAL, SERVER, CLIENT
+_OTLP_KINDS = {'internal': 1, 'server': 2, 'client': 3}
+
+# Longitud máxima de los atributos de texto (p. ej. `db.statement`)
+_MAX_ATTRIBUTE_LENGTH = 500
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _attribute(value):
+    if isinstance(value, str) and len(value) > _MAX_ATTRIBUTE_LENGTH:
+        return value[:_MAX_ATTRIBUTE_LENGTH] + '…'
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class Span:
+    """Operación medida dentro de una traza."""
+
+    def __init__(self, tracer, trace_id, parent_id, name, kind='internal', attributes=None):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = {key: _attribute(value) for key, value in (attributes or {}).items()}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = 'ok'
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = _attribute(value)
+
+    def set_error(self, message):
+        """Marca el span como fallido."""
+        self.status = 'error'
+        self.error = _attribute(str(message))
+
+    def end(self):
+        """Cierra el span (solo la primera vez) y lo entrega al tracer."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        self.tracer._finish(self)
+
+    def to_dict(self):
+        """Representación serializable del span."""
+        end_ns = self.end_ns or time.time_ns()
+        return {
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start': self.start_ns / 1e9,
+            'duration_ms': round((end_ns - self.start_ns) / 1e6, 3),
+            'status': self.status,
+            'error': self.error,
+            'attributes': self.attributes
+        }
+
+
+class _NoopSpan:
+    """Span que no registra nada (fuera de una traza o con el tracing desactivado)."""
+
+    trace_id = None
+    span_id = None
+    kind = None
+    end_ns = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_error(self, message):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Crea spans, agrupa los de cada traza y conserva las trazas completas."""
+
+    def __init__(self, enabled=True, buffer_size=100, max_spans=2000, export_file=None,
+                 service_name='tlcl-workflows-hub'):
+        """Inicializa el tracer.
+
+        Args:
+            enabled (bool): False para que todos los spans sean no-op.
+            buffer_size (int): Trazas completas que se conservan en memoria.
+            max_spans (int): Spans máximos por traza (los siguientes se cuentan como descartados).
+            export_file (str, optional): Archivo JSON Lines donde se agrega cada traza en formato OTLP.
+            service_name (str): `service.name` del recurso exportado.
+        """
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.export_file = export_file or None
+        self.service_name = service_name
+        self._active = {}
+        self._completed = OrderedDict()
+        self._buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def current_span(self):
+        """Span activo del hilo actual o None."""
+        stack = _stack()
+        return stack[-1] if stack else None
+
+    def start_span(self, name, kind='internal', root=False, parent=None, detached=False, **attributes):
+        """Abre un span y lo deja activo en el hilo actual; cerrarlo con `end_span`.
+
+        Args:
+            name (str): Nombre de la operación.
+            kind (str): 'server' (handler), 'client' (SQL) o 'internal'.
+            root (bool): Empezar una traza nueva si no hay span activo.
+            parent (Span, optional): Padre explícito (p. ej. de otro hilo); por defecto el activo.
+            detached (bool): No dejarlo activo en este hilo (se activa con `activate` en otro).
+            **attributes: Atributos iniciales.
+
+        Returns:
+            Span: Span abierto, o `NOOP_SPAN` fuera de una traza.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        stack = _stack()
+        parent = parent or (stack[-1] if stack else None)
+        if parent is None or parent is NOOP_SPAN:
+            if not root:
+                return NOOP_SPAN
+            trace_id, parent_id = uuid.uuid4().hex, None
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+
+        with self._lock:
+            trace = self._active.get(trace_id)
+            if trace is None:
+                trace = self._active[trace_id] = {'spans': [], 'open': 0, 'dropped': 0}
+            if len(trace['spans']) + trace['open'] >= self.max_spans:
+                trace['dropped'] += 1
+                return NOOP_SPAN
+            trace['open'] += 1
+
+        span = Span(self, trace_id, parent_id, name, kind, attributes)
+        if not detached:
+            stack.append(span)
+        return span
+
+    def end_span(self, span):
+        """Cierra `span` y los spans abiertos sobre él en el hilo actual (p. ej. pasos sin cerrar)."""
+        if span is NOOP_SPAN:
+            return
+        stack = _stack()
+        if span in stack:
+            while stack:
+                top = stack.pop()
+                top.end()
+                if top is span:
+                    break
+        else:
+            span.end()
+
+    @contextmanager
+    def span(self, name, kind='internal', root=False, **attributes):
+        """Span como context manager; una excepción lo marca como fallido y se propaga."""
+        span = self.start_span(name, kind, root, **attributes)
+        try:
+            yield span
+        except Exception as e:
+            span.set_error(e)
+            raise
+        finally:
+            self.end_span(span)
+
+    @contextmanager
+    def activate(self, span):
+        """Usa `span` (abierto en otro hilo) como padre de los spans de este hilo durante el bloque.
+
+        Al salir cierra los spans que quedaron abiertos sobre él, sin cerrar `span`.
+        """
+        if span is None or span is NOOP_SPAN or not self.enabled:
+            yield span
+            return
+        stack = _stack()
+        # Ya activo en este hilo (p. ej. `bind_job` dentro del propio span del job)
+        pushed = not (stack and stack[-1] is span)
+        if pushed:
+            stack.append(span)
+        depth = len(stack)
+        try:
+            yield span
+        finally:
+            while len(stack) > depth:
+                stack.pop().end()
+            if pushed:
+                stack.pop()
+
+    def step(self, message):
+        """Abre el span de un paso de workflow y cierra el del paso anterior (si es el activo)."""
+        stack = _stack()
+        if stack and stack[-1].kind == 'step':
+            stack.pop().end()
+        if not stack:
+            return
+        # `step` no es un kind de OTLP: se exporta como INTERNAL
+        self.start_span(message, kind='step')
+
+    def _finish(self, span):
+        """Agrega el span cerrado a su traza y la completa cuando no quedan spans abiertos."""
+        with self._lock:
+            trace = self._active.get(span.trace_id)
+            if trace is None:
+                return
+            trace['spans'].append(span)
+            trace['open'] -= 1
+            if trace['open'] > 0:
+                return
+            del self._active[span.trace_id]
+            record = self._record(span.trace_id, trace)
+            self._completed[span.trace_id] = (record, trace['spans'])
+            while len(self._completed) > self._buffer_size:
+                self._completed.popitem(last=False)
+        if self.export_file:
+            self._export(record, trace['spans'])
+
+    @staticmethod
+    def _record(trace_id, trace):
+        spans = sorted(trace['spans'], key=lambda item: item.start_ns)
+        root = next((item for item in spans if item.parent_id is None), spans[0])
+        end_ns = max(item.end_ns for item in spans)
+        return {
+            'trace_id': trace_id,
+            'name': root.name,
+            'start': root.start_ns / 1e9,
+            'duration_ms': round((end_ns - root.start_ns) / 1e6, 3),
+            'status': 'error' if any(item.status == 'error' for item in spans) else 'ok',
+            'span_count': len(spans),
+            'dropped_spans': trace['dropped'],
+            'spans': [item.to_dict() for item in spans]
+        }
+
+    def traces(self, limit=None, name=None):
+        """Resúmenes de las trazas completas, de la más reciente a la más antigua."""
+        with self._lock:
+            records = [record for record, _ in reversed(self._completed.values())]
+        if name:
+            records = [record for record in records if name.lower() in record['name'].lower()]
+        return [{key: value for key, value in record.items() if key != 'spans'} for record in records[:limit]]
+
+    def get(self, trace_id):
+        """Traza completa (con sus spans) o None si no está en el buffer."""
+        with self._lock:
+            entry = self._completed.get(trace_id)
+        return entry[0] if entry else None
+
+    def to_otlp(self, trace_id):
+        """Documento OTLP/JSON (`resourceSpans`) de una traza del buffer, o None."""
+        with self._lock:
+            entry = self._completed.get(trace_id)
+        return self._otlp_document(entry[1]) if entry else None
+
+    def _otlp_span(self, span):
+        attributes = []
+        for key, value in span.attributes.items():
+            if isinstance(value, bool):
+                typed = {'boolValue': value}
+            elif isinstance(value, int):
+                typed = {'intValue': str(value)}
+            elif isinstance(value, float):
+                typed = {'doubleValue': value}
+            else:
+                typed = {'stringValue': '' if value is None else str(value)}
+            attributes.append({'key': key, 'value': typed})
+        otlp = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': _OTLP_KINDS.get(span.kind, 1),
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': attributes,
+            'status': {'code': 2, 'message': span.error} if span.status == 'error' else {'code': 1}
+        }
+        if span.parent_id:
+            otlp['parentSpanId'] = span.parent_id
+        return otlp
+
+    def _otlp_document(self, spans):
+        return {'resourceSpans': [{
+            'resource': {'attributes': [
+                {'key': 'service.name', 'value': {'stringValue': self.service_name}},
+                {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}}
+            ]},
+            'scopeSpans': [{
+                'scope': {'name': 'utils.tracing'},
+                'spans': [self._otlp_span(span) for span in sorted(spans, key=lambda item: item.start_ns)]
+            }]
+        }]}
+
+    def _export(self, record, spans):
+        """Agrega la traza al archivo de exportación como una línea OTLP/JSON."""
+        line = json.dumps(self._otlp_document(spans), default=str) + '\n'
+        try:
+            with self._export_lock, open(self.export_file, 'a', encoding='utf-8') as handle:
+                handle.write(line)
+        except OSError as e:
+            logger.error(f"No se pudo exportar la traza {record['trace_id']} a {self.export_file}: {str(e)}")
+
+
+tracer = Tracer(TRACING_CONFIG['enabled'], TRACING_CONFIG['buffer_size'], TRACING_CONFIG['max_spans'],
+                TRACING_CONFIG['export_file'])
+
+
+def trace_methods(cls):
+    """Decorador de clase: un span por llamada a cada método público (módulos de queries).
+
+    Los métodos de queries atrapan sus errores y devuelven `success: False`; ese resultado
+    también marca el span como fallido.
+    """
+    for attr, member in list(vars(cls).items()):
+        if attr.startswith('_'):
+            continue
+        name = f'{cls.__name__}.{attr}'
+        if isinstance(member, (staticmethod, classmethod)):
+            # Se envuelve la función y se conserva el descriptor (si no, el wrapper recibiría `self`)
+            setattr(cls, attr, type(member)(_traced(name, member.__func__)))
+        elif inspect.isfunction(member):
+            setattr(cls, attr, _traced(name, member))
+    return cls
+
+
+def _traced(name, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with tracer.span(name) as span:
+            result = method(*args, **kwargs)
+            if isinstance(result, dict) and result.get('success') is False:
+                span.set_error(result.get('message') or 'success: False')
+            return result
+    return wrapper